@@ -0,0 +1,112 @@
+import utime
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+class PeriodicTask:
+    def __init__(self, name, period_ms, priority, function):
+        self.name = name
+        self.period_ms = period_ms
+        self.priority = priority    # Higher runs first when several are due
+        self.function = function
+        self.next_due = 0
+        self.last_run = 0
+        self.runs = 0
+        self.overruns = 0           # Times it started over a period late
+        self.max_late_ms = 0
+        self.max_run_us = 0
+
+
+class AsyncRuntime:
+    # Alternative to the soft timers + polling main loop, each job is an asyncio task with its own period.
+    # Tasks are scheduled against absolute deadlines so they dont drift, and a task that wakes while a
+    # higher priority one is already due yields to it first (asyncio itself is first come first served).
+    # The watchdog is only fed while every task is still getting to run.
+
+    WATCHDOG_PERIOD_MS = 1000
+    MAX_YIELDS = 4  # Limit on how long a task waits for higher priority ones before running anyway
+
+    def __init__(self):
+        print("AsyncRuntime Initialising ...")
+        self.tasks = []
+        self.watchdog = None
+        print("AsyncRuntime initialised.")
+
+    def add_task(self, name, period_ms, priority, function):
+        task = PeriodicTask(name, period_ms, priority, function)
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda task: -task.priority)
+        return task
+
+    def set_watchdog(self, watchdog):
+        self.watchdog = watchdog
+
+    def _higher_priority_due(self, task, now):
+        for other in self.tasks:
+            if other.priority <= task.priority:
+                return False  # Sorted highest first so nothing else can be higher
+            if utime.ticks_diff(now, other.next_due) >= 0:
+                return True
+        return False
+
+    async def _run_periodic(self, task):
+        task.next_due = utime.ticks_ms()
+        while True:
+            delay = utime.ticks_diff(task.next_due, utime.ticks_ms())
+            if delay > 0:
+                await asyncio.sleep_ms(delay)
+
+            yields = 0
+            while yields < self.MAX_YIELDS and self._higher_priority_due(task, utime.ticks_ms()):
+                await asyncio.sleep_ms(0)
+                yields += 1
+
+            now = utime.ticks_ms()
+            late = utime.ticks_diff(now, task.next_due)
+            if late > task.max_late_ms: task.max_late_ms = late
+
+            start_us = utime.ticks_us()
+            task.function()
+            run_us = utime.ticks_diff(utime.ticks_us(), start_us)
+            if run_us > task.max_run_us: task.max_run_us = run_us
+            task.last_run = now
+            task.runs += 1
+
+            task.next_due = utime.ticks_add(task.next_due, task.period_ms)
+            if utime.ticks_diff(utime.ticks_ms(), task.next_due) > task.period_ms:
+                # Fallen over a whole period behind, skip the missed runs rather than bunch them up
+                task.overruns += 1
+                task.next_due = utime.ticks_add(utime.ticks_ms(), task.period_ms)
+
+    def tasks_healthy(self):
+        now = utime.ticks_ms()
+        for task in self.tasks:
+            if utime.ticks_diff(now, task.last_run) > max(4 * task.period_ms, self.WATCHDOG_PERIOD_MS):
+                return False
+        return True
+
+    async def _run_watchdog(self):
+        while True:
+            if self.tasks_healthy():
+                self.watchdog.feed()
+            await asyncio.sleep_ms(self.WATCHDOG_PERIOD_MS)
+
+    def print_stats(self):
+        print("task           period  runs  overruns  max late ms  max run us")
+        for task in self.tasks:
+            print("{:14} {:6d} {:5d} {:9d} {:12d} {:11d}".format(task.name, task.period_ms, task.runs, task.overruns, task.max_late_ms, task.max_run_us))
+
+    async def _main(self):
+        now = utime.ticks_ms()
+        for task in self.tasks:
+            task.last_run = now
+            asyncio.create_task(self._run_periodic(task))
+        if self.watchdog is not None:
+            asyncio.create_task(self._run_watchdog())
+        while True:
+            await asyncio.sleep_ms(10000)
+
+    def run(self):
+        print("AsyncRuntime running " + str(len(self.tasks)) + " tasks")
+        asyncio.run(self._main())
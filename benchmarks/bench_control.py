@@ -0,0 +1,265 @@
+# Benchmark: closed loop control performance against simulated heaters
+#
+# Boots the real firmware in the host simulator (sim/) for each scenario and plant, so the
+# control loop, PID tunings, heater driver and thermocouple filtering under test are exactly
+# what main.py runs. Scores each scenario on overshoot, rise time, settling time, IAE and
+# energy and writes the results as JSON, pass an earlier results file to --compare to see
+# what a change did.
+#
+# Runs on the PC, not the Pico (needs NumPy for the plant models). From the project folder:
+#   python benchmarks/bench_control.py --output control.json
+#   python benchmarks/bench_control.py --compare control.json
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sim import run as sim_run
+from sim import plant as sim_plant
+
+trapezoid = getattr(np, "trapezoid", None) or np.trapz  # Renamed in NumPy 2
+
+SAMPLE_MS = 100
+SETTLE_BAND = 3.0     # C either side of the setpoint counts as settled
+SESSION_CLICK_MS = 5000
+DISTURBANCE_DROP = 25.0
+ROTATE_STEP_MS = 60   # Per detent, slower than the last rotary acceleration threshold so each detent is 1C
+
+PLANTS = {
+    "nichrome": sim_plant.NichromeElement,
+    "fopdt": sim_plant.FOPDT,
+}
+
+
+class Recorder:
+    # Samples the plant and firmware state every SAMPLE_MS of simulated time
+    def __init__(self, world, namespace):
+        self.world = world
+        self.namespace = namespace
+        self.times = []
+        self.temperatures = []
+        self.setpoints = []
+        self.duties = []
+        self.heating = []
+        world.clock.call_later_ms(SAMPLE_MS, self.sample)
+
+    def sample(self, _):
+        shared_state = self.namespace.get("shared_state")
+        self.world.plant_temperature()
+        self.times.append(self.world.clock.now_us / 1000000)
+        self.temperatures.append(float(self.world.plant.temperature))
+        self.setpoints.append(shared_state.setpoint if shared_state is not None else 0)
+        self.duties.append(self.world.heater_duty())
+        self.heating.append(shared_state is not None and shared_state._mode != "Off")
+        self.world.clock.call_later_ms(SAMPLE_MS, self.sample)
+
+    def arrays(self):
+        return (np.array(self.times), np.array(self.temperatures), np.array(self.setpoints, dtype=float),
+                np.array(self.duties), np.array(self.heating))
+
+
+def round_or_none(value, digits=2):
+    return None if value is None else round(float(value), digits)
+
+
+def step_metrics(times, temperatures, start, end, target):
+    selected = (times >= start) & (times < end)
+    t = times[selected] - start
+    y = temperatures[selected]
+    initial = y[0]
+    step = target - initial
+    direction = 1 if step >= 0 else -1
+    error = target - y
+
+    def first_crossing(fraction):
+        reached = np.nonzero((y - initial) * direction >= fraction * abs(step))[0]
+        return t[reached[0]] if len(reached) else None
+
+    t10 = first_crossing(0.1)
+    t90 = first_crossing(0.9)
+    outside = np.abs(error) > SETTLE_BAND
+    if not outside.any():
+        settling = 0.0
+    elif outside[-1]:
+        settling = None  # Never settled within the segment
+    else:
+        settling = t[np.nonzero(outside)[0][-1] + 1]
+    return {
+        "start_c": round_or_none(initial),
+        "target_c": target,
+        "rise_time_s": round_or_none(None if t10 is None or t90 is None else t90 - t10),
+        "overshoot_c": round_or_none(max(0.0, float(np.max(-error * direction)))),
+        "settling_time_s": round_or_none(settling),
+        "max_deviation_c": round_or_none(np.max(np.abs(error))),
+        "iae_c_s": round_or_none(trapezoid(np.abs(error), t), 1),
+    }
+
+
+def energy_kj(times, duties, watts, start=0, end=None):
+    selected = times >= start
+    if end is not None: selected &= times < end
+    return round_or_none(trapezoid(duties[selected] * watts, times[selected]) / 1000)
+
+
+def session_start(times, heating):
+    on = np.nonzero(heating)[0]
+    return times[on[0]] if len(on) else None
+
+
+def run_scenario(name, plant_name, quiet=True):
+    seconds, script = SCENARIOS[name]
+    world = sim_run.create_world(seconds, PLANTS[plant_name]())
+    namespace = {}
+    recorder = Recorder(world, namespace)
+    script(world, namespace)
+    start = time.perf_counter()
+    result = sim_run.boot(world, quiet=quiet, namespace=namespace)
+    wall = time.perf_counter() - start
+
+    times, temperatures, setpoints, duties, heating = recorder.arrays()
+    shared_state = namespace["shared_state"]
+    watts = shared_state.input_volts * shared_state.input_volts / shared_state.heater_resitance
+    metrics = SCORES[name](times, temperatures, setpoints, duties, heating, watts)
+    metrics["energy_kj"] = energy_kj(times, duties, watts)
+    metrics["stopped"] = result.reason
+    metrics["wall_s"] = round(wall, 2)
+    return metrics
+
+
+# Scenarios - (simulated seconds, script scheduling the inputs) and how each one is scored
+
+def start_session(world, namespace):
+    world.click(SESSION_CLICK_MS, 3)
+
+
+def script_steps(world, namespace):
+    start_session(world, namespace)
+    world.rotate(150000, -30, ROTATE_STEP_MS)   # 170 -> 200
+    world.rotate(225000, 50, ROTATE_STEP_MS)    # 200 -> 150
+
+
+def script_disturbance(world, namespace):
+    start_session(world, namespace)
+
+    def cold_load(_):
+        world.plant_temperature()
+        world.plant.temperature = world.plant.temperature - DISTURBANCE_DROP
+    world.clock.call_later_ms(150000, cold_load)
+
+
+def script_session_end(world, namespace):
+    world.click(SESSION_CLICK_MS, 4)  # One minute session
+
+
+def score_cold_start(times, temperatures, setpoints, duties, heating, watts):
+    start = session_start(times, heating)
+    return {"heat_up": step_metrics(times, temperatures, start, times[-1] + 1, 170)}
+
+
+def setpoint_at_end(times, setpoints, start, end):
+    # Setpoint the firmware ended up with in the segment, what the rotary turn actually set
+    selected = np.nonzero((times >= start) & (times < end))[0]
+    return float(setpoints[selected[-1]])
+
+
+def score_steps(times, temperatures, setpoints, duties, heating, watts):
+    end = times[-1] + 1
+    return {"step_up": step_metrics(times, temperatures, 150, 225, setpoint_at_end(times, setpoints, 150, 225)),
+            "step_down": step_metrics(times, temperatures, 225, end, setpoint_at_end(times, setpoints, 225, end))}
+
+
+def score_disturbance(times, temperatures, setpoints, duties, heating, watts):
+    metrics = step_metrics(times, temperatures, 150, times[-1] + 1, 170)
+    return {"recovery": {key: metrics[key] for key in ("max_deviation_c", "settling_time_s", "iae_c_s")}}
+
+
+def score_session_end(times, temperatures, setpoints, duties, heating, watts):
+    on = np.nonzero(heating)[0]
+    if not len(on):
+        return {"session": None}
+    end_index = on[-1] + 1
+    end = times[min(end_index, len(times) - 1)]
+    powered = np.nonzero(duties[end_index:] > 0)[0]
+    return {"session": {
+        "heater_off_delay_s": round_or_none(times[end_index + powered[-1]] - end + SAMPLE_MS / 1000 if len(powered) else 0.0),
+        "peak_after_end_c": round_or_none(np.max(temperatures[end_index:])),
+        "energy_after_end_kj": energy_kj(times, duties, watts, start=end),
+    }}
+
+
+SCENARIOS = {
+    "cold_start": (240, start_session),
+    "setpoint_steps": (300, script_steps),
+    "load_disturbance": (240, script_disturbance),
+    "session_end": (120, script_session_end),
+}
+
+SCORES = {
+    "cold_start": score_cold_start,
+    "setpoint_steps": score_steps,
+    "load_disturbance": score_disturbance,
+    "session_end": score_session_end,
+}
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(old, new):
+    old_flat = flatten(old["results"])
+    new_flat = flatten(new["results"])
+    print("{:60} {:>10} {:>10} {:>10}".format("metric", "before", "after", "change"))
+    for key in sorted(new_flat):
+        if key.endswith("wall_s") or key not in old_flat:
+            continue
+        before = old_flat[key]
+        after = new_flat[key]
+        if before != after:
+            print("{:60} {:10.2f} {:10.2f} {:+10.2f}".format(key, before, after, after - before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Closed loop control benchmark on the host simulator")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--plants", default=",".join(PLANTS), help="comma separated plants to run")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenarios to run")
+    parser.add_argument("--verbose", action="store_true", help="show the firmware's prints")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.scenarios.split(","):
+        results[name] = {}
+        for plant_name in args.plants.split(","):
+            results[name][plant_name] = run_scenario(name, plant_name, quiet=not args.verbose)
+            print(name, plant_name, json.dumps(results[name][plant_name]), file=sys.stderr)
+
+    output = {"sample_ms": SAMPLE_MS, "settle_band_c": SETTLE_BAND, "results": results}
+    text = json.dumps(output, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), output)
+
+
+if __name__ == "__main__":
+    main()
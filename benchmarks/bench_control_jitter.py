@@ -0,0 +1,147 @@
+# Benchmark: control tick jitter with the tick on core 0 (soft timer) against core 1 (thread)
+#
+# Core 0 keeps the display busy pushing full frames, like the graph screens do, while the real
+# ControlLoop (single) or DualCoreControlLoop (dual) ticks every PID_PERIOD_MS with a stand in heater
+# and thermocouple. The thermocouple notes when each tick reads it, reports how far each tick started
+# from where it should have in microseconds, and max_late_ms/overruns from DualCoreControlLoop itself.
+#
+# Needs the display wired up as in main.py. Run on the Pico with the project files uploaded:
+#   mpremote run benchmarks/bench_control_jitter.py
+
+import sys
+sys.path.append("benchmarks")  # For benchfixtures.py when run with mpremote from the project folder
+
+import utime
+from array import array
+from machine import Pin, I2C, Timer
+from ssd1306 import SSD1306_I2C
+from simple_pid import PID
+
+from benchfixtures import BenchState
+from heaters import ElementHeater
+from controlloop import ControlLoop
+from dualcore import DualCoreControlLoop
+from probes import Probes
+from boottimer import BootTimer
+
+PID_PERIOD_MS = 371
+TICKS = 40
+
+hardware_pin_display_scl = 21
+hardware_pin_display_sda = 20
+
+
+class JitterHeater(ElementHeater):
+    # Element heater without the pwm pin, the temperature follows the power it is given
+    def __init__(self):
+        self._is_on = False
+        self._power = 0
+        self.max_duty_cycle = 65535
+
+    def on(self, power=10):
+        self._is_on = True
+        self._power = power
+
+    def off(self):
+        self._is_on = False
+        self._power = 0
+
+    def set_power(self, power):
+        self._is_on = power > 0
+        self._power = power
+
+
+class JitterThermocouple:
+    # Notes the time of each reading, which is where every tick starts its real work
+    def __init__(self, heater, count):
+        self.heater = heater
+        self.starts = array('i', [0] * count)
+        self.count = 0
+        self.raw_temp = 20.0
+
+    def read_raw_temp(self):
+        if self.count < len(self.starts):
+            self.starts[self.count] = utime.ticks_us()
+            self.count += 1
+        self.raw_temp += self.heater.get_power() * 0.1 - (self.raw_temp - 20) * 0.01
+        return self.raw_temp
+
+    def done(self):
+        return self.count >= len(self.starts)
+
+    def report(self, name):
+        period_us = PID_PERIOD_MS * 1000
+        worst = 0
+        total = 0
+        for i in range(1, self.count):
+            error = abs(utime.ticks_diff(self.starts[i], self.starts[i - 1]) - period_us)
+            total += error
+            if error > worst: worst = error
+        print("{:10} ticks {:3d}  mean jitter {:6d} us  max jitter {:6d} us".format(name, self.count, total // (self.count - 1), worst))
+
+
+class JitterState(BenchState):
+    # BenchState plus what the control loop reads and sets
+    def __init__(self):
+        super().__init__(mode="Manual")
+        self.probes = Probes()
+        self.boot_timer = BootTimer()
+        self.power_threshold = 0
+        self.input_volts = 12
+        self.heater_resitance = 0.66
+        self.heater_max_duty_cycle_percent = 40
+        self.heater_too_hot = False
+        self.heater_fault = None
+        self.heater_fault_message = ""
+
+
+def make_loop(loop_class):
+    heater = JitterHeater()
+    thermocouple = JitterThermocouple(heater, TICKS)
+    pid = PID(setpoint=170)
+    pid.output_limits = (0, 10)
+    return loop_class(pid, heater, thermocouple, JitterState()), thermocouple
+
+
+def busy_display(display, thermocouple, control_loop=None):
+    frame = 0
+    while not thermocouple.done():
+        display.fill(0)
+        display.text(str(frame), frame % 100, 12, 1)
+        display.invalidate()  # Full frame every time, the worst case for a graph screen
+        display.show()
+        if control_loop is not None: control_loop.sync()  # As the supervisor does
+        frame += 1
+
+
+def single_core(display):
+    control_loop, thermocouple = make_loop(ControlLoop)
+    control_loop.pid.reset()
+    timer = Timer(-1)
+    timer.init(period=PID_PERIOD_MS, mode=Timer.PERIODIC, callback=lambda t: control_loop.tick())
+    busy_display(display, thermocouple)
+    timer.deinit()
+    control_loop.heater.off()
+    thermocouple.report("single")
+
+
+def dual_core(display):
+    control_loop, thermocouple = make_loop(DualCoreControlLoop)
+    control_loop.pid.reset()
+    control_loop.start(PID_PERIOD_MS)
+    busy_display(display, thermocouple, control_loop)
+    control_loop.running = False
+    utime.sleep_ms(PID_PERIOD_MS + 100)  # Let core 1 finish its wait and switch the heater off
+    thermocouple.report("dual")
+    print("{:10} max late {:d} ms  overruns {:d}".format("dual", control_loop.max_late_ms, control_loop.overruns))
+
+
+def main():
+    i2c = I2C(0, scl=Pin(hardware_pin_display_scl), sda=Pin(hardware_pin_display_sda), freq=200000)
+    display = SSD1306_I2C(128, 32, i2c)
+    print("Control tick jitter while core 0 pushes display frames")
+    single_core(display)
+    dual_core(display)
+
+
+main()
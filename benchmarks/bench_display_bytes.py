@@ -0,0 +1,80 @@
+# Benchmark: I2C bytes sent per frame for each screen
+#
+# Draws every screen into a real SSD1306_I2C framebuffer wired to a counting fake I2C bus and
+# reports the bytes for a steady state frame (one new sample since the last frame) with the
+# dirty page tracking against a full framebuffer push.
+#
+# Run on the Pico with the project files uploaded:
+#   mpremote run benchmarks/bench_display_bytes.py
+
+import sys
+sys.path.append("benchmarks")  # For benchfixtures.py when run with mpremote from the project folder
+
+from ssd1306 import SSD1306_I2C
+from displaymanager import DisplayManager
+from benchfixtures import BenchHeater, BenchState
+
+
+class CountingI2C:
+    def __init__(self):
+        self.bytes = 0
+        self.transactions = 0
+
+    def writeto(self, addr, buf):
+        self.bytes += 1 + len(buf)  # address byte + payload
+        self.transactions += 1
+
+    def writevto(self, addr, bufs):
+        self.bytes += 1
+        for buf in bufs:
+            self.bytes += len(buf)
+        self.transactions += 1
+
+
+def main():
+    i2c = CountingI2C()
+    display = SSD1306_I2C(128, 32, i2c)
+    state = BenchState()
+    display_manager = DisplayManager(display, state)
+    heater = BenchHeater()
+    for _ in range(128):
+        state.add_sample()
+
+    def home():
+        display_manager.show_screen_home_screen((1.2, 0.8, 0), heater)
+        display_manager.display_heartbeat()
+
+    screens = (
+        ("home_screen", home),
+        ("graph_setpoint", display_manager.show_screen_graph_setpoint),
+        ("graph_line", display_manager.show_screen_graph_line),
+        ("graph_bar", display_manager.show_screen_graph_bar),
+        ("temp_watts_line", display_manager.show_screen_temp_watts_line),
+        ("watts_line", display_manager.show_screen_watts_line),
+        ("pi_temperature", display_manager.show_screen_pi_temperature),
+        ("display_contrast", display_manager.show_screen_display_contrast),
+        ("menu", display_manager.show_screen_menu),
+    )
+
+    def frame(draw, full):
+        if full: display.invalidate()
+        i2c.bytes = 0
+        i2c.transactions = 0
+        display.begin_frame()
+        draw()
+        display.end_frame()
+        return i2c.bytes, i2c.transactions
+
+    print("I2C bytes per frame (transactions)")
+    print("screen             full push      dirty pages")
+    for name, draw in screens:
+        frame(draw, True)  # previous frame of the same screen is on the display
+        state.add_sample()
+        full_bytes, full_transactions = frame(draw, True)
+        frame(draw, True)
+        state.add_sample()
+        dirty_bytes, dirty_transactions = frame(draw, False)
+        print("{:16} {:6d} ({:3d})   {:6d} ({:3d})".format(name, full_bytes, full_transactions, dirty_bytes, dirty_transactions))
+
+
+main()
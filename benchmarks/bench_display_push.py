@@ -0,0 +1,71 @@
+# Benchmark: display push time and the frame rate it allows at each I2C bus frequency
+#
+# Times display.show() for a full frame, a changed reading (a few characters on one page) and the
+# heartbeat column on its own, then prints the time per push and the most frames a second the bus
+# could carry at that rate. The bus frequency is set with hardware_display_i2c_freq in main.py.
+#
+# On the Pico with the display wired up as in main.py and the project files uploaded:
+#   mpremote run benchmarks/bench_display_push.py
+#
+# On the PC it runs against the host simulator bus, where the time is the modelled bus time only
+# (bytes x 9 clocks at the frequency) with none of the Python time:
+#   python benchmarks/bench_display_push.py
+
+import sys
+
+if sys.implementation.name != "micropython":
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from sim import run as sim_run
+    from sim.devices import SimSSD1306
+    sim_run.setup_paths()
+    SimSSD1306(sim_run.create_world(3600))
+
+import utime
+from machine import Pin, I2C
+from ssd1306 import SSD1306_I2C
+
+FREQUENCIES = (100000, 200000, 400000, 1000000)
+FRAMES = 50
+
+hardware_pin_display_scl = 21
+hardware_pin_display_sda = 20
+
+
+def push_time(display, change):
+    # Average microseconds for show() after change(frame) has drawn something
+    total = 0
+    for frame in range(FRAMES):
+        change(frame)
+        start = utime.ticks_us()
+        display.show()
+        total += utime.ticks_diff(utime.ticks_us(), start)
+    return total // FRAMES
+
+
+def main():
+    print("Display push time per frame in us (max fps)")
+    print("freq kHz      full frame        reading       heartbeat")
+    for freq in FREQUENCIES:
+        i2c = I2C(0, scl=Pin(hardware_pin_display_scl), sda=Pin(hardware_pin_display_sda), freq=freq)
+        display = SSD1306_I2C(128, 32, i2c)
+        for x in range(0, display.width, 3):
+            display.vline(x, 0, display.height, 1)  # Something on every page
+        display.show()
+
+        def full(frame):
+            display.invalidate()
+
+        def reading(frame):
+            display.fill_rect(0, 8, 24, 8, 0)
+            display.text(str(100 + frame % 50), 0, 8, 1)
+
+        def heartbeat(frame):
+            display.vline(display.width - 1, 0, display.height, 0)
+            display.vline(display.width - 1, display.height - frame % display.height, frame % display.height, 1)
+
+        results = [push_time(display, change) for change in (full, reading, heartbeat)]
+        print("{:8d} ".format(freq // 1000) + "".join("{:8d} ({:4d})".format(us, 1000000 // us if us else 0) for us in results))
+
+
+main()
@@ -0,0 +1,69 @@
+# Benchmark: time to draw a frame of the text heavy screens, text() against the label cache
+#
+# Draws the home screen, the menu and a standard screen into a real SSD1306_I2C framebuffer
+# (wired to an I2C bus that does nothing) with display_label_cache off and then on, and reports
+# the average microseconds per frame for just the drawing - the I2C push is left out.
+#
+# Run on the Pico with the project files uploaded:
+#   mpremote run benchmarks/bench_draw_time.py
+
+import sys
+sys.path.append("benchmarks")  # For benchfixtures.py when run with mpremote from the project folder
+
+import utime
+from ssd1306 import SSD1306_I2C
+from displaymanager import DisplayManager
+from benchfixtures import BenchHeater, BenchState
+
+FRAMES = 200
+
+
+class NullI2C:
+    def writeto(self, addr, buf):
+        pass
+
+    def writevto(self, addr, bufs):
+        pass
+
+
+def time_screens(label_cache):
+    display = SSD1306_I2C(128, 32, NullI2C())
+    state = BenchState(label_cache, "Session")
+    display_manager = DisplayManager(display, state)
+    heater = BenchHeater()
+
+    def menu():
+        # Walk the selection down the menu so every entry gets drawn
+        state.current_menu_position = (state.current_menu_position + 1) % len(state.menu_options)
+        display_manager.show_screen_menu()
+
+    screens = (
+        ("home_screen", lambda: display_manager.show_screen_home_screen((1.2, 0.8, 0), heater)),
+        ("menu", menu),
+        ("display_contrast", display_manager.show_screen_display_contrast),
+    )
+
+    results = []
+    for name, draw in screens:
+        draw()  # Anything made on first use (tiles, mode labels) is made outside the timing
+        total = 0
+        for _ in range(FRAMES):
+            display.begin_frame()     # show() inside a frame only marks it, the push is in end_frame()
+            start = utime.ticks_us()
+            draw()
+            total += utime.ticks_diff(utime.ticks_us(), start)
+            display.end_frame()
+        results.append((name, total // FRAMES))
+    return results
+
+
+def main():
+    before = time_screens(False)
+    after = time_screens(True)
+    print("Draw time per frame (us)")
+    print("screen              text()   label cache")
+    for (name, text_us), (_, cache_us) in zip(before, after):
+        print("{:16} {:9d} {:13d}".format(name, text_us, cache_us))
+
+
+main()
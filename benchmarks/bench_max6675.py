@@ -0,0 +1,71 @@
+# Micro-benchmark: per read() latency of the bitbang and SPI MAX6675 drivers
+#
+# Uses fake Pin/SPI objects so no thermocouple is needed and only the driver cost is measured
+# (the bitbang driver still pays its utime.sleep_us calls as those are part of the driver).
+#
+# Run on the Pico with the project files uploaded:
+#   mpremote run benchmarks/bench_max6675.py
+
+import utime
+from max6675_utime import MAX6675
+from max6675_spi import MAX6675_SPI
+
+READS = 200
+RAW_FRAME = (170 * 4) << 3  # 170C as the MAX6675 would clock it out
+
+
+class FakePin:
+    def __init__(self, value=0):
+        self._value = value
+
+    def high(self):
+        self._value = 1
+
+    def low(self):
+        self._value = 0
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+
+
+class FakeSPI:
+    def readinto(self, buf):
+        buf[0] = RAW_FRAME >> 8
+        buf[1] = RAW_FRAME & 0xFF
+
+
+def time_reads(sensor, driver_class):
+    # Make every read() do a full transfer rather than return the cached value
+    period = driver_class.MEASUREMENT_PERIOD_MS
+    driver_class.MEASUREMENT_PERIOD_MS = -1
+    min_us = None
+    max_us = 0
+    total_us = 0
+    try:
+        for _ in range(READS):
+            start = utime.ticks_us()
+            sensor.read()
+            duration = utime.ticks_diff(utime.ticks_us(), start)
+            total_us += duration
+            if min_us is None or duration < min_us: min_us = duration
+            if duration > max_us: max_us = duration
+    finally:
+        driver_class.MEASUREMENT_PERIOD_MS = period
+    return min_us, total_us / READS, max_us
+
+
+def main():
+    results = (
+        ("bitbang", time_reads(MAX6675(FakePin(), FakePin(), FakePin()), MAX6675)),
+        ("spi", time_reads(MAX6675_SPI(FakeSPI(), FakePin()), MAX6675_SPI)),
+    )
+    print("MAX6675 read() latency over " + str(READS) + " reads (us)")
+    print("backend     min      avg      max")
+    for name, (min_us, avg_us, max_us) in results:
+        print("{:8} {:6d} {:8.1f} {:8d}".format(name, min_us, avg_us, max_us))
+    print("spi speed up: {:.1f}x".format(results[0][1][1] / results[1][1][1]))
+
+
+main()
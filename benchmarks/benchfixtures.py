@@ -0,0 +1,57 @@
+# Stand ins for the heater and SharedState so the display benchmarks can draw the real screens
+# without the rest of the firmware. Imported by bench_display_bytes.py and bench_draw_time.py.
+
+from heaters import ElementHeater
+from ringbuffer import RingBuffer
+from telemetryhistory import TieredHistory
+
+PID_PERIOD_MS = 371
+
+
+class BenchHeater(ElementHeater):
+    # Looks like an element heater to the screens without touching any pins
+    def __init__(self):
+        self._is_on = True
+        self._power = 4.5
+
+
+class BenchState:
+    # Just the SharedState attributes the screens read
+    def __init__(self, label_cache=True, mode="Manual"):
+        self.mode = mode
+        self.display_contrast = 255
+        self.display_rotate = True
+        self.display_frame_governor = False  # Draw every frame, the benchmarks measure the screens themselves
+        self.display_max_fps = 0
+        self.display_label_cache = label_cache
+        self.home_big_reading = True
+        self.graph_big_reading = False
+        self.temperature_units = 'C'
+        self.setpoint = 170
+        self.heater_temperature = 150
+        self.watts = 60
+        self.max_watts = 120
+        self.pi_temperature = 31
+        self.session_timeout = 5 * 60 * 1000
+        self.temperature_readings = RingBuffer(128)
+        self.temperature_history = TieredHistory(self.temperature_readings)
+        self.watt_readings = RingBuffer(128)
+        self.watt_history = TieredHistory(self.watt_readings)
+        self.graph_span = 0
+        self.graph_incremental = True
+        self.menu_options = ["MENU", "Home Screen", "Graph Setpoint", "Graph Line", "Graph Bar",
+                             "Temp Watts Line", "Watts Line", "PI Temperature", "Display Contrast", "Stats"]
+        self.current_menu_position = 3
+        self.sample_time = 0
+
+    def get_mode(self):
+        return self.mode
+
+    def get_session_mode_duration(self):
+        return 0
+
+    def add_sample(self):
+        self.sample_time += PID_PERIOD_MS
+        self.heater_temperature = 150 + (self.sample_time // PID_PERIOD_MS) % 30
+        self.temperature_history.append(self.sample_time, self.heater_temperature)
+        self.watt_history.append(self.sample_time, 40 + (self.sample_time // PID_PERIOD_MS) % 40)
@@ -0,0 +1,109 @@
+import framebuf
+
+class BigFont:
+    # 10x16 digits and units for a reading that can be read from across the workshop.
+    # The glyphs are one const table, MONO_VLSB with the two pages of 10 columns each one after the other
+    # (20 bytes a glyph), in glyph index order. draw() works out the glyph indexes of a number into a
+    # preallocated buffer and blits them, so drawing a reading makes no strings.
+    HEIGHT = 16
+    CELL = 10           # Columns (bytes per page) of each glyph
+    SPACING = 2         # Columns between glyphs
+    MAX_GLYPHS = 8
+
+    # Glyph indexes, 0-9 are the digits
+    MINUS = 10
+    DEGREE = 11
+    C = 12
+    F = 13
+    W = 14
+    S = 15
+
+    # Units to go after a number
+    CELSIUS = bytes((DEGREE, C))
+    FAHRENHEIT = bytes((DEGREE, F))
+    WATTS = bytes((W,))
+    SECONDS = bytes((S,))
+    NONE = b""
+
+    WIDTHS = b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x06\x0a\x0a\x0a\x0a"
+
+    GLYPHS = (
+        b"\xfc\xfe\x07\x03\x83\xc3\x63\x37\xfe\xfc\x1f\x3f\x76\x63\x61\x60\x60\x70\x3f\x1f"  # '0'
+        b"\x00\x08\x0c\x06\xff\xff\x00\x00\x00\x00\x00\x60\x60\x60\x7f\x7f\x60\x60\x60\x00"  # '1'
+        b"\x0c\x0e\x07\x03\x03\x83\xc3\xe7\x7e\x3c\x70\x78\x7c\x6e\x67\x63\x61\x60\x60\x60"  # '2'
+        b"\x04\x06\x07\xc3\xc3\xc3\xc3\xe7\x3e\x3c\x18\x38\x70\x60\x60\x60\x60\x71\x3f\x1f"  # '3'
+        b"\xc0\xe0\x30\x18\x0c\x06\x03\xff\xff\x00\x03\x03\x03\x03\x03\x03\x03\x7f\x7f\x03"  # '4'
+        b"\x7f\x7f\x63\x63\x63\x63\x63\xe3\xc3\x83\x18\x38\x70\x60\x60\x60\x60\x70\x3f\x1f"  # '5'
+        b"\xf8\xfc\xce\xc7\xc3\xc3\xc3\xc3\x80\x00\x1f\x3f\x71\x60\x60\x60\x60\x71\x3f\x1f"  # '6'
+        b"\x03\x03\x03\x03\x03\x83\xe3\xfb\x3f\x0f\x00\x00\x00\x00\x7e\x7f\x03\x00\x00\x00"  # '7'
+        b"\x3c\xfe\xe7\xc3\xc3\xc3\xc3\xe7\xfe\x3c\x1f\x3f\x71\x60\x60\x60\x60\x71\x3f\x1f"  # '8'
+        b"\x7c\xfe\xc7\x83\x83\x83\x83\xc7\xfe\xfc\x00\x00\x61\x61\x61\x61\x71\x39\x1f\x0f"  # '9'
+        b"\x00\x80\x80\x80\x80\x80\x80\x80\x80\x00\x00\x01\x01\x01\x01\x01\x01\x01\x01\x00"  # '-'
+        b"\x06\x0f\x09\x0f\x06\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"  # degree
+        b"\xfc\xfe\x07\x03\x03\x03\x03\x07\x0e\x0c\x1f\x3f\x70\x60\x60\x60\x60\x70\x38\x18"  # 'C'
+        b"\xff\xff\xc3\xc3\xc3\xc3\xc3\xc3\x03\x03\x7f\x7f\x00\x00\x00\x00\x00\x00\x00\x00"  # 'F'
+        b"\xff\xff\x00\x00\x80\x80\x00\x00\xff\xff\x7f\x3f\x18\x0c\x07\x07\x0c\x18\x3f\x7f"  # 'W'
+        b"\x80\xc0\x60\x60\x60\x60\x60\x60\xc0\x00\x01\x33\x63\x66\x66\x66\x66\x6c\x3c\x18"  # 's'
+    )
+
+    def __init__(self):
+        table = bytearray(self.GLYPHS)  # FrameBuffer wants a buffer it could write to
+        cell = self.CELL * self.HEIGHT // 8
+        self.glyphs = []
+        for glyph in range(len(self.WIDTHS)):
+            self.glyphs.append(framebuf.FrameBuffer(memoryview(table)[glyph * cell:(glyph + 1) * cell], self.CELL, self.HEIGHT, framebuf.MONO_VLSB))
+        self.buffer = bytearray(self.MAX_GLYPHS)  # Glyph indexes of what is being drawn
+
+    def _fill(self, value, units):
+        # Glyph indexes of value (an int) then units into self.buffer, returns how many
+        buffer = self.buffer
+        count = 0
+        if value < 0:
+            buffer[0] = self.MINUS
+            count = 1
+            value = -value
+        start = count
+        limit = self.MAX_GLYPHS - len(units)
+        while True:
+            buffer[count] = value % 10
+            value //= 10
+            count += 1
+            if value == 0 or count >= limit:
+                break
+        # Digits went in least significant first
+        end = count - 1
+        while start < end:
+            buffer[start], buffer[end] = buffer[end], buffer[start]
+            start += 1
+            end -= 1
+        for i in range(len(units)):
+            buffer[count] = units[i]
+            count += 1
+        return count
+
+    def width(self, count):
+        # Width in pixels of the first count glyphs in self.buffer
+        widths = self.WIDTHS
+        buffer = self.buffer
+        width = 0
+        for i in range(count):
+            width += widths[buffer[i]] + self.SPACING
+        return width - self.SPACING if count else 0
+
+    def draw(self, fb, value, units, x, y, right=False, clear=False):
+        # Draws value with units at x, y (or ending at x if right), clear blanks the area behind it first.
+        # Returns the x after the reading
+        count = self._fill(value, units)
+        width = self.width(count)
+        if right:
+            x -= width
+        if clear:
+            fb.fill_rect(x - 1, y, width + 2, self.HEIGHT, 0)
+        buffer = self.buffer
+        glyphs = self.glyphs
+        widths = self.WIDTHS
+        for i in range(count):
+            glyph = buffer[i]
+            fb.blit(glyphs[glyph], x, y, 0)
+            x += widths[glyph] + self.SPACING
+        return x
@@ -0,0 +1,45 @@
+import utime
+
+class BootTimer:
+    # Times each phase of start up and how long it takes until the control loop first runs.
+    #
+    # phase(name) ends the phase running since the last one (or since the BootTimer was made) and
+    # prints its time. control_ticked() is called from the control loop every tick so it only stores an
+    # int, update() (the supervisor) prints the time to the first tick once it is known.
+    # The serial "boot" command prints the lot again.
+
+    def __init__(self):
+        self.start = utime.ticks_ms()
+        self.phase_start = self.start
+        self.phases = []                # (name, ms)
+        self.first_control_tick_ms = -1  # From self.start, -1 until the control loop has run
+        self.reported = False
+
+    def phase(self, name):
+        now = utime.ticks_ms()
+        ms = utime.ticks_diff(now, self.phase_start)
+        self.phase_start = now
+        self.phases.append((name, ms))
+        print("Boot: " + name + " " + str(ms) + "ms")
+
+    def elapsed(self):
+        return utime.ticks_diff(utime.ticks_ms(), self.start)
+
+    def control_ticked(self):
+        if self.first_control_tick_ms < 0:
+            self.first_control_tick_ms = utime.ticks_diff(utime.ticks_ms(), self.start)
+
+    def update(self):
+        if not self.reported and self.first_control_tick_ms >= 0:
+            self.reported = True
+            print("Boot: first control tick after " + str(self.first_control_tick_ms) + "ms")
+
+    def report(self):
+        print("{:16} {:>7}".format("boot phase", "ms"))
+        for name, ms in self.phases:
+            print("{:16} {:7d}".format(name, ms))
+        print("{:16} {:7d}".format("total", sum(ms for _, ms in self.phases)))
+        if self.first_control_tick_ms >= 0:
+            print("{:16} {:7d}".format("first ctrl tick", self.first_control_tick_ms))
+        else:
+            print("first ctrl tick  not yet")
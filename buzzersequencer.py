@@ -0,0 +1,73 @@
+import utime
+
+class BuzzerSequencer:
+    # Plays tone patterns on a PWM buzzer without blocking - play() only queues the pattern, update()
+    # (on the indicator tick) starts and steps the notes as their time comes.
+    # Single producer / single consumer like Mailbox: only play() writes tail and only update() writes head,
+    # so call play() from the main loop only. Timer callbacks set a flag for the supervisor to play instead.
+    #
+    # A pattern is a flat tuple of frequency, ms pairs, frequency 0 is a rest.
+    CONNECTED = (2500, 200)                                     # Boot, so we know its connected correctly
+    SETPOINT_REACHED = (1500, 350)                              # First time at the setpoint in a session
+    SESSION_END = (1500, 200, 0, 200, 1000, 200, 0, 200, 500, 200)
+    WATCHDOG_OFF = (0, 150, 2000, 250, 0, 150, 1000, 250)
+
+    DUTY = 10000        # Loud enough, 32768 is the loudest
+    QUEUE_SIZE = 4
+
+    def __init__(self, pwm):
+        print("BuzzerSequencer Initialising ...")
+        self.pwm = pwm
+        self.pwm.duty_u16(0)
+        self.queue = [None] * self.QUEUE_SIZE
+        self.head = 0
+        self.tail = 0
+        self.pattern = None     # Playing now
+        self.step = 0           # Index of the frequency of the note playing
+        self.note_end = 0
+        print("BuzzerSequencer initialised.")
+
+    def play(self, pattern):
+        # Queue a pattern to play after any already queued, False if the queue is full
+        tail = (self.tail + 1) % self.QUEUE_SIZE
+        if tail == self.head:
+            return False
+        self.queue[self.tail] = pattern
+        self.tail = tail
+        return True
+
+    def is_playing(self):
+        return self.pattern is not None or self.head != self.tail
+
+    def update(self):
+        now = utime.ticks_ms()
+        if self.pattern is not None:
+            if utime.ticks_diff(now, self.note_end) < 0:
+                return
+            self.step += 2
+            if self.step < len(self.pattern):
+                self._start_note(self.note_end)  # From when the last one should have ended so they dont drift
+                return
+            self.pattern = None
+            self.pwm.duty_u16(0)
+
+        if self.head != self.tail:
+            self.pattern = self.queue[self.head]
+            self.queue[self.head] = None
+            self.head = (self.head + 1) % self.QUEUE_SIZE
+            self.step = 0
+            self._start_note(now)
+
+    def stop(self):
+        self.pattern = None
+        self.head = self.tail
+        self.pwm.duty_u16(0)
+
+    def _start_note(self, start):
+        frequency = self.pattern[self.step]
+        if frequency:
+            self.pwm.freq(frequency)
+            self.pwm.duty_u16(self.DUTY)
+        else:
+            self.pwm.duty_u16(0)
+        self.note_end = utime.ticks_add(start, self.pattern[self.step + 1])
@@ -0,0 +1,210 @@
+import utime
+from array import array
+from heaters import InductionHeater, ElementHeater
+from errormessage import ErrorMessage
+from probes import Probes
+
+class ControlLoop:
+    # Sensor -> PID -> heater pipeline run once per pid timer tick.
+    #
+    # Runs in a timer callback so it never sleeps and keeps allocation down: a tick that needs a
+    # "safe off" reading switches the heater off and returns (settle), the reading is taken on a
+    # later tick once SETTLE_MS has passed, then compute and actuate carry on as normal.
+    # Anything that needs the display is left as a flag in shared_state for the main loop.
+
+    STATE_SAMPLE = 0
+    STATE_SETTLE = 1
+
+    SETTLE_MS = 301                 # Time for things to calm down with the heater off before a safe reading
+    HEATER_TEMPERATURE_LIMIT = 350  # Hard coded limit if user really wants to up this then up to them to edit code
+
+    # Errors where the reading cant be trusted at all - heater is stopped until a reboot
+    FATAL_ERRORS = ("thermocouple-invalid_reading",
+                    "thermocouple-zero_reading",
+                    "thermocouple-below_zero")
+
+    # telemetry fields
+    TELEMETRY_TEMPERATURE = 0
+    TELEMETRY_RAW_TEMPERATURE = 1
+    TELEMETRY_SETPOINT = 2
+    TELEMETRY_POWER = 3
+    TELEMETRY_HEATER_ON = 4
+
+    def __init__(self, pid, heater, thermocouple, shared_state):
+        print("ControlLoop Initialising ...")
+        self.pid = pid
+        self.heater = heater
+        self.thermocouple = thermocouple
+        self.shared_state = shared_state
+        self.is_induction = isinstance(heater, InductionHeater)
+        self.is_element = isinstance(heater, ElementHeater)
+        if not (self.is_induction or self.is_element):
+            raise ValueError("Unsupported heater type")
+        self.state = self.STATE_SAMPLE
+        self.settle_start = 0
+        self.stopped = False
+        self.paused = False   # Held off by the main code eg pi too hot, carries on once resumed
+        self.heater_enabled = False
+        self.telemetry = array('f', [0] * 5)  # Last tick, formatted by the main loop if wanted
+        self.telemetry_time = 0
+        self.tick_count = 0
+        self.last_tick_us = 0
+        self.max_tick_us = 0
+        print("ControlLoop initialised.")
+
+    def read_temperature(self):
+        # Returns (temperature, need_heater_off_temperature), temperature is -1 if the reading failed
+        start_us = utime.ticks_us()
+        temperature, need_heater_off_temperature = self._read_temperature()
+        self.shared_state.probes.stop(Probes.THERMOCOUPLE, start_us)
+        return temperature, need_heater_off_temperature
+
+    def _read_temperature(self):
+        try:
+            if self.is_induction:
+                return self.thermocouple.get_filtered_temp(self.heater.is_on())
+            return self.thermocouple.read_raw_temp(), False  # caller can throw this away if not needed
+
+        except ErrorMessage as e:
+            self.heater.off()
+            if e.error_code in self.FATAL_ERRORS:
+                self.stop(e.error_code, str(e))
+            else:
+                #thermocouple-above_limit, thermocouple-read_error
+                print("Pausing heater - [" + e.error_code + "] " + str(e))
+            return -1, True
+
+        except Exception as e:
+            # Handle or log unexpected exceptions not dealt with above
+            self.heater.off()
+            self.stop("unknown_error", "Unknown Error: " + str(e))
+            return -1, True
+
+    def stop(self, error_code, error_message):
+        # Heater off for good, the main loop shows the fault and stops the timer
+        self.heater.off()
+        self.stopped = True
+        self.shared_state.heater_fault_message = error_message
+        self.shared_state.heater_fault = error_code
+        print("Stopped heater - [" + error_code + "] " + error_message)
+
+    def pause(self):
+        self.paused = True
+        self.heater.off()
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self.state = self.STATE_SAMPLE
+            self.pid.reset()
+
+    def reset_pid(self):
+        # The main code goes through these rather than the pid/heater, DualCoreControlLoop hands them to core 1
+        self.pid.reset()
+
+    def heater_off(self):
+        self.heater.off()
+
+    def tick(self):
+        if self.stopped or self.paused:
+            return
+        start_us = utime.ticks_us()
+        self._tick()
+        if self.tick_count == 0: self.shared_state.boot_timer.control_ticked()
+        self.tick_count += 1
+        self.last_tick_us = utime.ticks_diff(utime.ticks_us(), start_us)
+        if self.last_tick_us > self.max_tick_us: self.max_tick_us = self.last_tick_us
+        self.shared_state.probes.record(Probes.PID, self.last_tick_us)
+
+    def _tick(self):
+        shared_state = self.shared_state
+        heater = self.heater
+        self._read_inputs()
+
+        # Settle / sample
+        if self.state == self.STATE_SETTLE:
+            if utime.ticks_diff(utime.ticks_ms(), self.settle_start) < self.SETTLE_MS:
+                return
+            self.state = self.STATE_SAMPLE
+            new_heater_temperature, _ = self.read_temperature()
+            if new_heater_temperature < 0: # Non fatal error occured
+                return   # Let timer run this again and hopefully next time error has passed
+        else:
+            new_heater_temperature, need_heater_off_temperature = self.read_temperature()
+            if new_heater_temperature < 0: # Non fatal error occured
+                heater.off() #should already be off
+                return   # Let timer run this again and hopefully next time error has passed
+            if need_heater_off_temperature:
+                shared_state.heater_temperature = new_heater_temperature
+                heater.off()
+                self.settle_start = utime.ticks_ms()
+                self.state = self.STATE_SETTLE
+                return
+
+        # new temperature is valid
+        shared_state.heater_temperature = new_heater_temperature
+
+        # Compute
+        reading_time = utime.ticks_ms()
+        if heater.is_on():
+            watts = int((((shared_state.input_volts*shared_state.input_volts) / shared_state.heater_resitance) * (shared_state.heater_max_duty_cycle_percent/100))  * (heater.get_power() / 10))
+        else:
+            watts = 0
+        self._publish(reading_time, new_heater_temperature, watts)
+
+        power = self.pid(new_heater_temperature)  # Update pid even if heater is off
+
+        self._actuate(power)
+        self._record_telemetry(reading_time, power)
+
+    def _read_inputs(self):
+        # Setpoint and whether the heater may be on, DualCoreControlLoop gets these from its mailbox instead
+        shared_state = self.shared_state
+        if self.pid.setpoint != shared_state.setpoint: self.pid.setpoint = shared_state.setpoint
+        self.heater_enabled = shared_state.get_mode() != "Off"
+
+    def _publish(self, reading_time, temperature, watts):
+        shared_state = self.shared_state
+        shared_state.temperature_history.append(reading_time, int(temperature))
+        shared_state.watts = watts
+        shared_state.watt_history.append(reading_time, watts)
+
+    def _actuate(self, power):
+        shared_state = self.shared_state
+        heater = self.heater
+        if not self.heater_enabled:
+            heater.off()
+            return
+
+        if power > shared_state.power_threshold:
+            if abs(shared_state.heater_temperature) > self.HEATER_TEMPERATURE_LIMIT:
+                if heater.is_on():
+                    heater.off()
+                shared_state.heater_too_hot = True  # Main loop shows the warning
+            else:
+                shared_state.heater_too_hot = False
+                if not heater.is_on():
+                    heater.on(power)
+            if self.is_element and not shared_state.heater_too_hot:
+                heater.set_power(power)
+        else:
+            shared_state.heater_too_hot = False
+            if heater.is_on():
+                heater.off()  #Maybe we call this no matter what just in case?
+
+    def _record_telemetry(self, reading_time, power):
+        telemetry = self.telemetry
+        self.telemetry_time = reading_time
+        telemetry[self.TELEMETRY_TEMPERATURE] = self.shared_state.heater_temperature
+        telemetry[self.TELEMETRY_RAW_TEMPERATURE] = self.thermocouple.raw_temp
+        telemetry[self.TELEMETRY_SETPOINT] = self.pid.setpoint
+        telemetry[self.TELEMETRY_POWER] = power
+        telemetry[self.TELEMETRY_HEATER_ON] = 1 if self.heater.is_on() else 0
+
+    def telemetry_string(self):
+        # Built outside the timer callback, same fields as the old per tick debug line
+        telemetry = self.telemetry
+        return ','.join(map(str, [self.telemetry_time, telemetry[self.TELEMETRY_TEMPERATURE],
+                                  telemetry[self.TELEMETRY_RAW_TEMPERATURE], telemetry[self.TELEMETRY_SETPOINT],
+                                  telemetry[self.TELEMETRY_POWER], bool(telemetry[self.TELEMETRY_HEATER_ON]),
+                                  self.pid.components]))
@@ -1,8 +1,32 @@
 import utime
 #from customtimer import CustomTimer
 from heaters import HeaterFactory, InductionHeater, ElementHeater
+from telemetryhistory import TieredHistory
+from scrollinggraph import ScrollingGraph
+from errordisplay import ErrorDisplay
+from framegovernor import FrameGovernor
+from labelcache import LabelCache
+from bigfont import BigFont
+from probes import Probes
 
 class DisplayManager:
+
+    # Ids so the scrolling graph knows when a different screen is using it
+    GRAPH_BAR = 1
+    GRAPH_LINE = 2
+    GRAPH_SETPOINT = 3
+    GRAPH_TEMP_WATTS = 4
+    GRAPH_WATTS = 5
+
+    STATS_ROWS = 3          # Probes per page on the stats screen
+    STATS_PAGE_MS = 2000    # Time each page is shown for
+    HEARTBEAT_MS = 70       # Time per step of the heartbeat bar
+    STARTUP_SCREEN_MS = 2000  # Time the startup and watchdog off screens stay up
+
+    # Home screen labels, whole so each line starts with one blit
+    HEATER_LABELS = {True: "H: On", False: "H: Off"}
+    BIG_HEATER_LABELS = {True: "On", False: "Off"}
+    BIG_READING_COLUMN = 64  # Where the home screen text goes with the big reading to its left
     
     def __init__(self, display, shared_state):
     
@@ -11,7 +35,24 @@ class DisplayManager:
         self.shared_state = shared_state
         self.display_heartbeat_y = 0
         self.growing = True
+        self.heartbeat_last = 0
         self.scroll_position = 0
+        self.graph = ScrollingGraph(self.display.width, self.display.height)  # used when shared_state.graph_incremental
+        self.graph_envelope = None
+        self.graph_other_series = None
+        self.graph_min = 0
+        self.graph_y_scale = 1
+        self.error_display = ErrorDisplay(self.display)
+        # Screens are only redrawn when what they show changes, see FrameGovernor
+        self.governor = FrameGovernor(shared_state.display_max_fps, shared_state.display_frame_governor)
+        # Constant text is blitted from pre-rendered tiles, see LabelCache
+        self.labels = None
+        if shared_state.display_label_cache:
+            self.labels = LabelCache()
+            self.labels.preload(shared_state.menu_options)
+        self.big_font = BigFont()
+        self.hold_until = None  # ticks_ms a start up screen stays up until (fast boot), see hold()
+        self.mode_labels = {}  # "M: " + mode, only a handful of modes so each is made once
         self.display.contrast(self.shared_state.display_contrast)
         self.display.rotate(self.shared_state.display_rotate)
 
@@ -19,25 +60,32 @@ class DisplayManager:
 
 
     def display_heartbeat(self):
-        if self.growing:
-            # Grow the rectangle from the top right corner
-            self.display.fill_rect(127, 32 - self.display_heartbeat_y, 1, self.display_heartbeat_y + 1, 1)
-            self.display_heartbeat_y += 1
-            if self.display_heartbeat_y >= 32:
-                self.display_heartbeat_y = 31 # Start shrinking
-                self.growing = False
-        else:
-            # Shrink the rectangle from the bottom
-            self.display.fill_rect(127, 32 - self.display_heartbeat_y, 1, self.display_heartbeat_y + 1, 1) # Ensure the rectangle is drawn before shrinking
-            self.display.fill_rect(127, 32 - (self.display_heartbeat_y + 1), 1, 1, 0) # Clear the bottom pixel
-            self.display_heartbeat_y -= 1
-            if self.display_heartbeat_y <= 0:
-                self.display_heartbeat_y = 0 # Reset to start growing again from the top
-                self.growing = True
-        self.display.show()
+        # Bar in the right hand column growing up from the bottom then shrinking, steps on its own clock
+        # and only draws its column so frames where the screen was not redrawn just send that
+        x = self.display.width - 1
+        height = self.display.height
+        self.display.vline(x, 0, height, 0)
+        if self.display_heartbeat_y:
+            self.display.vline(x, height - self.display_heartbeat_y, self.display_heartbeat_y, 1)
+
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self.heartbeat_last) >= self.HEARTBEAT_MS:
+            self.heartbeat_last = now
+            if self.growing:
+                self.display_heartbeat_y += 1
+                if self.display_heartbeat_y >= height:
+                    self.display_heartbeat_y = height - 1 # Start shrinking
+                    self.growing = False
+            else:
+                self.display_heartbeat_y -= 1
+                if self.display_heartbeat_y <= 0:
+                    self.display_heartbeat_y = 0 # Start growing again
+                    self.growing = True
+        self.display.show_region(x, x)
 
 
     def fill_display(self, text, x=0, y=0, invert=False):
+        self.governor.invalidate()
         self.display.fill(0)
         self.display.text(text, x, y, 1)
         if invert:
@@ -47,103 +95,112 @@ class DisplayManager:
             self.display.invert(False)
 
 
-    def display_error(self, code, message, duration=5, show_countdown=False):
-        message_length = len(message) * 8 # Assuming each character is 8 pixels wide
-        start_time = utime.ticks_ms()
-        scroll_speed = 20 # Time in milliseconds to wait before moving to the next character
-        message_scroll_position = 0
-        code_scroll_position = 0 # Start fully visible on the left
-        message_display_time = (message_length + (128*8)) * scroll_speed # Total time to display the message
-        code_scroll_direction = -1 # Start moving to the left
-
-        while utime.ticks_diff(utime.ticks_ms(), start_time) < message_display_time:
-            self.display.fill(0) # Clear the display
-
-            # Scrolling logic for the code
-            self.display.text(code, code_scroll_position, 0, 1)
-            code_scroll_position += code_scroll_direction
-            if code_scroll_position < -len(code) * 8 - 8 or code_scroll_position > 128: # Adjusted to account for the additional space
-                code_scroll_direction *= -1
-                code_scroll_position = 128 if code_scroll_position < -len(code) * 8 - 8 else 0 # Adjusted to scroll back to the start
-
-            # Scrolling logic for the message
-            self.display.text(message, message_scroll_position, 12, 1)
-            message_scroll_position -= 1
-            if message_scroll_position < -message_length:
-                message_scroll_position = 128
-
-            if show_countdown:
-                elapsed_time = utime.ticks_diff(utime.ticks_ms(), start_time) / 1000 # Convert to seconds
-                remaining_time = duration - elapsed_time
-                countdown_text = f"{int(remaining_time)}s"
-                countdown_length = len(countdown_text) * 8 
-                # Calculate the starting position for the countdown to center it
-                countdown_start_position = (128 - countdown_length) // 2
-                self.display.text(countdown_text, countdown_start_position, 24, 1)
+    def display_error(self, code, message, duration=5, show_countdown=False, priority=ErrorDisplay.PRIORITY_WARNING):
+        # Queues the error and returns straight away, the main loop animates it with update_error()
+        self.error_display.post(code, message, duration, show_countdown, priority)
 
-            self.display.show()
-            utime.sleep_ms(scroll_speed) # Wait for a short period before updating the display again
+    def clear_error(self, code):
+        self.error_display.clear(code)
+
+    def update_error(self):
+        # Draws the next frame of any error being shown, returns True if one is (so skip normal screens)
+        if self.error_display.is_active():
+            self.governor.invalidate()  # Whatever it draws (or clears when done) replaces the screen
+        return self.error_display.step()
 
-        self.display.fill(0)
-        self.display.show()
-        
 
+    def hold(self, ms):
+        # Keeps what is on the display for ms without waiting here, update_display skips the screens
+        # until is_held() goes False
+        self.hold_until = utime.ticks_add(utime.ticks_ms(), ms)
 
-    def show_startup_screen(self):
+    def is_held(self):
+        if self.hold_until is None:
+            return False
+        if utime.ticks_diff(utime.ticks_ms(), self.hold_until) < 0:
+            return True
+        self.hold_until = None
+        self.governor.invalidate()
+        return False
+
+    def show_startup_progress(self, done, total):
+        # Bar along the bottom row filling up as start up goes, under either start up screen
+        y = self.display.height - 1
+        self.display.hline(0, y, self.display.width * done // total, 1)
+        self.display.show()
+
+    def show_startup_screen(self, wait=True):
         # Clear the display and show the first set of messages
+        # wait=False (fast boot) holds it up while start up carries on rather than sleeping
+        self.governor.invalidate()
         self.display.fill(0) 
 
-        self.display.text('Pi Pico',  self.get_centered_text_start_position('Pi Pico'), 0, 1)
-        self.display.text('Heater', self.get_centered_text_start_position('Heater'), 8, 1)
-        self.display.text('Controller', self.get_centered_text_start_position('Controller'), 16, 1)
-        self.display.text('v0.1', self.get_centered_text_start_position('v0.1'), 24, 1)
+        self.draw_label('Pi Pico',  self.get_centered_text_start_position('Pi Pico'), 0)
+        self.draw_label('Heater', self.get_centered_text_start_position('Heater'), 8)
+        self.draw_label('Controller', self.get_centered_text_start_position('Controller'), 16)
+        self.draw_label('v0.1', self.get_centered_text_start_position('v0.1'), 24)
         self.display.show()
-        utime.sleep_ms(2000) # Wait for 2 seconds to display the first set of messages
+        if wait:
+            utime.sleep_ms(self.STARTUP_SCREEN_MS) # Wait for 2 seconds to display the first set of messages
+        else:
+            self.hold(self.STARTUP_SCREEN_MS)
 
-    def show_watchdog_off_screen(self):
+    def show_watchdog_off_screen(self, wait=True):
         # Clear the display and show the first set of messages
+        self.governor.invalidate()
         self.display.fill(0) 
 
-        self.display.text('Warning',  self.get_centered_text_start_position('Warning'), 0, 1)
-        self.display.text('Watchdog', self.get_centered_text_start_position('Watchdog'), 8, 1)
-        self.display.text('OFF', self.get_centered_text_start_position('OFF'), 16, 1)
+        self.draw_label('Warning',  self.get_centered_text_start_position('Warning'), 0)
+        self.draw_label('Watchdog', self.get_centered_text_start_position('Watchdog'), 8)
+        self.draw_label('OFF', self.get_centered_text_start_position('OFF'), 16)
         self.display.show()
-        utime.sleep_ms(2000) # Wait for 2 seconds to display the first set of messages
+        if wait:
+            utime.sleep_ms(self.STARTUP_SCREEN_MS) # Wait for 2 seconds to display the first set of messages
+        else:
+            self.hold(self.STARTUP_SCREEN_MS)
 
     def show_screen_graph_bar(self):
+        if not self.graph_frame_due("graph_bar"):
+            return
 
         self.display.fill(0)
 
-        temperature_readings = self.shared_state.temperature_readings
+        temperature_readings = self.get_graph_series(self.shared_state.temperature_history)
         if not temperature_readings:
-            self.display.text("No data yet", 0, 0, 1)
+            self.draw_label("No data yet", 0, 0)
             self.display.show()
             return
         
-        # Calculate min and max temperatures once
-        min_temp = min(temperature_readings.values())
-        max_temp = max(temperature_readings.values())
+        # Min and max are kept up to date by the ring buffer
+        min_temp = temperature_readings.min_value()
+        max_temp = temperature_readings.max_value()
         temp_range = max_temp - min_temp
         if temp_range == 0: temp_range = 1
         display_height = self.display.height
-
-        # Calculate min and max times once
-        min_time = min(temperature_readings.keys())
-        max_time = max(temperature_readings.keys())
-        x_range = max_time - min_time
-        if x_range == 0: x_range = 1
-        
-        x_scale = self.display.width / x_range
         y_scale = display_height / temp_range
 
-        for time, temp in temperature_readings.items():
-            x = int((time - min_time) * x_scale)
-            y = display_height - int((temp - min_temp) * y_scale)
+        if self.shared_state.graph_incremental:
+            self.graph_min = min_temp
+            self.graph_y_scale = y_scale
+            self.graph.update(self.GRAPH_BAR, temperature_readings, min_temp, max_temp, self.draw_graph_bar_column)
+            self.graph.blit_to(self.display)
+        else:
+            min_time = temperature_readings.oldest_time()
+            x_range = temperature_readings.time_span()
+            if x_range == 0: x_range = 1
+
+            x_scale = self.display.width / x_range
 
-            # Draw a rectangle for each temperature reading
-            self.display.fill_rect(x, y, 1, int(temp * y_scale), 1)
+            for i in range(len(temperature_readings)):
+                x = int(utime.ticks_diff(temperature_readings.time_at(i), min_time) * x_scale)
+                temp = temperature_readings.value_at(i)
+                y = display_height - int((temp - min_temp) * y_scale)
 
-        last_time, last_temp = max(temperature_readings.items(), key=lambda item: item[0])
+                # Draw a rectangle for each temperature reading
+                self.display.fill_rect(x, y, 1, int(temp * y_scale), 1)
+
+        last_temp = self.shared_state.temperature_readings.latest()
+        self.draw_graph_big_reading(last_temp, BigFont.CELSIUS)
 
         #last_temp_str = f"{last_temp:.1f}" # Adjust the precision as needed
         last_temp_str = str(last_temp) + "C"
@@ -151,7 +208,7 @@ class DisplayManager:
         #text_x = self.display.width - len(last_temp_str) * 6 # Adjust the multiplier based on the text size
         #text_y = self.display.height - 8 # Adjust the offset based on the text size
 
-        t = last_temp_str
+        t = self.get_graph_label(last_temp_str)
         # Now have an LED to indicate we are in session/manual mode so lets save screen space
         #if self.shared_state.get_mode() == "Session":
         #    t = t + " Session: " + str(int((self.shared_state.session_timeout - self.shared_state.get_session_mode_duration())/1000))
@@ -163,54 +220,85 @@ class DisplayManager:
 
         self.display.show()
 
+    def draw_graph_bar_column(self, fb, series, i, x):
+        temp = series.value_at(i)
+        y = self.graph.height - int((temp - self.graph_min) * self.graph_y_scale)
+        fb.fill_rect(x, y, 1, int(temp * self.graph_y_scale), 1)
+
         
     def show_screen_graph_line(self):
+        if not self.graph_frame_due("graph_line"):
+            return
         self.display.fill(0)
 
-        temperature_readings = self.shared_state.temperature_readings
+        temperature_readings = self.get_graph_series(self.shared_state.temperature_history)
         if not temperature_readings:
-            self.display.text("No data yet", 0, 0, 1)
+            self.draw_label("No data yet", 0, 0)
             self.display.show()
             return
 
-        min_time = min(temperature_readings.keys())
-        max_time = max(temperature_readings.keys())
-        x_range = max_time - min_time
-        if x_range == 0: x_range = 1
+        # For the longer spans also show the min/max range of each bucket
+        envelope = self.shared_state.temperature_history.envelope(self.shared_state.graph_span)
 
-        x_scale = self.display.width / x_range
+        if self.shared_state.graph_incremental:
+            self.graph_envelope = envelope
+            self.graph.update(self.GRAPH_LINE, temperature_readings, 0, 0, self.draw_graph_line_column)
+            self.graph.blit_to(self.display)
+        else:
+            min_time = temperature_readings.oldest_time()
+            x_range = temperature_readings.time_span()
+            if x_range == 0: x_range = 1
 
-        for time, temp in temperature_readings.items():
-            x = int((time - min_time) * x_scale)
-            y = self.display.height - int(temp / 10) # Adjust the y-coordinate to represent each pixel as 10°C
+            x_scale = self.display.width / x_range
 
-            # Draw a single pixel for each temperature reading
-            self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
+            for i in range(len(temperature_readings)):
+                x = int(utime.ticks_diff(temperature_readings.time_at(i), min_time) * x_scale)
+                y = self.display.height - int(temperature_readings.value_at(i) / 10) # Adjust the y-coordinate to represent each pixel as 10°C
 
-        last_time, last_temp = max(temperature_readings.items(), key=lambda item: item[0])
-        last_temp_str = str(last_temp) + "C"
+                # Draw a single pixel for each temperature reading
+                self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
+
+            if envelope:
+                low_readings, high_readings = envelope
+                for i in range(len(high_readings)):
+                    x = int(utime.ticks_diff(high_readings.time_at(i), min_time) * x_scale)
+                    y = self.display.height - int(high_readings.value_at(i) / 10)
+                    self.display.vline(x, y, int((high_readings.value_at(i) - low_readings.value_at(i)) / 10) + 1, 1)
+
+        last_temp_str = str(self.shared_state.temperature_readings.latest()) + "C"
 
         # Draw dotted setpoint line
         setpoint_y = self.display.height - int(self.shared_state.setpoint / 10) # Calculate the y-coordinate for the checkpoint
         dot_spacing = 4 # Adjust this value to change the spacing between dots
         for x in range(0, self.display.width, dot_spacing):
             self.display.pixel(x, setpoint_y, 1) 
+        self.draw_graph_big_reading(self.shared_state.temperature_readings.latest(), BigFont.CELSIUS)
             
         # Display the last temperature reading and other information
-        t = last_temp_str
+        t = self.get_graph_label(last_temp_str)
         # Now have an LED to indicate we are in session/manual mode so lets save screen space
         #if self.shared_state.get_mode() == "Session":
         #    t = t + " Session: " + str(int((self.shared_state.session_timeout - self.shared_state.get_session_mode_duration())/1000))
         self.display.text(t, 0, 0, 1)
 
         self.display.show()
+
+    def draw_graph_line_column(self, fb, series, i, x):
+        height = self.graph.height
+        fb.pixel(x, height - int(series.value_at(i) / 10), 1)
+        if self.graph_envelope:
+            low_readings, high_readings = self.graph_envelope
+            y = height - int(high_readings.value_at(i) / 10)
+            fb.vline(x, y, int((high_readings.value_at(i) - low_readings.value_at(i)) / 10) + 1, 1)
             
     def show_screen_graph_setpoint(self):
+        if not self.graph_frame_due("graph_setpoint"):
+            return
         self.display.fill(0)
 
-        temperature_readings = self.shared_state.temperature_readings
+        temperature_readings = self.get_graph_series(self.shared_state.temperature_history)
         if not temperature_readings:
-            self.display.text("No data yet", 0, 0, 1)
+            self.draw_label("No data yet", 0, 0)
             self.display.show()
             return
 
@@ -220,14 +308,24 @@ class DisplayManager:
 
         setpoint_y = display_height // 2 # Setpoint is in the middle of the screen
 
-        for time, temp in temperature_readings.items():
-            x = int((time - min(temperature_readings.keys())) * (self.display.width / (max(temperature_readings.keys()) - min(temperature_readings.keys()))))
-            # Calculate the y-coordinate relative to the setpoint
-            y = (setpoint_y + (temp - setpoint) * -1)
-            # Ensure y-coordinate does not go below 0 or above the display height
-            #y = max(min(y, display_height - 1), 0)
-            if abs(temp - setpoint) < zoom_range:
-                self.display.pixel(x, y, 1) # Draw the pixel
+        if self.shared_state.graph_incremental:
+            self.graph.update(self.GRAPH_SETPOINT, temperature_readings, setpoint, 0, self.draw_graph_setpoint_column)
+            self.graph.blit_to(self.display)
+        else:
+            min_time = temperature_readings.oldest_time()
+            x_range = temperature_readings.time_span()
+            if x_range == 0: x_range = 1
+            x_scale = self.display.width / x_range
+
+            for i in range(len(temperature_readings)):
+                x = int(utime.ticks_diff(temperature_readings.time_at(i), min_time) * x_scale)
+                temp = temperature_readings.value_at(i)
+                # Calculate the y-coordinate relative to the setpoint
+                y = int(setpoint_y + (temp - setpoint) * -1)
+                # Ensure y-coordinate does not go below 0 or above the display height
+                #y = max(min(y, display_height - 1), 0)
+                if abs(temp - setpoint) < zoom_range:
+                    self.display.pixel(x, y, 1) # Draw the pixel
 
         # Draw dotted setpoint line
         dot_spacing = 4
@@ -241,71 +339,79 @@ class DisplayManager:
 #        for x in range(0, self.display.width, dot_spacing):
 #            self.display.pixel(x, setpoint_y, 1)
 
-        last_time, last_temp = max(temperature_readings.items(), key=lambda item: item[0])
-        t = str(last_temp) + "C"
+        self.draw_graph_big_reading(self.shared_state.temperature_readings.latest(), BigFont.CELSIUS)
+        t = str(self.shared_state.temperature_readings.latest()) + "C"
 
         # Now have an LED to indicate we are in session/manual mode so lets save screen space
         #if self.shared_state.get_mode() == "Session":
         #    t = t + " Session: " + str(int((self.shared_state.session_timeout - self.shared_state.get_session_mode_duration())/1000))
 
-        self.display.text(t, 0, 0, 1)
+        self.display.text(self.get_graph_label(t), 0, 0, 1)
         
         t = "SP:" + str(self.shared_state.setpoint) + "C"
         self.display.text(t, 0, 24, 1)
         
         self.display.show()
 
+    def draw_graph_setpoint_column(self, fb, series, i, x):
+        setpoint = self.shared_state.setpoint
+        temp = series.value_at(i)
+        if abs(temp - setpoint) < 15:
+            fb.pixel(x, int(self.graph.height // 2 + (temp - setpoint) * -1), 1)
+
 
     def show_screen_temp_watts_line(self):
+        if not self.graph_frame_due("temp_watts_line"):
+            return
         self.display.fill(0)
 
-        watt_readings = self.shared_state.watt_readings
+        watt_readings = self.get_graph_series(self.shared_state.watt_history)
         if not watt_readings:
-            self.display.text("No data yet", 0, 0, 1)
+            self.draw_label("No data yet", 0, 0)
             self.display.show()
             return
 
-        temperature_readings = self.shared_state.temperature_readings
+        temperature_readings = self.get_graph_series(self.shared_state.temperature_history)
         if not temperature_readings:
-            self.display.text("No data yet", 0, 0, 1)
+            self.draw_label("No data yet", 0, 0)
             self.display.show()
             return
 
-        min_time = min(watt_readings.keys())
-        max_time = max(watt_readings.keys())
-        x_range = max_time - min_time
-        if x_range == 0: x_range = 1
-
-        x_scale = self.display.width / x_range
-        y_scale = self.shared_state.max_watts / self.display.height
-        for time, watt in watt_readings.items():
-            x = int((time - min_time) * x_scale)
-            y = self.display.height - int(watt / y_scale) # Adjust the y-coordinate to represent each pixel as 10W
-
-            # Draw a single pixel for each watt reading
-            self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
+        if self.shared_state.graph_incremental:
+            # Both histories are appended together so the same index is the same sample in each
+            self.graph_other_series = temperature_readings
+            self.graph.update(self.GRAPH_TEMP_WATTS, watt_readings, self.shared_state.max_watts, 0, self.draw_graph_temp_watts_column)
+            self.graph.blit_to(self.display)
+        else:
+            min_time = watt_readings.oldest_time()
+            x_range = watt_readings.time_span()
+            if x_range == 0: x_range = 1
 
-        last_time, last_watt = max(watt_readings.items(), key=lambda item: item[0])
-        last_watts_str = str(last_watt) + "W"
+            x_scale = self.display.width / x_range
+            y_scale = self.shared_state.max_watts / self.display.height
+            for i in range(len(watt_readings)):
+                x = int(utime.ticks_diff(watt_readings.time_at(i), min_time) * x_scale)
+                y = self.display.height - int(watt_readings.value_at(i) / y_scale) # Adjust the y-coordinate to represent each pixel as 10W
 
+                # Draw a single pixel for each watt reading
+                self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
 
-        min_time = min(temperature_readings.keys())
-        max_time = max(temperature_readings.keys())
-        x_range = max_time - min_time
-        if x_range == 0: x_range = 1
+            min_time = temperature_readings.oldest_time()
+            x_range = temperature_readings.time_span()
+            if x_range == 0: x_range = 1
 
-        x_scale = self.display.width / x_range
+            x_scale = self.display.width / x_range
 
-        for time, temp in temperature_readings.items():
-            x = int((time - min_time) * x_scale)
-            y = self.display.height - int(temp / 10) # Adjust the y-coordinate to represent each pixel as 10°C
+            for i in range(len(temperature_readings)):
+                x = int(utime.ticks_diff(temperature_readings.time_at(i), min_time) * x_scale)
+                y = self.display.height - int(temperature_readings.value_at(i) / 10) # Adjust the y-coordinate to represent each pixel as 10°C
 
-            # Draw a dotted line
-            if(x % 2) == 0:
-                self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
+                # Draw a dotted line
+                if(x % 2) == 0:
+                    self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
 
-        last_time, last_temp = max(temperature_readings.items(), key=lambda item: item[0])
-        last_temp_str = str(last_temp) + "C"
+        last_watts_str = str(self.shared_state.watt_readings.latest()) + "W"
+        last_temp_str = str(self.shared_state.temperature_readings.latest()) + "C"
 
         # Draw dotted setpoint line
         setpoint_y = self.display.height - int(self.shared_state.setpoint / 10) # Calculate the y-coordinate for the checkpoint
@@ -314,36 +420,48 @@ class DisplayManager:
             self.display.pixel(x, setpoint_y, 1) 
             
         t = last_temp_str + " " + last_watts_str
-        self.display.text(t, 0, 0, 1)
+        self.display.text(self.get_graph_label(t), 0, 0, 1)
 
         self.display.show()
+
+    def draw_graph_temp_watts_column(self, fb, series, i, x):
+        height = self.graph.height
+        fb.pixel(x, height - int(series.value_at(i) / (self.shared_state.max_watts / height)), 1)
+        temperature_readings = self.graph_other_series
+        if i < len(temperature_readings) and (series.appended - len(series) + i) % 2 == 0:
+            # Dotted temperature line, dots follow the sample not the column so they scroll with it
+            fb.pixel(x, height - int(temperature_readings.value_at(i) / 10), 1)
         
 
     def show_screen_watts_line(self):
+        if not self.graph_frame_due("watts_line"):
+            return
         self.display.fill(0)
 
-        watt_readings = self.shared_state.watt_readings
+        watt_readings = self.get_graph_series(self.shared_state.watt_history)
         if not watt_readings:
-            self.display.text("No data yet", 0, 0, 1)
+            self.draw_label("No data yet", 0, 0)
             self.display.show()
             return
 
-        min_time = min(watt_readings.keys())
-        max_time = max(watt_readings.keys())
-        x_range = max_time - min_time
-        if x_range == 0: x_range = 1
+        if self.shared_state.graph_incremental:
+            self.graph.update(self.GRAPH_WATTS, watt_readings, self.shared_state.max_watts, 0, self.draw_graph_watts_column)
+            self.graph.blit_to(self.display)
+        else:
+            min_time = watt_readings.oldest_time()
+            x_range = watt_readings.time_span()
+            if x_range == 0: x_range = 1
 
-        x_scale = self.display.width / x_range
-        y_scale = self.shared_state.max_watts / self.display.height
-        for time, watt in watt_readings.items():
-            x = int((time - min_time) * x_scale)
-            y = self.display.height - int(watt / y_scale) # Adjust the y-coordinate to represent each pixel as 10W
+            x_scale = self.display.width / x_range
+            y_scale = self.shared_state.max_watts / self.display.height
+            for i in range(len(watt_readings)):
+                x = int(utime.ticks_diff(watt_readings.time_at(i), min_time) * x_scale)
+                y = self.display.height - int(watt_readings.value_at(i) / y_scale) # Adjust the y-coordinate to represent each pixel as 10W
 
-            # Draw a single pixel for each watt reading
-            self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
+                # Draw a single pixel for each watt reading
+                self.display.pixel(x, y, 1) # Assuming 1 is the color for the pixel
 
-        last_time, last_watt = max(watt_readings.items(), key=lambda item: item[0])
-        last_watts_str = str(last_watt) + "W"
+        last_watts_str = str(self.shared_state.watt_readings.latest()) + "W"
 
         # Draw dotted setpoint line
 #        setpoint_y = self.display.height - int(self.shared_state.setpoint / 10) # Calculate the y-coordinate for the checkpoint
@@ -351,30 +469,109 @@ class DisplayManager:
 #        for x in range(0, self.display.width, dot_spacing):
 #            self.display.pixel(x, setpoint_y, 1) 
             
+        self.draw_graph_big_reading(self.shared_state.watt_readings.latest(), BigFont.WATTS)
+
         # Display the last watt reading and other information
-        t = last_watts_str
+        t = self.get_graph_label(last_watts_str)
         self.display.text(t, 0, 0, 1)
 
         self.display.show()
+
+    def draw_graph_watts_column(self, fb, series, i, x):
+        height = self.graph.height
+        fb.pixel(x, height - int(series.value_at(i) / (self.shared_state.max_watts / height)), 1)
         
         
     def show_screen_pi_temperature(self):
+        governor = self.governor
+        governor.begin("pi_temperature")
+        governor.value(self.shared_state.pi_temperature)
+        if not governor.due():
+            return
         value = str(self.shared_state.pi_temperature) + "C"
         self.show_standard_screen("PI Temperature",value)
 
     def show_screen_display_contrast(self):
+        governor = self.governor
+        governor.begin("display_contrast")
+        governor.value(self.shared_state.display_contrast)
+        if not governor.due():
+            return
         self.display.contrast(self.shared_state.display_contrast)  # Set contast to current value
         self.show_standard_screen("Display Contrast",str(self.shared_state.display_contrast))
         
+    def show_screen_stats(self):
+        # Refresh rate then min/avg/max of each probe that has run, a few at a time - the serial "stats" command has the lot
+        probes = self.shared_state.probes
+        used = [probe for probe in range(len(probes.names)) if probes.counts[probe]]
+        pages = max(1, (len(used) + self.STATS_ROWS - 1) // self.STATS_ROWS)
+        page = (utime.ticks_ms() // self.STATS_PAGE_MS) % pages
+
+        governor = self.governor
+        governor.begin("stats")
+        governor.value(page)
+        governor.value(pages)
+        governor.value(self.shared_state.refresh_rate)
+        governor.value(probes.counts[Probes.PID])  # New samples at least every pid tick
+        if not governor.due():
+            return
+
+        self.display.fill(0)
+        self.display.text("{:.1f}Hz".format(self.shared_state.refresh_rate), 0, 0, 1)
+        t = str(page + 1) + "/" + str(pages)
+        self.display.text(t, self.display.width - len(t) * 8, 0, 1)
+        y = 8
+        for probe in used[page * self.STATS_ROWS:(page + 1) * self.STATS_ROWS]:
+            # 16 characters - name, avg and max in ms to 1 decimal place
+            t = "{:6}{:5.1f}{:5.1f}".format(probes.names[probe][:6], probes.average(probe) / 1000, probes.maximums[probe] / 1000)
+            self.display.text(t, 0, y, 1)
+            y += 8
+        self.display.show()
+
     def show_standard_screen(self,text,value):
         self.display.fill(0)
-        self.display.text(text,  self.get_centered_text_start_position(text), 0, 1)
+        self.draw_label(text,  self.get_centered_text_start_position(text), 0)
         self.display.text(value, self.get_centered_text_start_position(value), 10, 1)
         self.display.show()
         #utime.sleep_ms(5000)
         #self.shared_state.current_menu_position = 1 # Set next sceen to Main 
     
 
+    def graph_frame_due(self, screen):
+        # Graphs change with a new sample (temperature and watts are appended together), the span or the setpoint line
+        shared_state = self.shared_state
+        governor = self.governor
+        governor.begin(screen)
+        governor.value(shared_state.temperature_readings.appended)
+        governor.value(shared_state.watt_readings.appended)
+        governor.value(shared_state.graph_span)
+        governor.value(shared_state.graph_incremental)
+        governor.value(shared_state.setpoint)
+        return governor.due()
+
+    def draw_graph_big_reading(self, value, units):
+        # Latest reading in the big font in the top right corner of a graph, left of the heartbeat column
+        if self.shared_state.graph_big_reading:
+            self.big_font.draw(self.display, int(value), units, self.display.width - 2, 0, True, True)
+
+    def get_graph_series(self, history):
+        # Raw samples or one of the downsampled tiers depending on the selected graph span
+        return history.series(self.shared_state.graph_span)
+
+    def get_graph_label(self, text):
+        if self.shared_state.graph_span == 0:
+            return text
+        return text + " " + TieredHistory.SPAN_LABELS[self.shared_state.graph_span]
+
+    def draw_label(self, text, x, y, bold=False):
+        # For text from a fixed set, anything else goes straight to display.text()
+        if self.labels:
+            self.labels.blit(self.display, text, x, y, bold)
+        else:
+            self.display.text(text, x, y, 1)
+            if bold:
+                self.display.text(text, x + 1, y, 1)
+
     def get_centered_text_start_position(self, text):
         display_width = self.display.width
         text_width = len(text) * 6
@@ -382,26 +579,53 @@ class DisplayManager:
 
 
     def show_screen_home_screen(self, pid_components, heater):
-        self.display.fill(0)
         shared_state = self.shared_state
-        if shared_state.temperature_units == 'F':
-            t = "T: " + str(int(32 + (1.8 * shared_state.heater_temperature))) + "F (" + str(int(32 + (1.8 * shared_state.setpoint))) + "F)"
+        p, i, d = pid_components
+        mode = shared_state.get_mode()
+        governor = self.governor
+        governor.begin("home_screen")
+        governor.value(int(shared_state.heater_temperature))
+        governor.value(shared_state.setpoint)
+        governor.value(mode)
+        if mode == "Session":
+            governor.value((shared_state.session_timeout - shared_state.get_session_mode_duration()) // 1000)
         else:
-            t = "T: " + str(int(shared_state.heater_temperature)) + "C (" + str(int(shared_state.setpoint)) + "C)"
-        self.display.text(t, 0, 0)
+            governor.value(0)
+        governor.value(heater.is_on())
+        governor.value(shared_state.watts)
+        governor.value(round(p * 10))  # At the precision they are shown
+        governor.value(round(i * 100))
+        governor.value(round(d * 100))
+        governor.value(round(heater.get_power() * 10) if heater.is_on() and isinstance(heater, ElementHeater) else 0)
+        if not governor.due():
+            return
 
-        if heater.is_on():
-            t = "H: On"
+        self.display.fill(0)
+        if shared_state.home_big_reading:
+            self.draw_home_big_reading(heater)
         else:
-            t = "H: Off"
-        if isinstance(heater, ElementHeater):
-            t = t + " P: " + str(shared_state.watts) + "W"
-
-        self.display.text(t, 0, 8)
-
-        t = "M: " + shared_state.get_mode()
-        if shared_state.get_mode() == "Session":
-            t = t + " " + str(int((shared_state.session_timeout - shared_state.get_session_mode_duration())/1000)) + "s"
+            self.draw_label("T: ", 0, 0)
+            if shared_state.temperature_units == 'F':
+                t = str(int(32 + (1.8 * shared_state.heater_temperature))) + "F (" + str(int(32 + (1.8 * shared_state.setpoint))) + "F)"
+            else:
+                t = str(int(shared_state.heater_temperature)) + "C (" + str(int(shared_state.setpoint)) + "C)"
+            self.display.text(t, 24, 0)
+
+            t = self.HEATER_LABELS[heater.is_on()]
+            self.draw_label(t, 0, 8)
+            if isinstance(heater, ElementHeater):
+                x = len(t) * 8
+                self.draw_label(" P: ", x, 8)
+                self.display.text(str(shared_state.watts) + "W", x + 32, 8)
+
+        t = self.mode_labels.get(mode)
+        if t is None:
+            t = self.mode_labels[mode] = "M: " + mode
+        self.draw_label(t, 0, 16)
+        if mode == "Session":
+            x = len(t) * 8
+            t = " " + str(int((shared_state.session_timeout - shared_state.get_session_mode_duration())/1000)) + "s"
+            self.display.text(t, x, 16)
 
         # Add PI temperature to menu somewhere
         #pi_temperature = shared_state.get_pi_temperature()
@@ -410,21 +634,37 @@ class DisplayManager:
         #else:
         #    t = "Mode: " + str(int(pi_temperature)) + "C"
         
-        self.display.text(t, 0, 16)
-        
-        p, i, d = pid_components
         if d > 0:
             t = "{:.1f} {:.2f} {:.2f}".format(p, i, d)
         else:
             t = "{:.1f} {:.1f}".format(p, i)
-        if heater.is_on() and isinstance(heater, ElementHeater):
-            t = t + " P: " + "{:.1f}".format(heater.get_power())
-            
         self.display.text(t, 0, 24)
+        if heater.is_on() and isinstance(heater, ElementHeater):
+            x = len(t) * 8
+            self.draw_label(" P: ", x, 24)
+            self.display.text("{:.1f}".format(heater.get_power()), x + 32, 24)
+        self.display.show()
 
 
 
+    def draw_home_big_reading(self, heater):
+        # Temperature in the big font over the top two lines, the setpoint and heater to its right
+        shared_state = self.shared_state
+        if shared_state.temperature_units == 'F':
+            self.big_font.draw(self.display, int(32 + (1.8 * shared_state.heater_temperature)), BigFont.FAHRENHEIT, 0, 0)
+            t = "(" + str(int(32 + (1.8 * shared_state.setpoint))) + "F)"
+        else:
+            self.big_font.draw(self.display, int(shared_state.heater_temperature), BigFont.CELSIUS, 0, 0)
+            t = "(" + str(int(shared_state.setpoint)) + "C)"
+        self.display.text(t, self.BIG_READING_COLUMN, 0)
+
+        t = self.BIG_HEATER_LABELS[heater.is_on()]
+        self.draw_label(t, self.BIG_READING_COLUMN, 8)
+        if isinstance(heater, ElementHeater):
+            self.display.text(str(shared_state.watts) + "W", self.BIG_READING_COLUMN + (len(t) + 1) * 8, 8)
+
     def show_screen_menu(self):
+        self.governor.invalidate()  # The menu is drawn as it is moved through, not governed
         self.display.fill(0)
 
         # Calculate the range to ensure the selected option is always in the middle
@@ -442,23 +682,7 @@ class DisplayManager:
         # Display the options within the calculated range
         for i in range(start_index, end_index):
             y_position = (i - start_index) * 8
-            if i == self.shared_state.current_menu_position:
-                # Simulate boldness by displaying the text twice, slightly offset
-                self.display.text(self.shared_state.menu_options[i], 0, y_position, 1)
-                self.display.text(self.shared_state.menu_options[i], 1, y_position, 1)   # Pretend bold
-                self.display.text(self.shared_state.menu_options[i], 1, y_position+1, 1) # Pretend bold
-            else:
-                self.display.text(self.shared_state.menu_options[i], 0, y_position, 1)
+            # Selected option in bold
+            self.draw_label(self.shared_state.menu_options[i], 0, y_position, i == self.shared_state.current_menu_position)
 
         self.display.show()
-
-
-
-
-    def display_screen(self, option):
-        method_name = f"show_screen_{option}"
-        method = getattr(self, method_name, None)
-        if method:
-            method()
-        else:
-            print(f"No method found for option: {option}")
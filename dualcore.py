@@ -0,0 +1,174 @@
+import _thread
+import utime
+from array import array
+from controlloop import ControlLoop
+from mailbox import Mailbox
+
+class DualCoreControlLoop(ControlLoop):
+    # ControlLoop run on the second core in its own thread so display transfers and the UI on core 0
+    # can't hold up a tick.
+    #
+    # Core 0 only talks to it through two mailboxes: setpoint/mode go in, samples come back out and are
+    # added to the histories by sync() in the main loop, so the graphs are never read while being written.
+    # Simple values (heater_temperature, fault flags) are still set straight on shared_state.
+    #
+    # Pausing, resuming, resetting the pid and switching the heater off go in as commands with the
+    # setpoint/mode, so only core 1 ever touches the pid and the heater once it is running. Core 1 looks
+    # at the inbox every COMMAND_POLL_MS while it waits for the next tick and acknowledges each record
+    # with its sequence number, pause() and heater_off() wait for that so the heater is off when they return.
+    # The inbox only has the one producer, so these and sync() are only called from the main loop - timer
+    # callbacks set a flag on shared_state for the supervisor instead.
+
+    # inbox fields
+    INPUT_SETPOINT = 0
+    INPUT_HEATER_ENABLED = 1
+    INPUT_COMMANDS = 2
+    INPUT_SEQUENCE = 3
+
+    # commands, bits of INPUT_COMMANDS
+    COMMAND_PAUSE = 1
+    COMMAND_RESUME = 2
+    COMMAND_RESET_PID = 4
+    COMMAND_HEATER_OFF = 8
+
+    COMMAND_POLL_MS = 10
+    ACK_TIMEOUT_MS = 100
+
+    # outbox fields
+    SAMPLE_TIME = 0
+    SAMPLE_TEMPERATURE = 1
+    SAMPLE_WATTS = 2
+
+    def __init__(self, pid, heater, thermocouple, shared_state):
+        super().__init__(pid, heater, thermocouple, shared_state)
+        print("DualCoreControlLoop Initialising ...")
+        self.inbox = Mailbox(4, 4)
+        self.outbox = Mailbox(16, 3)
+        self._input = array('i', [0, 0, 0, 0])
+        self._sent_input = array('i', [-1, -1, 0, 0])
+        self._sequence = 0              # Last record sent - core 0 only
+        self._pending_commands = 0      # Not sent yet as the inbox was full - core 0 only
+        self._acknowledged = array('i', [0])  # Last record core 1 has acted on - core 1 only writes it
+        self._sample_out = array('i', [0, 0, 0])
+        self._sample_in = array('i', [0, 0, 0])
+        self.period_ms = 0
+        self.running = False
+        self.overruns = 0
+        self.max_late_ms = 0
+        print("DualCoreControlLoop initialised.")
+
+    def start(self, period_ms):
+        self.period_ms = period_ms
+        self.sync()  # Make sure the first tick has the current setpoint and mode
+        self.running = True
+        _thread.start_new_thread(self._run, ())
+
+    # Core 0 - doing any of these from here could race a tick on core 1, so they are sent to it
+    def pause(self):
+        if not self._command(self.COMMAND_PAUSE, True): ControlLoop.pause(self)
+
+    def resume(self):
+        if not self._command(self.COMMAND_RESUME, False): ControlLoop.resume(self)
+
+    def reset_pid(self):
+        if not self._command(self.COMMAND_RESET_PID, False): ControlLoop.reset_pid(self)
+
+    def heater_off(self):
+        if not self._command(self.COMMAND_HEATER_OFF, True): ControlLoop.heater_off(self)
+
+    def _command(self, command, wait):
+        # Returns False if core 1 is not running so the caller can do it here
+        if not self.running:
+            return False
+        sequence = self._send(command)
+        if not wait:
+            return True  # Goes with the next sync() if the inbox was full
+        deadline = utime.ticks_add(utime.ticks_ms(), self.ACK_TIMEOUT_MS)
+        while sequence < 0 or self._acknowledged[0] < sequence:
+            if utime.ticks_diff(utime.ticks_ms(), deadline) >= 0:
+                self.heater.off()  # Core 1 is not answering, better to race it than leave the heater on
+                print("DualCoreControlLoop: no answer from core 1, heater switched off from core 0")
+                return True
+            utime.sleep_ms(1)
+            if sequence < 0: sequence = self._send(0)
+        return True
+
+    def _send(self, commands):
+        # Core 0 - current setpoint/mode with any commands, returns the record's sequence or -1 if the inbox was full
+        shared_state = self.shared_state
+        self._pending_commands |= commands
+        sent = self._sent_input
+        sent[self.INPUT_SETPOINT] = int(shared_state.setpoint)
+        sent[self.INPUT_HEATER_ENABLED] = 0 if shared_state.get_mode() == "Off" else 1
+        sent[self.INPUT_COMMANDS] = self._pending_commands
+        sent[self.INPUT_SEQUENCE] = self._sequence + 1
+        if not self.inbox.put(sent):
+            sent[self.INPUT_SETPOINT] = -1  # Full, try again next time
+            return -1
+        self._sequence += 1
+        self._pending_commands = 0
+        return self._sequence
+
+    def _run(self):
+        # Core 1 - fixed rate against absolute deadlines, waits out the rest of each period on the inbox
+        next_due = utime.ticks_ms()
+        while self.running:
+            late = utime.ticks_diff(utime.ticks_ms(), next_due)
+            if late > self.max_late_ms: self.max_late_ms = late
+            self._receive()
+            self.tick()
+
+            next_due = utime.ticks_add(next_due, self.period_ms)
+            if -utime.ticks_diff(next_due, utime.ticks_ms()) > self.period_ms:
+                self.overruns += 1
+                next_due = utime.ticks_ms()
+            while True:
+                delay = utime.ticks_diff(next_due, utime.ticks_ms())
+                if delay <= 0:
+                    break
+                utime.sleep_ms(min(delay, self.COMMAND_POLL_MS))
+                self._receive()
+        self.heater.off()
+
+    def _receive(self):
+        # Core 1 - commands in the order they were sent, only the latest setpoint/mode matter
+        record = self._input
+        received = False
+        while self.inbox.get(record):
+            received = True
+            commands = record[self.INPUT_COMMANDS]
+            if commands & self.COMMAND_PAUSE: ControlLoop.pause(self)
+            if commands & self.COMMAND_RESUME: ControlLoop.resume(self)
+            if commands & self.COMMAND_RESET_PID: self.pid.reset()
+            if commands & self.COMMAND_HEATER_OFF: self.heater.off()
+        if not received:
+            return
+        setpoint = record[self.INPUT_SETPOINT]
+        if self.pid.setpoint != setpoint: self.pid.setpoint = setpoint
+        self.heater_enabled = record[self.INPUT_HEATER_ENABLED] == 1
+        self._acknowledged[0] = record[self.INPUT_SEQUENCE]
+
+    def _read_inputs(self):
+        pass  # _receive() has them from the inbox before each tick
+
+    def _publish(self, reading_time, temperature, watts):
+        sample = self._sample_out
+        sample[self.SAMPLE_TIME] = reading_time
+        sample[self.SAMPLE_TEMPERATURE] = int(temperature)
+        sample[self.SAMPLE_WATTS] = watts
+        self.outbox.put(sample)
+
+    def sync(self):
+        # Core 0 - call from the main loop. Sends setpoint/mode when they change and takes in new samples
+        shared_state = self.shared_state
+        setpoint = int(shared_state.setpoint)
+        heater_enabled = 0 if shared_state.get_mode() == "Off" else 1
+        sent = self._sent_input
+        if sent[self.INPUT_SETPOINT] != setpoint or sent[self.INPUT_HEATER_ENABLED] != heater_enabled or self._pending_commands:
+            self._send(0)
+
+        sample = self._sample_in
+        while self.outbox.get(sample):
+            shared_state.temperature_history.append(sample[self.SAMPLE_TIME], sample[self.SAMPLE_TEMPERATURE])
+            shared_state.watts = sample[self.SAMPLE_WATTS]
+            shared_state.watt_history.append(sample[self.SAMPLE_TIME], sample[self.SAMPLE_WATTS])
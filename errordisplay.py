@@ -0,0 +1,137 @@
+import utime
+
+class ErrorDisplay:
+    # Queued error messages shown as a scrolling animation, one frame per call to step()
+    # so timers and the main loop never wait on an error being shown.
+    # Higher priority errors interrupt lower ones, posting a code that is already showing/queued
+    # just updates its message and restarts its time rather than queuing it again.
+
+    PRIORITY_INFO = 0
+    PRIORITY_WARNING = 1
+    PRIORITY_FATAL = 2    # Never times out, stays up until cleared
+
+    MAX_QUEUED = 4
+    SCROLL_SPEED = 20     # ms per pixel of scrolling
+
+    # Entry fields
+    _CODE = 0
+    _MESSAGE = 1
+    _DURATION = 2
+    _COUNTDOWN = 3
+    _PRIORITY = 4
+    _START = 5
+
+    def __init__(self, display):
+        self.display = display
+        self.active = None
+        self.queue = []  # Waiting entries, highest priority first
+
+    def is_active(self):
+        return self.active is not None
+
+    def post(self, code, message, duration=5, show_countdown=False, priority=PRIORITY_WARNING):
+        # duration in seconds, None to show until cleared
+        if priority == self.PRIORITY_FATAL:
+            duration = None
+        duration_ms = None if duration is None else int(duration * 1000)
+
+        if self.active is not None and self.active[self._CODE] == code:
+            self._refresh(self.active, message, duration_ms, priority)
+            return
+        for entry in self.queue:
+            if entry[self._CODE] == code:
+                self._refresh(entry, message, duration_ms, priority)
+                self._sort_queue()
+                return
+
+        entry = [code, message, duration_ms, show_countdown, priority, 0]
+        if self.active is None:
+            self._start(entry)
+        elif priority > self.active[self._PRIORITY]:
+            # Interrupt - the current one goes back to the front of the queue to be shown again afterwards
+            self._queue(self.active, True)
+            self._start(entry)
+        else:
+            self._queue(entry)
+
+    def clear(self, code):
+        if self.active is not None and self.active[self._CODE] == code:
+            self._next()
+            return
+        for entry in self.queue:
+            if entry[self._CODE] == code:
+                self.queue.remove(entry)
+                return
+
+    def _refresh(self, entry, message, duration_ms, priority):
+        entry[self._MESSAGE] = message
+        if duration_ms is not None and entry is self.active:
+            # Extend from now rather than restart so the scrolling carries on smoothly
+            duration_ms += utime.ticks_diff(utime.ticks_ms(), entry[self._START])
+        entry[self._DURATION] = duration_ms
+        if priority > entry[self._PRIORITY]: entry[self._PRIORITY] = priority
+
+    def _queue(self, entry, front=False):
+        if front:
+            self.queue.insert(0, entry)
+        else:
+            self.queue.append(entry)
+        self._sort_queue()
+        if len(self.queue) > self.MAX_QUEUED:
+            self.queue.pop()  # Drop the lowest priority
+
+    def _sort_queue(self):
+        self.queue.sort(key=lambda entry: -entry[self._PRIORITY])
+
+    def _start(self, entry):
+        entry[self._START] = utime.ticks_ms()
+        self.active = entry
+
+    def _next(self):
+        if self.queue:
+            self._start(self.queue.pop(0))
+        else:
+            self.active = None
+            self.display.fill(0)
+            self.display.show()
+
+    def _display_time(self, entry):
+        # Show for the requested duration but at least long enough to scroll the whole message past once
+        scroll_time = (len(entry[self._MESSAGE]) * 8 + self.display.width) * self.SCROLL_SPEED
+        if entry[self._DURATION] is None:
+            return None
+        return max(entry[self._DURATION], scroll_time)
+
+    def step(self):
+        # Draw the next frame, returns True while an error is being shown
+        entry = self.active
+        if entry is None:
+            return False
+
+        elapsed = utime.ticks_diff(utime.ticks_ms(), entry[self._START])
+        display_time = self._display_time(entry)
+        if display_time is not None and elapsed >= display_time:
+            self._next()
+            return self.active is not None
+
+        width = self.display.width
+        frame = elapsed // self.SCROLL_SPEED
+        code = entry[self._CODE]
+        message = entry[self._MESSAGE]
+        self.display.fill(0)
+
+        # Both scroll left and come back in from the right
+        code_period = width + len(code) * 8 + 8
+        self.display.text(code, width - (frame + width) % code_period, 0, 1)
+        message_period = width + len(message) * 8
+        self.display.text(message, width - (frame + width) % message_period, 12, 1)
+
+        if entry[self._COUNTDOWN] and entry[self._DURATION] is not None:
+            remaining_time = (entry[self._DURATION] - elapsed) // 1000
+            if remaining_time < 0: remaining_time = 0
+            countdown_text = str(remaining_time) + "s"
+            # Calculate the starting position for the countdown to center it
+            self.display.text(countdown_text, (width - len(countdown_text) * 8) // 2, 24, 1)
+
+        self.display.show()
+        return True
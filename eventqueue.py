@@ -0,0 +1,52 @@
+from array import array
+
+class EventQueue:
+    # Ring buffer of input events, filled by the rotary/button interrupts and drained in a batch by the
+    # main loop (or the asyncio input task). All preallocated so push() does not allocate.
+    #
+    # push() only writes the slot at tail then tail, the drain only reads the slot at head then moves
+    # head, so they do not need to lock each other out. The interrupts are soft ones so they never run
+    # in the middle of each other.
+    ROTARY = 1          # delta is detents, + for clockwise
+    BUTTON_DOWN = 2
+    BUTTON_UP = 3
+
+    SIZE = 32           # Power of 2, holds one less than this
+
+    def __init__(self, size=SIZE):
+        self.mask = size - 1
+        self.types = bytearray(size)
+        self.deltas = array('h', [0] * size)
+        self.ticks = array('i', [0] * size)   # ticks_us for turns, ticks_ms for the button - both wrap at 2^30 so fit
+        self.head = 0
+        self.tail = 0
+        self.merged = 0     # Turns added to the one before because the queue was full
+        self.dropped = 0    # Button events lost because the queue was full
+
+    def __len__(self):
+        return (self.tail - self.head) & self.mask
+
+    def push(self, kind, delta, ticks):
+        tail = self.tail
+        if (tail + 1) & self.mask == self.head:
+            # Full - fold a turn into the newest one rather than lose the detents
+            last = (tail - 1) & self.mask
+            if kind == self.ROTARY and self.types[last] == kind:
+                self.deltas[last] += delta
+                self.ticks[last] = ticks
+                self.merged += 1
+            else:
+                self.dropped += 1
+            return
+        self.types[tail] = kind
+        self.deltas[tail] = delta
+        self.ticks[tail] = ticks
+        self.tail = (tail + 1) & self.mask
+
+    def first(self):
+        # Slot of the oldest event or -1 if empty, read it from types/deltas/ticks then remove() it
+        head = self.head
+        return -1 if head == self.tail else head
+
+    def remove(self):
+        self.head = (self.head + 1) & self.mask
@@ -0,0 +1,69 @@
+import utime
+
+class FrameGovernor:
+    # Decides whether a screen needs drawing this frame.
+    #
+    # A screen passes the values it shows to value() between begin() and due(), it is only drawn
+    # (and so only sent over I2C) when one of them changed since it was last drawn, and then no more
+    # than its max fps - a change held back by the limit is drawn once the time is up.
+    # Switching screen or invalidate() (something else has drawn on the display) always draws.
+    MAX_VALUES = 12
+
+    def __init__(self, max_fps=10, enabled=True):
+        self.max_fps = max_fps        # 0 for no limit
+        self.enabled = enabled        # False draws every frame like before
+        self.screen_max_fps = {}
+        self.values = [None] * self.MAX_VALUES
+        self.index = 0
+        self.screen = None
+        self.changed = False
+        self.forced = False
+        self.pending = False
+        self.last_draw = 0
+        self.draws = 0
+        self.skips = 0
+
+    def set_max_fps(self, screen, fps):
+        self.screen_max_fps[screen] = fps
+
+    def invalidate(self):
+        self.screen = None
+
+    def begin(self, screen):
+        self.index = 0
+        if screen != self.screen:
+            self.screen = screen
+            self.forced = True
+            self.changed = True
+        else:
+            self.changed = False
+
+    def value(self, value):
+        index = self.index
+        if self.values[index] != value:
+            self.values[index] = value
+            self.changed = True
+        self.index = index + 1
+
+    def due(self):
+        # True if the screen should be drawn now
+        if self.changed:
+            self.pending = True
+        if not self.enabled:
+            self.pending = False
+            self.forced = False
+            return True
+        if not self.pending:
+            self.skips += 1
+            return False
+        now = utime.ticks_ms()
+        if not self.forced:
+            fps = self.screen_max_fps.get(self.screen, self.max_fps)
+            if fps > 0 and utime.ticks_diff(now, self.last_draw) < 1000 // fps:
+                self.skips += 1
+                return False
+        self.pending = False
+        self.forced = False
+        self.last_draw = now
+        self.draws += 1
+        return True
@@ -0,0 +1,107 @@
+import utime
+
+class GestureRecogniser:
+    # Turns the queued button presses/releases and rotary turns into gestures.
+    #
+    # A gesture is handed to handler(gesture) as soon as nothing else it could become is bound in
+    # the current context (get_bindings() returns its gesture -> action dict). So with only CLICK
+    # bound a press acts straight away, and the most clicks bound acts on that click's release
+    # rather than waiting out the gap for another one.
+    # Everything is timed with the tick stamps of the events, compared with ticks_diff.
+
+    # n clicks is gesture n
+    CLICK = 1
+    DOUBLE_CLICK = 2
+    TRIPLE_CLICK = 3
+    QUADRUPLE_CLICK = 4
+    MAX_CLICKS = 4
+    LONG_PRESS = 10     # Held past long_press_ms without turning
+    LONG_RELEASE = 11   # Let go after a long press
+    PRESS_ROTATE = 12   # Turned while held, once per press
+
+    NAMES = {CLICK: "single click", DOUBLE_CLICK: "double click", TRIPLE_CLICK: "triple click",
+             QUADRUPLE_CLICK: "quadruple click", LONG_PRESS: "long press", LONG_RELEASE: "long press released",
+             PRESS_ROTATE: "press and rotate"}
+
+    # States
+    IDLE = 0
+    PRESSED = 1         # Down, could still become more clicks, a long press or press and rotate
+    RELEASED = 2        # Up, waiting click_gap_ms for another press
+    HELD = 3            # Long press sent, waiting for the release
+    DONE = 4            # Gesture sent or turned while held, nothing more until the release
+
+    def __init__(self, long_press_ms, click_gap_ms, get_bindings, handler):
+        self.long_press_ms = long_press_ms
+        self.click_gap_ms = click_gap_ms    # Most time between a release and the next press of a multi click
+        self.get_bindings = get_bindings
+        self.handler = handler
+        self.state = self.IDLE
+        self.clicks = 0
+        self.rotated = False
+        self.last_down = 0
+        self.last_up = 0
+
+    def max_clicks(self, bindings):
+        clicks = self.MAX_CLICKS
+        while clicks > 1 and clicks not in bindings:
+            clicks -= 1
+        return clicks
+
+    def down(self, ticks):
+        state = self.state
+        if state == self.RELEASED and utime.ticks_diff(ticks, self.last_up) < self.click_gap_ms:
+            self.clicks += 1
+        elif state == self.RELEASED or state == self.IDLE:
+            if state == self.RELEASED:
+                self.emit(self.clicks)  # Gap had run out, poll() had not got to it yet
+            self.clicks = 1
+        else:
+            return  # Already down
+        self.state = self.PRESSED
+        self.last_down = ticks
+        self.rotated = False
+        bindings = self.get_bindings()
+        if self.PRESS_ROTATE in bindings or (self.clicks == 1 and self.LONG_PRESS in bindings):
+            return
+        if self.clicks >= self.max_clicks(bindings):
+            self.state = self.DONE
+            self.emit(self.clicks)
+
+    def up(self, ticks):
+        state = self.state
+        if state == self.IDLE or state == self.RELEASED:
+            return  # Already up
+        self.state = self.IDLE
+        if state == self.PRESSED:
+            if self.clicks >= self.max_clicks(self.get_bindings()):
+                self.emit(self.clicks)
+            else:
+                self.state = self.RELEASED
+                self.last_up = ticks
+        elif state == self.HELD:
+            self.emit(self.LONG_RELEASE)
+
+    def turn(self):
+        # Turning while held cancels any clicks
+        state = self.state
+        if (state == self.PRESSED or state == self.HELD) and not self.rotated:
+            self.rotated = True
+            if state == self.PRESSED:
+                self.state = self.DONE
+            self.emit(self.PRESS_ROTATE)
+
+    def poll(self, now):
+        # Gestures that finish with time passing rather than an event
+        state = self.state
+        if state == self.RELEASED:
+            if utime.ticks_diff(now, self.last_up) >= self.click_gap_ms:
+                self.state = self.IDLE
+                self.emit(self.clicks)
+        elif state == self.PRESSED and self.clicks == 1:
+            if utime.ticks_diff(now, self.last_down) >= self.long_press_ms and self.LONG_PRESS in self.get_bindings():
+                self.state = self.HELD
+                self.emit(self.LONG_PRESS)
+
+    def emit(self, gesture):
+        print("Gesture: " + self.NAMES.get(gesture, str(gesture)))
+        self.handler(gesture)
@@ -0,0 +1,117 @@
+import gc
+import utime
+from array import array
+
+class HeapProfiler:
+    # Profiling mode for heap pressure - off unless SharedState.heap_profile is set.
+    #
+    # wrap() returns a function that runs the original with gc.mem_alloc() read either side, the bytes
+    # go against a named section (main loop jobs, timer and irq callbacks). When off wrap() just hands
+    # back the original function so there is no cost. A collection shows up as mem_alloc going down,
+    # that sample is dropped and counted as a GC instead. Timer/irq callbacks should not allocate at all
+    # so any that do are flagged in the report.
+    #
+    # Counts are for the current report window, printed every REPORT_MS and on the serial "heap" command.
+    # With the dualcore runtime core 1 allocations land in whichever section core 0 is running so leave
+    # that out when profiling.
+
+    MAX_SECTIONS = 12
+    REPORT_MS = 10000
+
+    def __init__(self, enabled=False):
+        print("HeapProfiler Initialising ...")
+        self.enabled = enabled and hasattr(gc, "mem_alloc")
+        if enabled and not self.enabled:
+            print("HeapProfiler: gc.mem_alloc not available, profiling off")
+        self.names = []
+        self.interrupt = bytearray(self.MAX_SECTIONS)   # 1 for timer/irq callbacks
+        self.calls = array('i', [0] * self.MAX_SECTIONS)
+        self.bytes = array('i', [0] * self.MAX_SECTIONS)
+        self.max_bytes = array('i', [0] * self.MAX_SECTIONS)
+        self.allocating_calls = array('i', [0] * self.MAX_SECTIONS)
+        self.collections = 0
+        self._last_alloc = 0
+        self.window_start = utime.ticks_ms()
+        print("HeapProfiler initialised.")
+
+    def wrap(self, name, function, interrupt=False):
+        # For functions called without arguments - main loop jobs, asyncio tasks, the rotary listener
+        if not self.enabled:
+            return function
+        section = self._add(name, interrupt)
+        mem_alloc = gc.mem_alloc
+
+        def profiled():
+            before = mem_alloc()
+            function()
+            self._sample(section, before, mem_alloc())
+        return profiled
+
+    def wrap_callback(self, name, function):
+        # For timer and pin irq callbacks, they get the timer/pin passed in
+        if not self.enabled:
+            return function
+        section = self._add(name, True)
+        mem_alloc = gc.mem_alloc
+
+        def profiled(source):
+            before = mem_alloc()
+            function(source)
+            self._sample(section, before, mem_alloc())
+        return profiled
+
+    def _add(self, name, interrupt):
+        if len(self.names) == self.MAX_SECTIONS:
+            raise ValueError("No room for heap profiler section " + name)
+        self.names.append(name)
+        section = len(self.names) - 1
+        self.interrupt[section] = 1 if interrupt else 0
+        return section
+
+    def _sample(self, section, before, after):
+        if not self.interrupt[section]:
+            # Main loop jobs run one after another, callbacks can land inside them so they dont get a say here
+            if before < self._last_alloc:
+                self.collections += 1   # Collected since the last job
+            self._last_alloc = after
+        allocated = after - before
+        if allocated < 0:
+            self.collections += 1   # Collected during this one, cant tell how much it allocated
+            return
+        self.calls[section] += 1
+        self.bytes[section] += allocated
+        if allocated > self.max_bytes[section]: self.max_bytes[section] = allocated
+        if allocated:
+            self.allocating_calls[section] += 1
+
+    def update(self):
+        # Main loop - prints the report each REPORT_MS while profiling
+        if self.enabled and utime.ticks_diff(utime.ticks_ms(), self.window_start) >= self.REPORT_MS:
+            self.report()
+
+    def report(self):
+        if not self.enabled:
+            print("Heap profiling is off - set heap_profile in SharedState")
+            return
+        seconds = utime.ticks_diff(utime.ticks_ms(), self.window_start) / 1000
+        if seconds <= 0: seconds = 0.001
+        print("heap: free {} alloc {}, {} collections in {:.1f}s ({:.1f}/min)".format(
+            gc.mem_free(), gc.mem_alloc(), self.collections, seconds, self.collections * 60 / seconds))
+        print("{:12} {:>6} {:>10} {:>6} {:>8}".format("section", "calls", "bytes/call", "max", "bytes/s"))
+        for section in range(len(self.names)):
+            calls = self.calls[section]
+            line = "{:12} {:6d} {:10d} {:6d} {:8d}".format(self.names[section], calls, self.bytes[section] // calls if calls else 0,
+                                                          self.max_bytes[section], int(self.bytes[section] / seconds))
+            if self.interrupt[section] and self.allocating_calls[section]:
+                line += "  ALLOCATES IN CALLBACK (" + str(self.allocating_calls[section]) + " calls)"
+            print(line)
+        self.reset()
+
+    def reset(self):
+        for section in range(len(self.names)):
+            self.calls[section] = 0
+            self.bytes[section] = 0
+            self.max_bytes[section] = 0
+            self.allocating_calls[section] = 0
+        self.collections = 0
+        self.window_start = utime.ticks_ms()
@@ -1,153 +1,200 @@
 import utime
-from machine import Timer, Pin
+from machine import Pin
 from rotary_irq_rp2 import RotaryIRQ
-from customtimer import CustomTimer
+from probes import Probes
+from screenregistry import ScreenRegistry
+from eventqueue import EventQueue
+from gestures import GestureRecogniser
 
 class InputHandler:
     def __init__(self, rotary_clk_pin, rotary_dt_pin, button_pin, shared_state):
     
         print("InputHandler Initialising ...")
-        self.rotary = RotaryIRQ(pin_num_clk=rotary_clk_pin, pin_num_dt=rotary_dt_pin, reverse=True, range_mode=RotaryIRQ.RANGE_BOUNDED)
+        # The rotary only counts detents, the interrupts queue what happened and process_events() acts on it
+        self.rotary = RotaryIRQ(pin_num_clk=rotary_clk_pin, pin_num_dt=rotary_dt_pin, reverse=True, range_mode=RotaryIRQ.RANGE_UNBOUNDED)
         self.shared_state = shared_state
+        self.events = EventQueue()
 
-        self.rotary.add_listener(self.rotary_callback)
-        self.rotary_used = False
+        heap_profiler = shared_state.heap_profiler
+        self.rotary.add_listener(heap_profiler.wrap("rotary", self.rotary_callback, interrupt=True))
         
         self.button = Pin(button_pin, Pin.IN, Pin.PULL_UP)
         self.button_pressed = False
-        self.button.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self.button_state_changed)
-        self.last_button_press_time = 0
+        self.button.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=heap_profiler.wrap_callback("button", self.button_state_changed))
 
-        self.click_counter = 0 
-        self.click_check_timer = CustomTimer(period=self.shared_state.click_check_timeout, mode=Timer.ONE_SHOT, callback=self.check_click_count)
+        # Button gestures and what they do in each context, see SharedState.gesture_bindings
+        self.gesture_actions = {}
+        for context, bindings in shared_state.gesture_bindings.items():
+            actions = {}
+            for gesture, action in bindings.items():
+                method = getattr(self, "gesture_" + action, None)
+                if method is None:
+                    print("No gesture action found for: " + action)
+                else:
+                    actions[gesture] = method
+            self.gesture_actions[context] = actions
+        self.gestures = GestureRecogniser(shared_state.long_press_time, shared_state.click_gap_time, self.gesture_context_actions, self.gesture)
+        self.coarse_adjust = False  # Turns move in 10s while the button is held
         
         self.previous_rotary_value = self.rotary.value() # Initialize the previous rotary value
+        self.last_turn_us = 0
+        self.last_turn_delta = 0
+        self.button_events = (EventQueue.BUTTON_DOWN, EventQueue.BUTTON_UP)  # By pin value, pressed is 0
         
         print("InputHandler initialised.")
 
+    def rotary_mode(self):
+        # Rotary configuration wanted now - the menu or whatever the current screen adjusts
+        if self.shared_state.in_menu:
+            return ScreenRegistry.ROTARY_MENU
+        return self.shared_state.screens.get(self.shared_state.current_menu_position).rotary_mode
+
     def setup_rotary_values(self):
-        if self.shared_state.rotary_last_mode != "menu" and self.shared_state.in_menu:
-            self.rotary.set(value=self.shared_state.current_menu_position)
-            self.previous_rotary_value = self.shared_state.current_menu_position
-            self.rotary.set(min_val=0)
-            self.rotary.set(max_val=len(self.shared_state.menu_options)-1)
-            self.rotary.set(range_mode=RotaryIRQ.RANGE_WRAP)
-            self.shared_state.rotary_last_mode = "menu"
-            print("setup rotarty menu" + str(self.rotary.value()))
-        elif self.shared_state.rotary_last_mode != "Display Contrast" and self.shared_state.menu_options[self.shared_state.current_menu_position] == "Display Contrast":
-            self.rotary.set(value=self.shared_state.display_contrast)
-            self.previous_rotary_value = self.shared_state.display_contrast
-            self.rotary.set(min_val=0)
-            self.rotary.set(max_val=255)
-            self.rotary.set(range_mode=RotaryIRQ.RANGE_BOUNDED)
-            self.shared_state.rotary_last_mode = "Display Contrast"
-            print("setup rotarty contrast" + str(self.rotary.value()))
+        # Turns are applied to whatever the mode adjusts as the events are processed so the rotary itself
+        # needs nothing setting up, just note the mode so turns only go to what it is set up for
+        mode = self.rotary_mode()
+        if mode == self.shared_state.rotary_last_mode:
+            return
+        if mode == ScreenRegistry.ROTARY_MENU:
+            print("setup rotarty menu" + str(self.shared_state.current_menu_position))
+        elif mode == ScreenRegistry.ROTARY_CONTRAST:
+            print("setup rotarty contrast" + str(self.shared_state.display_contrast))
         else:
-            if self.shared_state.rotary_last_mode != "setpoint":
-                self.rotary.set(value=self.shared_state.setpoint)
-                self.previous_rotary_value = self.shared_state.setpoint
-                self.rotary.set(min_val=1)
-                self.rotary.set(max_val=self.shared_state.max_allowed_setpoint)  # Max temp - allow conversion to F?
-                self.rotary.set(range_mode=RotaryIRQ.RANGE_BOUNDED)
-                self.shared_state.rotary_last_mode = "setpoint"
-                print("setup rotarty setpoint" + str(self.rotary.value()))
+            print("setup rotarty setpoint" + str(self.shared_state.setpoint))
+        self.shared_state.rotary_last_mode = mode
+
+    # Interrupts - queue the event and nothing else
 
     def rotary_callback(self):
-    
-        if self.shared_state.in_menu:
-            direction = 'up' if self.rotary.value() > self.previous_rotary_value else 'down'
-            self.shared_state.rotary_direction = direction
+        start_us = utime.ticks_us()
+        value = self.rotary.value()
+        self.events.push(EventQueue.ROTARY, value - self.previous_rotary_value, start_us)
+        self.previous_rotary_value = value
+        self.shared_state.probes.stop(Probes.ROTARY, start_us)
 
-        else:
-            adjustment_rate = 10 if self.button_pressed else 0
-            if self.rotary.value() > self.previous_rotary_value:
-                self.rotary.set(value=self.rotary.value() + adjustment_rate)
-            else:
-                self.rotary.set(value=(self.rotary.value() - adjustment_rate))
-            
-            if self.shared_state.menu_options[self.shared_state.current_menu_position] == "Display Contrast":
-                self.shared_state.display_contrast = self.rotary.value()
-            else:
-                self.shared_state.setpoint = self.rotary.value()
+    def button_state_changed(self, pin):
+        self.events.push(self.button_events[pin.value()], 0, utime.ticks_ms())
 
-        self.previous_rotary_value = self.rotary.value()
-        #print(f"{self.shared_state.rotary_last_mode} Prvious Rotary: {self.previous_rotary_value}, Rotary value: {self.rotary.value()}")
-        if self.button_pressed: self.rotary_used = True
+    # Main loop
 
-    def button_state_changed(self, pin):
-        current_time = utime.ticks_ms() 
-        if pin.value() == 0: # Button is pressed
-            if not self.button_pressed: # Only process the press if the button was not already pressed
-                self.button_pressed = True 
-                time_since_last_press = current_time - self.last_button_press_time
-                if time_since_last_press < self.shared_state.click_check_timeout:
-                    self.click_counter += 1
-                else:
-                    self.click_counter = 1 # Reset the counter if the time since last press is more than 750ms
-                self.last_button_press_time = current_time # Update the last button press time
-
-                if self.shared_state.in_menu:
-                    self.shared_state.menu_selection_pending = True
-
-            if not self.click_check_timer.is_timer_running():
-                self.click_check_timer.start()
-        else: # Button is released
-            self.rotary_used = False # Reset if rotary use between presses
-            if self.button_pressed:
-                print('Button released')
-                self.button_pressed = False
-                if not self.shared_state.in_menu and self.shared_state.get_mode() == 'Manual':
-                    self.shared_state.set_mode("Off")
-                    print("Switching to Off mode")
-
-    def check_click_count(self, timer):   
-        if self.click_counter == 1:
-            print('Single click detected')
-            if not self.shared_state.in_menu and not self.rotary_used:
-                print(str(self.shared_state.session_start_time))
-                if self.shared_state.get_mode() == "Session":
-                    if (self.shared_state.session_timeout - self.shared_state.get_session_mode_duration()) < 60000:
-                        self.shared_state.session_start_time = self.shared_state.session_start_time + 60000
-
-        elif self.click_counter == 2:
-            print('Double click detected')
-            if not self.shared_state.in_menu:
-                self.shared_state.in_menu = True
-                self.shared_state.rotary_direction = 'up' # Just Fake it and go to top of menu to force screen refresh
+    def process_events(self):
+        # Acts on everything the interrupts queued since the last call, in order
+        events = self.events
+        while True:
+            slot = events.first()
+            if slot < 0:
+                break
+            kind = events.types[slot]
+            delta = events.deltas[slot]
+            ticks = events.ticks[slot]
+            events.remove()
+            if kind == EventQueue.ROTARY:
+                self.gestures.turn()
+                self.rotary_turned(delta, ticks)
+            elif kind == EventQueue.BUTTON_DOWN:
+                self.button_pressed = True
+                self.gestures.down(ticks)
             else:
-                print('Ignoring double click already in menu')
-                
-        elif self.click_counter == 3:
-            print('Triple click detected')
-            if not self.shared_state.in_menu and not self.rotary_used:
-                if self.shared_state.get_mode() == "Off" :
-                    print("Switching to Session mode")
-                    self.shared_state.set_mode("Session") 
-                elif self.shared_state.get_mode() == "Session":
-                    self.shared_state.set_mode("Off")
-                    #print("Stopped Session mode")
-                    
-        elif self.click_counter == 4:
-            print('Quadruple click detected')
-            if not self.shared_state.in_menu and not self.rotary_used:
-                if self.shared_state.get_mode() == "Off" :
-                    print("Switching to Session mode for 1 minute")
-                    self.shared_state.set_mode("Session") 
-                    self.shared_state.session_start_time = (utime.ticks_ms() - (self.shared_state.session_timeout - 60000))
-                #elif self.shared_state.get_mode() == "Session":
-                #    self.shared_state.set_mode("Off")
-        else:
-            print(self.click_counter, ' clicks detected')
-            
-        self.click_counter = 0 # Reset the click counter
-        if self.click_check_timer.is_timer_running():
-            self.click_check_timer.stop()
-            
-        if self.button_pressed:
-            print("Timer finished: Button still being held")
-            if self.shared_state.get_mode() == 'Off' and not self.shared_state.in_menu and not self.rotary_used:
-                self.shared_state.set_mode("Manual")
-                print("Switching to Manual mode")
-        else:
-            self.rotary_used = False # Reset if rotary use between presses
-            print("Timer finished: Button released")
+                self.button_pressed = False
+                self.coarse_adjust = False
+                self.gestures.up(ticks)
+        self.gestures.poll(utime.ticks_ms())
+
+    def rotary_turned(self, delta, ticks_us):
+        if delta == 0:
+            return  # Turns back and forth folded together while the queue was full
+        shared_state = self.shared_state
+        # Time per detent since the last turn, several detents can come in one event
+        interval = utime.ticks_diff(ticks_us, self.last_turn_us) // abs(delta)
+        same_direction = (delta > 0) == (self.last_turn_delta > 0)
+        self.last_turn_us = ticks_us
+        self.last_turn_delta = delta
+
+        if shared_state.in_menu:
+            if same_direction:
+                delta *= self.acceleration(ScreenRegistry.ROTARY_MENU, interval)
+            shared_state.menu_steps += delta  # The menu moves an entry per detent
+            return
+
+        if self.coarse_adjust:
+            delta *= 11  # Held button turns in 10s on top of the detent
+        elif same_direction:
+            delta *= self.acceleration(shared_state.rotary_last_mode, interval)
+
+        # Only while the rotary is set up for it, not in the moment after leaving the menu
+        if shared_state.rotary_last_mode == ScreenRegistry.ROTARY_CONTRAST:
+            shared_state.display_contrast = min(255, max(0, shared_state.display_contrast + delta))
+        elif shared_state.rotary_last_mode == ScreenRegistry.ROTARY_SETPOINT:
+            shared_state.setpoint = min(shared_state.max_allowed_setpoint, max(1, shared_state.setpoint + delta))
+
+    def acceleration(self, mode, interval_us):
+        # Multiplier for a detent interval_us after the one before, from the mode's curve in
+        # SharedState.rotary_acceleration - (max interval us, multiplier) pairs, fastest first
+        for max_interval, multiplier in self.shared_state.rotary_acceleration.get(mode, ()):
+            if interval_us < max_interval:
+                return multiplier
+        return 1
+
+    # Gestures
+
+    def gesture_context_actions(self):
+        # Gesture -> action for where we are - the menu, the screen by name, any graph or the default
+        actions = self.gesture_actions
+        if self.shared_state.in_menu:
+            return actions["menu"]
+        screen = self.shared_state.screens.get(self.shared_state.current_menu_position)
+        context = actions.get(screen.name)
+        if context is None:
+            context = actions["graph"] if screen.graph else actions["default"]
+        return context
+
+    def gesture(self, gesture):
+        action = self.gesture_context_actions().get(gesture)
+        if action:
+            action()
+
+    def gesture_select(self):
+        self.shared_state.menu_selection_pending = True
+
+    def gesture_open_menu(self):
+        if not self.shared_state.in_menu:
+            self.shared_state.in_menu = True
+            self.shared_state.menu_steps = 1 # Just Fake it and go to top of menu to force screen refresh
+
+    def gesture_extend_session(self):
+        # Another minute when a session is in its last one, True if it was
+        if self.shared_state.get_mode() == "Session" and (self.shared_state.session_timeout - self.shared_state.get_session_mode_duration()) < 60000:
+            self.shared_state.session_start_time = self.shared_state.session_start_time + 60000
+            return True
+        return False
+
+    def gesture_extend_session_or_graph_span(self):
+        if not self.gesture_extend_session():
+            self.shared_state.cycle_graph_span()
+            print("Graph span: " + str(self.shared_state.graph_span))
+
+    def gesture_toggle_session(self):
+        if self.shared_state.get_mode() == "Off" :
+            print("Switching to Session mode")
+            self.shared_state.set_mode("Session") 
+        elif self.shared_state.get_mode() == "Session":
+            self.shared_state.set_mode("Off")
+
+    def gesture_one_minute_session(self):
+        if self.shared_state.get_mode() == "Off" :
+            print("Switching to Session mode for 1 minute")
+            self.shared_state.set_mode("Session") 
+            self.shared_state.session_start_time = (utime.ticks_ms() - (self.shared_state.session_timeout - 60000))
+
+    def gesture_manual_on(self):
+        if self.shared_state.get_mode() == 'Off':
+            self.shared_state.set_mode("Manual")
+            print("Switching to Manual mode")
+
+    def gesture_manual_off(self):
+        if self.shared_state.get_mode() == 'Manual':
+            self.shared_state.set_mode("Off")
+            print("Switching to Off mode")
+
+    def gesture_coarse_adjust(self):
+        self.coarse_adjust = True
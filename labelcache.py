@@ -0,0 +1,34 @@
+import framebuf
+
+class LabelCache:
+    # Constant text (labels, menu entries) rendered once into FrameBuffer tiles, screens blit the tile
+    # rather than running text() over every character each frame.
+    # Bold is real bold - each glyph drawn twice one pixel apart in a tile one pixel wider.
+    # A tile is made the first time its text is drawn (or by preload) and kept, so only use this for
+    # text from a fixed set - numbers and other changing text still go through text().
+    HEIGHT = 8
+
+    def __init__(self):
+        self.plain = {}
+        self.bold = {}
+
+    def preload(self, labels):
+        for label in labels:
+            self.get(label)
+            self.get(label, True)
+
+    def get(self, text, bold=False):
+        tiles = self.bold if bold else self.plain
+        tile = tiles.get(text)
+        if tile is None:
+            width = len(text) * 8 + (1 if bold else 0)
+            tile = framebuf.FrameBuffer(bytearray(width * self.HEIGHT // 8), width, self.HEIGHT, framebuf.MONO_VLSB)
+            tile.text(text, 0, 0, 1)
+            if bold:
+                tile.text(text, 1, 0, 1)
+            tiles[text] = tile
+        return tile
+
+    def blit(self, display, text, x, y, bold=False):
+        if text:
+            display.blit(self.get(text, bold), x, y, 0)  # 0 is see through, the same pixels text() would set
@@ -0,0 +1,75 @@
+import utime
+
+class LedPatterns:
+    # Blinks the status LED in patterns without blocking, update() is called from a shared tick and
+    # switches the LED when the current step is up.
+    #
+    # A pattern is a tuple of ms on, ms off, ... repeated, () is off. A 0 step is skipped so (1000, 0) is on.
+    OFF = ()
+    ON = (1000, 0)
+    HEARTBEAT = (40, 1960)          # Idle, shows it is running
+    HEATING = (250, 250)            # Session/manual mode, away from the setpoint
+    AT_SETPOINT = ON                # Session/manual mode, at the setpoint
+    BOOT = (75, 75, 75, 75)         # Played once at power on to show the LED works
+
+    CODE_ON_MS = 200
+    CODE_OFF_MS = 200
+    CODE_PAUSE_MS = 1000
+
+    def __init__(self, pin):
+        print("LedPatterns Initialising ...")
+        self.pin = pin
+        self.pin.off()
+        self.pattern = self.OFF     # Repeats until set() changes it
+        self.playing = self.OFF     # The pattern or one played once over it
+        self.once = False
+        self.step = 0
+        self.step_end = 0
+        print("LedPatterns initialised.")
+
+    @classmethod
+    def blink_code(cls, count):
+        # count short blinks then a pause, for errors
+        pattern = [cls.CODE_ON_MS, cls.CODE_OFF_MS] * count
+        pattern[-1] = cls.CODE_PAUSE_MS
+        return tuple(pattern)
+
+    def set(self, pattern):
+        if pattern is self.pattern:
+            return
+        self.pattern = pattern
+        if not self.once:
+            self._start(pattern, False)
+
+    def play_once(self, pattern):
+        # Plays pattern through once then goes back to the one set()
+        self._start(pattern, True)
+
+    def update(self):
+        playing = self.playing
+        if not playing or utime.ticks_diff(utime.ticks_ms(), self.step_end) < 0:
+            return
+        start = self.step_end  # From when the step should have ended so it doesnt drift
+        step = self.step + 1
+        if step >= len(playing):
+            if self.once:
+                self._start(self.pattern, False)
+                return
+            step = 0
+        self._step(step, start)
+
+    def _start(self, pattern, once):
+        self.playing = pattern
+        self.once = once
+        if pattern:
+            self._step(0, utime.ticks_ms())
+        else:
+            self.pin.off()
+
+    def _step(self, step, start):
+        playing = self.playing
+        while playing[step] == 0:
+            step = (step + 1) % len(playing)
+        self.step = step
+        self.pin.value(step % 2 == 0)  # Even steps are on
+        self.step_end = utime.ticks_add(start, playing[step])
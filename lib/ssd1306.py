@@ -2,6 +2,7 @@
 
 from micropython import const
 import framebuf
+import utime
 
 
 # register definitions
@@ -24,6 +25,9 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
 
+# Approx bus bytes to set up a column/page address window before its data
+WINDOW_OVERHEAD = const(14)
+
 
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
@@ -34,6 +38,19 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        # Copy of what the display RAM holds so show() only sends the pages/columns that changed
+        self._shadow = bytearray(self.pages * self.width)
+        self._buffer_mv = memoryview(self.buffer)
+        self._shadow_mv = memoryview(self._shadow)
+        self._shadow_valid = False
+        self._dirty_x0 = bytearray(self.pages)
+        self._dirty_x1 = bytearray(self.pages)
+        self._frame_depth = 0
+        self._frame_pending = False
+        self._probes = None
+        self._probe = 0
+        self._region_x0 = 0            # Columns drawn on since the last flush, see show_region
+        self._region_x1 = width - 1
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
 
@@ -93,21 +110,121 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(SET_COM_OUT_DIR | ((rotate & 1) << 3))
         self.write_cmd(SET_SEG_REMAP | (rotate & 1))
 
+    def begin_frame(self):
+        # show() calls between begin_frame and end_frame are coalesced into one flush at end_frame
+        self._frame_depth += 1
+
+    def end_frame(self):
+        if self._frame_depth > 0:
+            self._frame_depth -= 1
+        if self._frame_depth == 0 and self._frame_pending:
+            self.flush()
+
     def show(self):
-        x0 = 0
-        x1 = self.width - 1
+        self.show_region(0, self.width - 1)
+
+    def show_region(self, x0, x1):
+        # show() for when only columns x0..x1 have been drawn on since the last update,
+        # the check for what changed skips the rest of the framebuffer
+        if x0 < self._region_x0: self._region_x0 = x0
+        if x1 > self._region_x1: self._region_x1 = x1
+        if self._frame_depth:
+            self._frame_pending = True
+            return
+        self.flush()
+
+    def invalidate(self):
+        # Force the next flush to send the whole framebuffer
+        self._shadow_valid = False
+
+    def set_timing_probe(self, probes, probe):
+        # Time each flush with probes.stop(probe, start_us) - see probes.py
+        self._probes = probes
+        self._probe = probe
+
+    def flush(self):
+        # Send changes to the display now, even inside a frame
+        if self._probes is None:
+            self._flush()
+            return
+        start_us = utime.ticks_us()
+        self._flush()
+        self._probes.stop(self._probe, start_us)
+
+    def _flush(self):
+        self._frame_pending = False
+        region_x0 = self._region_x0
+        region_x1 = self._region_x1
+        if region_x0 > region_x1:
+            # Flushed without a show(), check everything
+            region_x0 = 0
+            region_x1 = self.width - 1
+        self._region_x0 = self.width
+        self._region_x1 = -1
+        if not self._shadow_valid:
+            self._send_window(0, self.width - 1, 0, self.pages - 1, self._buffer_mv)
+            self._shadow_mv[:] = self._buffer_mv
+            self._shadow_valid = True
+            return
+
+        # Find the changed column range of each page
+        width = self.width
+        buf = self.buffer
+        shadow = self._shadow
+        dirty_pages = 0
+        dirty_bytes = 0
+        for page in range(self.pages):
+            start = page * width
+            x0 = region_x0
+            while x0 <= region_x1 and buf[start + x0] == shadow[start + x0]:
+                x0 += 1
+            if x0 > region_x1:
+                self._dirty_x1[page] = 0
+                self._dirty_x0[page] = 1  # x0 > x1 marks a clean page
+                continue
+            x1 = region_x1
+            while buf[start + x1] == shadow[start + x1]:
+                x1 -= 1
+            self._dirty_x0[page] = x0
+            self._dirty_x1[page] = x1
+            dirty_pages += 1
+            dirty_bytes += x1 - x0 + 1
+
+        if dirty_pages == 0:
+            return
+
+        # Each window costs its address commands, if that adds up to more than one full frame just send that
+        if dirty_bytes + dirty_pages * WINDOW_OVERHEAD >= len(buf) + WINDOW_OVERHEAD:
+            self._send_window(0, width - 1, 0, self.pages - 1, self._buffer_mv)
+            self._shadow_mv[:] = self._buffer_mv
+            return
+
+        for page in range(self.pages):
+            x0 = self._dirty_x0[page]
+            x1 = self._dirty_x1[page]
+            if x0 > x1:
+                continue
+            start = page * width
+            data = self._buffer_mv[start + x0:start + x1 + 1]
+            self._send_window(x0, x1, page, page, data)
+            self._shadow_mv[start + x0:start + x1 + 1] = data
+
+    def _send_window(self, x0, x1, page0, page1, data):
         if self.width != 128:
             # narrow displays use centred columns
             col_offset = (128 - self.width) // 2
             x0 += col_offset
             x1 += col_offset
+        self.write_window(x0, x1, page0, page1, data)
+
+    def write_window(self, x0, x1, page0, page1, data):
         self.write_cmd(SET_COL_ADDR)
         self.write_cmd(x0)
         self.write_cmd(x1)
         self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        self.write_cmd(page0)
+        self.write_cmd(page1)
+        self.write_data(data)
 
 
 class SSD1306_I2C(SSD1306):
@@ -116,6 +233,9 @@ class SSD1306_I2C(SSD1306):
         self.addr = addr
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]  # Co=0, D/C#=1
+        # Column and page address commands each with Co=1, D/C#=0 then Co=0, D/C#=1 so the rest is data
+        self.window = bytearray((0x80, SET_COL_ADDR, 0x80, 0, 0x80, 0, 0x80, SET_PAGE_ADDR, 0x80, 0, 0x80, 0, 0x40))
+        self.window_list = [self.window, None]
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
@@ -127,6 +247,16 @@ class SSD1306_I2C(SSD1306):
         self.write_list[1] = buf
         self.i2c.writevto(self.addr, self.write_list)
 
+    def write_window(self, x0, x1, page0, page1, data):
+        # Address window and its data in one transaction rather than seven
+        window = self.window
+        window[3] = x0
+        window[5] = x1
+        window[9] = page0
+        window[11] = page1
+        self.window_list[1] = data
+        self.i2c.writevto(self.addr, self.window_list)
+
 
 class SSD1306_SPI(SSD1306):
     def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
@@ -0,0 +1,45 @@
+from array import array
+
+class Mailbox:
+    # Single producer / single consumer queue of fixed size records for passing data between the two cores.
+    # No locks: records live in one preallocated array, only the producer writes head and only the consumer
+    # writes tail. The record is written before head is moved on so the consumer never sees half of one.
+    def __init__(self, capacity, fields, typecode='i'):
+        self.capacity = capacity + 1   # One slot always left empty so full and empty can be told apart
+        self.fields = fields
+        self.records = array(typecode, [0] * (self.capacity * fields))
+        self._head = array('H', [0])   # Next slot to write - producer only
+        self._tail = array('H', [0])   # Next slot to read - consumer only
+        self.dropped = 0               # Records the producer couldnt fit, counted by the producer
+
+    def __len__(self):
+        return (self._head[0] - self._tail[0]) % self.capacity
+
+    def put(self, record):
+        # Producer side, record is any sequence of fields values. Returns False if full
+        head = self._head[0]
+        next_head = head + 1
+        if next_head == self.capacity: next_head = 0
+        if next_head == self._tail[0]:
+            self.dropped += 1
+            return False
+        records = self.records
+        offset = head * self.fields
+        for i in range(self.fields):
+            records[offset + i] = record[i]
+        self._head[0] = next_head
+        return True
+
+    def get(self, record):
+        # Consumer side, copies the oldest record into record (an array of fields values). Returns False if empty
+        tail = self._tail[0]
+        if tail == self._head[0]:
+            return False
+        records = self.records
+        offset = tail * self.fields
+        for i in range(self.fields):
+            record[i] = records[offset + i]
+        tail += 1
+        if tail == self.capacity: tail = 0
+        self._tail[0] = tail
+        return True
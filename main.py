@@ -1,18 +1,33 @@
 import utime
 import sys
+import machine
 from machine import ADC, Pin, I2C, Timer, WDT, PWM
 from ssd1306 import SSD1306_I2C
 
 from simple_pid import PID
 
 from errormessage import ErrorMessage
+from errordisplay import ErrorDisplay
 from customtimer import CustomTimer
 from thermocouple import Thermocouple
 from displaymanager import DisplayManager
 from inputhandler import InputHandler
 from menusystem import MenuSystem
+from ringbuffer import RingBuffer
+from telemetryhistory import TieredHistory
 
 from heaters import HeaterFactory, InductionHeater, ElementHeater
+from controlloop import ControlLoop
+from asyncruntime import AsyncRuntime
+from dualcore import DualCoreControlLoop
+from probes import Probes
+from serialcommands import SerialCommands
+from heapprofiler import HeapProfiler
+from screenregistry import ScreenRegistry
+from gestures import GestureRecogniser
+from buzzersequencer import BuzzerSequencer
+from ledpatterns import LedPatterns
+from boottimer import BootTimer
 
 
 #pid_tunings = 0.48, 0.004, 0   #18mm + nichrome 2mm
@@ -66,6 +81,7 @@ hardware_pin_led = 25 #machine.Pin # default led on the pico could change to a d
 
 hardware_pin_display_scl = 21
 hardware_pin_display_sda = 20
+hardware_display_i2c_freq = 200000  # Hz, up to 1000000 (fast mode plus) if the display and wiring cope, see benchmarks/bench_display_push.py
 
 hardware_pin_buzzer = 16
 
@@ -76,6 +92,7 @@ hardware_pin_button = 14  #can also be a separate button as well as rotary push/
 hardware_pin_termocouple_sck = 6
 hardware_pin_termocouple_cs = 7 
 hardware_pin_termocouple_so = 8
+hardware_termocouple_spi_id = None  # None = SoftSPI on the pins above, 0/1 = hardware SPI block (pins must match it eg SCK 6, SO 4 for SPI0)
 
 hardware_pin_heater = 22
 
@@ -108,6 +125,12 @@ def load_config(file_path='config.txt'):
                         config['power_threshold'] = int(value)
                     elif key == 'heater_on_temperature_difference_threshold':
                         config['heater_on_temperature_difference_threshold'] = int(value)
+                    elif key == 'thermocouple_backend':
+                        config['thermocouple_backend'] = value
+                    elif key == 'runtime':
+                        config['runtime'] = value
+                    elif key == 'heap_profile':
+                        config['heap_profile'] = value == 'True'
                     # Add more elif statements for other configuration settings
     except OSError as e:
         print("Error opening or reading config file:", e)
@@ -127,74 +150,25 @@ def get_pi_temperature_or_handle_error(pi_temperature_sensor):
          #   utime.sleep_ms(1000)
     return pi_temperature
 
-def get_thermocouple_temperature_or_handle_error(thermocouple, heater):
-    try:
-
-        if isinstance(heater, InductionHeater):
-            new_temperature, need_off_temperature = thermocouple.get_filtered_temp(heater.is_on())
-        elif isinstance(heater, ElementHeater):
-            new_temperature = thermocouple.read_raw_temp()
-            need_off_temperature = False  # caller can throw this away if not needed
-        else:
-            raise ValueError("Unsupported heater type")
-        return new_temperature, need_off_temperature
-    
-    except ErrorMessage as e:
-        error_message = str(e)
-        error_code = e.error_code
-        if error_code in ["thermocouple-invalid_reading",
-                          "thermocouple-zero_reading", 
-                          "thermocouple-below_zero"]:
-            heater.off()
-            if pidTimer.is_timer_running(): pidTimer.stop() # Maybe stop other timers?
-            print("Stopped heater - [" + error_code + "] " + error_message)
-            while True:
-                display_manager.display_error(error_code, "Stopped heater - " + error_message)  # need to move out of this?
-                utime.sleep_ms(500)
-        else:
-            #thermocouple-above_limit, thermocouple-read_error
-            heater.off()
-            
-            print("Pausing heater - [" + error_code + "] " + error_message)
-            #display_manager.display_error(error_code, "Pausing heater - " + error_message,10,True)  # need to move out of this?
-                                                                                                 
+DISPLAY_I2C_MAX_FREQ = 1000000
 
-            return -1, True
-    
-    except Exception as e:
-        # Handle or log unexpected exceptions not dealt with above
-        error_message = str(e)
-        heater.off()
-        if pidTimer.is_timer_running(): pidTimer.stop() 
-        print("Stopped heater - Unknown Error: " + error_message)
-        while True:
-            display_manager.display_error("unknown_error","Stopped heater - Unknown Error: " + error_message)
-            utime.sleep_ms(500)
-
-def initialize_display(i2c_scl, i2c_sda, led_pin):
+def initialize_display(i2c_scl, i2c_sda, leds, freq=200000):
  
     try:
-        i2c = I2C(0, scl=Pin(i2c_scl), sda=Pin(i2c_sda), freq=200000)
+        if not 0 < freq <= DISPLAY_I2C_MAX_FREQ:
+            raise ValueError("I2C freq " + str(freq) + " not in 1-" + str(DISPLAY_I2C_MAX_FREQ))
+        i2c = I2C(0, scl=Pin(i2c_scl), sda=Pin(i2c_sda), freq=freq)
         display = SSD1306_I2C(128, 32, i2c)
     except Exception as e:
         error_text = "Start up failed - [display-setup] " + MAIN_ERROR_MESSAGES["display-setup"] + " " + str(e)
         print(error_text)
+        # We could so a special lookup for each error type for the display and morse code it out?
+        # For time being 3 on/off in short time with a pause and then repeating is enough to notify 
+        # about a display issue
+        leds.set(LedPatterns.blink_code(3))
         while True:
-            # We could so a special lookup for each error type for the display and morse code it out?
-            # For time being 3 on/off in short time with a pause and then repeating is enough to notify 
-            # about a display issue
-            led_pin.on()
-            utime.sleep_ms(200)
-            led_pin.off()
-            utime.sleep_ms(200)
-            led_pin.on()
-            utime.sleep_ms(200)
-            led_pin.off()
-            utime.sleep_ms(200)
-            led_pin.on()
-            utime.sleep_ms(200)
-            led_pin.off()
-            utime.sleep_ms(1000)
+            leds.update()  # Before the indicator timer has started
+            utime.sleep_ms(INDICATOR_TICK_MS)
         sys.exit()
 
     return display
@@ -202,105 +176,55 @@ def initialize_display(i2c_scl, i2c_sda, led_pin):
 
 
 def timerSetPiTemp(t):
-    global pi_temperature_sensor, pidTimer, display_manager, heater, shared_state
+    global pi_temperature_sensor, shared_state
    
     shared_state.pi_temperature = get_pi_temperature_or_handle_error(pi_temperature_sensor)
     
-    # Check if the temperature is safe
-    if shared_state.pi_temperature > shared_state.pi_temperature_limit:
-        try:
-            if not pidTimer.is_timer_running: pidTimer.stop() 
-            heater.off()
-            while not shared_state.pi_temperature <= shared_state.pi_temperature_limit:
-                display_manager.display_error("pi-too_hot", MAIN_ERROR_MESSAGES["pi-too_hot"] + " " + str(pi_temperature) + "C", 5) # Move display out of here?
-                
-                shared_state.pi_temperature = get_pi_temperature_or_handle_error(pi_temperature_sensor)
-                utime.sleep_ms(250)  # Warning shown for 5 secs so has had a time to cool down a bit
-
-            pidTimer.start()
-        except Exception as e:
-            heater.off()
-            print("Error updating display or deinitializing timers:", e)
-            # dont feed watchdog let it reboot
-    else:
-        if not pidTimer.is_timer_running: pidTimer.start()
-
-
-def timerUpdatePIDandHeater(t):  #nmay replace what this does in the check termocouple function 
-                                 #this needs a major clear up now we have share_state 
-    global pid, heater, thermocouple
-
-    if pid.setpoint != shared_state.setpoint: pid.setpoint = shared_state.setpoint
-    
-    new_heater_temperature, need_heater_off_temperature = get_thermocouple_temperature_or_handle_error(thermocouple, heater)
-
-    if new_heater_temperature < 0: # Non fatal error occured 
-        heater.off() #should already be off
-        return   # Let timer run this again and hopefully next time error has passed
+    # Only flagged here, check_pi_temperature() in the supervisor pauses the heater until it has cooled
+    # so the control loop is only ever driven from the main loop
+    shared_state.pi_too_hot = shared_state.pi_temperature > shared_state.pi_temperature_limit
 
-    # new temperature is valid
-    shared_state.heater_temperature = new_heater_temperature
-    
-    if need_heater_off_temperature:
-        heater.off()
-        print("Getting safe off heater temperature")
-        utime.sleep_ms(301) # lets give everything a moment to calm down
-        new_heater_temperature, _ = get_thermocouple_temperature_or_handle_error(thermocouple, heater)
-        if new_heater_temperature < 0: # Non fatal error occured 
-            return   # Let timer run this again and hopefully next time error has passed
-        # new off temperature is valid
-        shared_state.heater_temperature = new_heater_temperature
-
-    if len(shared_state.temperature_readings) >= 128: 
-        oldest_time = min(shared_state.temperature_readings.keys())
-        del shared_state.temperature_readings[oldest_time]
-    shared_state.temperature_readings[utime.ticks_ms()] = int(shared_state.heater_temperature)
-
-    if len(shared_state.watt_readings) >= 128: 
-        oldest_time = min(shared_state.watt_readings.keys())
-        del shared_state.watt_readings[oldest_time]
-    
-    if heater.is_on():
-        shared_state.watts = int((((shared_state.input_volts*shared_state.input_volts) / shared_state.heater_resitance) * (shared_state.heater_max_duty_cycle_percent/100))  * (heater.get_power() / 10))
-        shared_state.watt_readings[utime.ticks_ms()] = shared_state.watts
-    else:
-        shared_state.watts = 0
-        shared_state.watt_readings[utime.ticks_ms()] = 0
 
+def timerUpdatePIDandHeater(t):
+    # All the work is in ControlLoop so the callback never blocks
+    control_loop.tick()
 
-    power = pid(shared_state.heater_temperature)  # Update pid even if heater is off
 
-    if shared_state.get_mode() == "Off": 
-        heater.off()
-        return
-    
-    if power > shared_state.power_threshold:
-        if abs(shared_state.heater_temperature) > 350:  # Hard coded limit if user really wants to up this then up to them to edit code
-            if heater.is_on():
-                heater.off()
-            error_text = "Pausing heater - " + MAIN_ERROR_MESSAGES["heater-too_hot"] + " " + str(shared_state.heater_temperature)
+def check_pi_temperature():
+    # Pauses the heater while timerSetPiTemp has the pi flagged as too hot, resumes once it has cooled
+    global pi_too_hot_handled
+    if shared_state.pi_too_hot:
+        try:
+            if not pi_too_hot_handled:
+                control_loop.pause()  # Heater is off once it returns
+                pi_too_hot_handled = True
+            display_manager.display_error("pi-too_hot", MAIN_ERROR_MESSAGES["pi-too_hot"] + " " + str(int(shared_state.pi_temperature)) + "C", 5, priority=ErrorDisplay.PRIORITY_FATAL)
+        except Exception as e:
+            control_loop.heater_off()
+            print("Error updating display or deinitializing timers:", e)
+            # dont feed watchdog let it reboot
+    elif pi_too_hot_handled:
+        pi_too_hot_handled = False
+        display_manager.clear_error("pi-too_hot")
+        control_loop.resume()  # Does nothing further if the heater has been stopped by a fault
+
+
+def check_control_faults():
+    # Errors flagged by the control loop are shown from here rather than in the timer callback
+    global heater_fault_reported, heater_too_hot_reported
+    if shared_state.heater_fault is not None:
+        if not heater_fault_reported:
+            display_manager.display_error(shared_state.heater_fault, "Stopped heater - " + shared_state.heater_fault_message, priority=ErrorDisplay.PRIORITY_FATAL)
+            heater_fault_reported = True
+
+    if shared_state.heater_too_hot:
+        error_text = "Pausing heater - " + MAIN_ERROR_MESSAGES["heater-too_hot"] + " " + str(shared_state.heater_temperature)
+        if not heater_too_hot_reported:
             print(error_text)
-            display_manager.display_error("heater-too_hot",error_text,10,True)
-        elif not heater.is_on():
-            if shared_state.get_mode() != "Off":
-                heater.on(power)
-        if isinstance(heater, ElementHeater):
-            heater.set_power(power)
+            heater_too_hot_reported = True
+        display_manager.display_error("heater-too_hot", error_text, 10, True)  # Repeats just keep it on screen
     else:
-        if heater.is_on():
-            heater.off()  #Maybe we call this no matter what just in case?
-    
-    t = ','.join(map(str, [pid._last_time, shared_state.heater_temperature, thermocouple.raw_temp, pid.setpoint, power, heater.is_on(), pid.components]))
- #   print(t)
-
-def buzzer_play_tone(buzzer, frequency, duration):
-    #need to do this as a separate thread as this blocks
-    buzzer.freq(frequency)
-    #buzzer.duty_u16(32768) # 50% duty cycle
-    buzzer.duty_u16(10000) # 
-    utime.sleep_ms(duration)
-    buzzer.duty_u16(0) # Stop the buzzer
-
+        heater_too_hot_reported = False
 
 class SharedState:
     def __init__(self):
@@ -338,25 +262,60 @@ class SharedState:
         # dont set this too low 
         self.heater_on_temperature_difference_threshold = 20 
 
+        # MAX6675 driver - "bitbang" original python driver or "spi" for a single 2 byte SPI transfer per read
+        # (see hardware_termocouple_spi_id) - spi is much quicker and it runs in the pid timer callback
+        self.thermocouple_backend = "bitbang"
+
+        # "timers" - soft timers for control/pi temp with a polling main loop for the display and menu
+        # "asyncio" - every job is an asyncio task with its own period and priority (see asyncruntime.py)
+        # "dualcore" - as timers but the control loop runs on the second core (see dualcore.py)
+        self.runtime = "timers"
+
+        # Start up without the fixed waits - the startup screens stay up while the rest starts and the
+        # control loop starts on the first good thermocouple reading. False for the old sleeps
+        self.fast_boot = True
+        self.boot_timer = None  # BootTimer from the top of start up, per phase times and time to the first control tick
+
+        self.led_setpoint_band = 3    # C either side of the setpoint the status LED counts as at it
         self.display_contrast = 255   # allow change by option in menu
         self.display_rotate = True
+        self.display_frame_governor = True   # Only redraw a screen when what it shows has changed (see framegovernor.py)
+        self.display_max_fps = 10            # Most redraws a second for any screen, 0 for no limit
+        self.screen_max_fps = {"pi_temperature": 2, "stats": 2}   # Screens that want a different limit, by show_screen_ name
+        self.display_label_cache = True      # Blit constant text from pre-rendered tiles (see labelcache.py)
+        self.home_big_reading = True         # Home screen temperature in the big font (see bigfont.py)
+        self.graph_big_reading = False       # Latest reading in the big font in the corner of the graphs
         
         # Below is stuff perhaps better to leave alone
-        self.click_check_timeout = 800 # ms timeout to multi click in 
+        self.long_press_time = 800 # ms held for a long press (manual mode)
+        self.click_gap_time = 400 # ms from letting go to the next press of a multi click
         self.max_allowed_setpoint = 299 # max allowed temperature
         
 
         # below are controlled by internal processes dont mess with 
-        #self.temperature_readings =  {i: 20 for i in range(128)}
-        self.temperature_readings =  {}
+        self.history_size = 128  # samples kept for the graphs - one per pid tick
+        self.temperature_readings = RingBuffer(self.history_size)
+        self.temperature_history = TieredHistory(self.temperature_readings, capacity=self.history_size)  # adds 1s/10s/1min tiers for reviewing a whole session
         self.heater_temperature = 0  # Overal induction heater temperature from thermocouple at the moment only deals with one 
                                      # possibly extend to deal with multpile but not to start with
                                      
-        self.watt_readings = {}
+        self.watt_readings = RingBuffer(self.history_size)
+        self.watt_history = TieredHistory(self.watt_readings, capacity=self.history_size)
+        self.graph_span = 0  # index into TieredHistory.SPAN_LABELS - single click on a graph screen cycles it
+        self.graph_incremental = True  # scroll graphs one column per sample, False redraws and stretches them to the full width every frame
         self.watts = 0
         
         self.pi_temperature = 0         # PI Pico chip temperature
         self.pi_temperature_limit = 60  # Maybe place pico board above/next to mosfet module so we get some idea hot its getting 
+        self.pi_too_hot = False         # Set while heater is held off for the pi temperature
+        self.heater_fault = None        # Error code that stopped the heater for good (needs a reboot)
+        self.heater_fault_message = ""
+        self.heater_too_hot = False     # Set by the control loop while over its hard temperature limit
+        self.print_telemetry = False    # Print the control loop telemetry line to serial each main loop
+        self.probes = Probes()          # Hot path timings - Stats screen and the serial "stats" command
+        self.heap_profile = False       # Report heap allocations per job/callback to serial (see heapprofiler.py)
+        self.heap_profiler = HeapProfiler(self.heap_profile)
+        self.refresh_rate = 0           # Display frames per second
 
         #Maybe make below options have more info eg:
         # setup_rotary_values in inputhandler 
@@ -369,7 +328,8 @@ class SharedState:
                              "Temp Watts Line",
                              "Watts Line",
                              "PI Temperature",
-                             "Display Contrast"
+                             "Display Contrast",
+                             "Stats"
                             ]
                             # Battery/power info screen  - can we get volts & amps? and move to where pid is on home? + level 
                             # Heater / coil info screen - coil length? coil ohm? (user may need to provide ohm reading at 25C)  
@@ -379,31 +339,55 @@ class SharedState:
                             # Get varuous settings for elements in config file as may need to limit highest temp coil can get not to burn insulation PTFE 
                             # ie despite pid/thermocouple - so tcr? or just limit wattage on known values for wire type/length/ohms so it doesnt get too hot 
  
+        self.graph_options = ("Graph Setpoint", "Graph Line", "Graph Bar", "Temp Watts Line", "Watts Line")
+        self.screens = ScreenRegistry()  # What each menu_options entry draws, built at startup once the display is up
+
         self.in_menu = False  # need to add get/set fnctions? 
         self.current_menu_position = 0 # need to add get/set functions? - dont let get more than one or count of options -1
         self.menu_selection_pending = False 
         self.menu_timeout = 3 * 1000   # 3 secs
         
-        self.rotary_direction = None
-        self.rotary_last_mode = None
+        self.menu_steps = 0  # Rotary detents for the menu to move, + is up
+        self.rotary_last_mode = None  # ScreenRegistry.ROTARY_ configuration the rotary is set up for
+        # Button gestures -> InputHandler.gesture_<action>, by context - "menu", a screen by name (as in show_screen_<name>),
+        # "graph" for the graph screens or "default". A gesture acts as soon as nothing else bound could still follow it
+        default_gestures = {
+            GestureRecogniser.CLICK: "extend_session",
+            GestureRecogniser.DOUBLE_CLICK: "open_menu",
+            GestureRecogniser.TRIPLE_CLICK: "toggle_session",
+            GestureRecogniser.QUADRUPLE_CLICK: "one_minute_session",
+            GestureRecogniser.LONG_PRESS: "manual_on",
+            GestureRecogniser.LONG_RELEASE: "manual_off",
+            GestureRecogniser.PRESS_ROTATE: "coarse_adjust",
+        }
+        graph_gestures = dict(default_gestures)
+        graph_gestures[GestureRecogniser.CLICK] = "extend_session_or_graph_span"
+        self.gesture_bindings = {
+            "menu": {GestureRecogniser.CLICK: "select"},
+            "graph": graph_gestures,
+            "default": default_gestures,
+        }
+
+        # Turning faster moves further per detent - (max us between detents, multiplier) fastest first, by rotary mode
+        self.rotary_acceleration = {
+            ScreenRegistry.ROTARY_SETPOINT: ((12000, 10), (25000, 5), (50000, 2)),
+            ScreenRegistry.ROTARY_CONTRAST: ((12000, 16), (25000, 8), (50000, 2)),
+            ScreenRegistry.ROTARY_MENU: (),   # One entry per detent
+        }
 
         self.session_start_time = 0
         self.session_setpoint_reached = False
         self.session_reset_pid_when_near_setpoint = True # Seems to help improve overshoot reduction by resetting pid stats once near setpoint from cold
+        self.session_end_sound_pending = False  # Set when get_mode() ends a session, played by the supervisor
         self._mode = "Off" 
 
 
     def get_mode(self):
         if self._mode == "Session" and (self.session_timeout - self.get_session_mode_duration()) < 0:
             session_start_time = 0
-            led_pin.off()
             self._mode = "Off"  # Set off here rather than after playing sounds as this can get called again while sounds being played
             self.session_setpoint_reached = False
-            buzzer_play_tone(buzzer, 1500, 200)
-            utime.sleep_ms(200)
-            buzzer_play_tone(buzzer, 1000, 200)
-            utime.sleep_ms(200)
-            buzzer_play_tone(buzzer, 500, 200)
+            self.session_end_sound_pending = True  # This gets called from the timers, the supervisor plays it
         return self._mode
 
     def set_mode(self, new_mode):
@@ -416,13 +400,13 @@ class SharedState:
             self._mode = "Session"
         else:
             raise ValueError("Invalid mode. Must be 'Off', 'Session' or 'Manual'")
-        if new_mode == "Off":
-            led_pin.off()
-        else:
-            led_pin.on()
-            pid.reset()
+        if new_mode != "Off":
+            control_loop.reset_pid()
             print("PID Stats reset")
             
+    def cycle_graph_span(self):
+        self.graph_span = (self.graph_span + 1) % len(TieredHistory.SPAN_LABELS)
+
     def get_session_mode_duration(self):
         return utime.ticks_diff(utime.ticks_ms(), self.session_start_time)
 
@@ -443,24 +427,39 @@ class SharedState:
 #
 # Other errors should be reported on the screen as it should now be avaliable
 #
+# Each phase is timed and printed as "Boot: ..." - the serial "boot" command shows them again
+# with the time to the first control tick
+#
 ###############################################################
 
+boot_timer = BootTimer()
+BOOT_PHASES = 10  # For the fast boot progress bar
+
+def boot_phase_done(name):
+    boot_timer.phase(name)
+    if shared_state.fast_boot: display_manager.show_startup_progress(len(boot_timer.phases), BOOT_PHASES)
+
 print("LED Initialising ...")
 try:
     #led_pin = Pin(hardware_pin_led, Pin.OUT) #This is the built in pin on the pico
     led_pin = Pin("LED", Pin.OUT) 
-    led_pin.on()
-    utime.sleep_ms(75)
-    led_pin.off()
-    utime.sleep_ms(75)
-    led_pin.on()
-    utime.sleep_ms(75)
-    led_pin.off()
+    leds = LedPatterns(led_pin)
+    leds.play_once(LedPatterns.BOOT)  # Blinks on while the rest starts up
     print("LED initialised.")
 except Exception as e:
     print("Error initializing LED pin, unable to continue:", e)
     sys.exit()
 
+# The LED patterns and buzzer sounds step on one shared tick, a soft timer from once shared_state is up
+# so they keep going through the rest of start up (the asyncio runtime swaps it for a task)
+INDICATOR_TICK_MS = 20
+indicator_jobs = [leds.update]
+
+def indicator_tick(t):
+    for job in indicator_jobs:
+        job()
+boot_timer.phase("led")
+
 #Maybe still add an external led - colour one perhaps to indicate above/below/on temp to see from a distance?
 #make special colour for manual vs session?
 #also add buzzer to sound when session about to end as you dont notice 
@@ -468,10 +467,15 @@ except Exception as e:
 
 
 print("Display Initialising ...")
-display = initialize_display(hardware_pin_display_scl, hardware_pin_display_sda, led_pin)  # Move to HARDWARE.conf ?
+display = initialize_display(hardware_pin_display_scl, hardware_pin_display_sda, leds, hardware_display_i2c_freq)  # Move to HARDWARE.conf ?
 print("Display initialised.")
 
 shared_state = SharedState()
+shared_state.boot_timer = boot_timer
+indicator_timer = CustomTimer(INDICATOR_TICK_MS, machine.Timer.PERIODIC, shared_state.heap_profiler.wrap_callback("indicator timer", indicator_tick))
+indicator_timer.start()
+boot_timer.phase("display")
+display.set_timing_probe(shared_state.probes, Probes.DISPLAY_SHOW)
 
 #config = load_config(display)  # need to get config before displaymanager setup perhaps? so if error still need to show user
 #shared_state = SharedState(config)
@@ -480,7 +484,7 @@ shared_state = SharedState()
 # DisplayManager
 try:
     display_manager = DisplayManager(display, shared_state)
-    display_manager.show_startup_screen()
+    display_manager.show_startup_screen(not shared_state.fast_boot)
 except Exception as e:
     error_text = "Start up failed - [display-setup] " + MAIN_ERROR_MESSAGES["display-setup"] + " " + str(e)
     print(error_text + " " + str(e))
@@ -488,19 +492,22 @@ except Exception as e:
     display.text(error_text, 0, 0)
     display.text(str(e), 0, 15)
     display.show()
+    leds.set(LedPatterns.blink_code(2))  # Flash a LED as a backup
     while True:
-        # Flash a LED as a backup - maybe some kind of code like one flash,flash,off,off,flash.off,off etc 
         utime.sleep_ms(100)
     sys.exit()
+boot_phase_done("splash")
 
 
 
 # Buzzer - 2 short buzzes for notifying user session has ended 
 #        - 1 buzz when hitting setpoint for first time in a session
 print("Buzzer Initialising ...")
-buzzer = PWM(Pin(hardware_pin_buzzer))
-buzzer_play_tone(buzzer, 2500, 200)  # Play a sound so we know its connected correctly
+buzzer = BuzzerSequencer(PWM(Pin(hardware_pin_buzzer)))  # Sounds play on the indicator tick, nothing waits for them
+indicator_jobs.append(buzzer.update)
+buzzer.play(BuzzerSequencer.CONNECTED)  # Play a sound so we know its connected correctly
 print("Buzzer initialised.")
+boot_phase_done("buzzer")
 
 
 button_pin = Pin(hardware_pin_button, Pin.IN)
@@ -511,32 +518,42 @@ if button_pin.value():
     print("Watchdog: On")
 else:
     enable_watchdog = False
-    utime.sleep_ms(150)
-    buzzer_play_tone(buzzer, 2000, 250)
-    utime.sleep_ms(150)
-    buzzer_play_tone(buzzer, 1000, 250)
-    display_manager.show_watchdog_off_screen()
+    buzzer.play(BuzzerSequencer.WATCHDOG_OFF)
+    display_manager.show_watchdog_off_screen(not shared_state.fast_boot)
     print("Watchdog: Off")
 del button_pin
+boot_phase_done("watchdog check")
 
 # Maybe put in function reset when options reloaded as they may affect settings
 #Termocouple K type
 #MAX6675
 
 # Initialize termocouple before switching on induction heater
-try:
-    utime.sleep_ms(700)
-    thermocouple = Thermocouple(hardware_pin_termocouple_sck, hardware_pin_termocouple_cs, hardware_pin_termocouple_so, shared_state.heater_on_temperature_difference_threshold)
-    utime.sleep_ms(350)
-    _, _ = thermocouple.get_filtered_temp(False)  # Sets: last_known_safe_temp - Do here rather than in class as it sometimes returns error if on class init 
-except Exception as e:
+THERMOCOUPLE_FIRST_READING_TIMEOUT_MS = 1000  # Fast boot, about what the old sleeps gave it
+
+def thermocouple_setup_failed(e):
     error_text = "Start up failed: " + str(e)
     print(error_text)
+    display_manager.display_error("thermocouple-setup", str(error_text), priority=ErrorDisplay.PRIORITY_FATAL)
+    leds.set(LedPatterns.blink_code(4))
     while True:
-        display_manager.display_error("thermocouple-setup",str(error_text))
-        utime.sleep_ms(100)
+        display_manager.update_error()
+        utime.sleep_ms(ErrorDisplay.SCROLL_SPEED)
     sys.exit() #?
 
+try:
+    if not shared_state.fast_boot: utime.sleep_ms(700)
+    thermocouple = Thermocouple(hardware_pin_termocouple_sck, hardware_pin_termocouple_cs, hardware_pin_termocouple_so, shared_state.heater_on_temperature_difference_threshold,
+                                backend=shared_state.thermocouple_backend, spi_id=hardware_termocouple_spi_id)
+    if shared_state.fast_boot:
+        thermocouple.start_conversion()  # Converts while the rest starts up, read just before the control loop starts
+    else:
+        utime.sleep_ms(350)
+        _, _ = thermocouple.get_filtered_temp(False)  # Sets: last_known_safe_temp - Do here rather than in class as it sometimes returns error if on class init 
+except Exception as e:
+    thermocouple_setup_failed(e)
+boot_phase_done("thermocouple")
+
 # 1-Wire temperature sensor 
 # can chain more than one together easly so will be useful for >1 coils
 # not needed for the time being - maybe tie each sensor to the heater coil in ih class?
@@ -553,11 +570,18 @@ pi_temperature_sensor = machine.ADC(4)
 shared_state.pi_temperature = get_pi_temperature_or_handle_error(pi_temperature_sensor)
 
 
+def show_home_screen():
+    display_manager.show_screen_home_screen(pid.components, heater)
+    display_manager.display_heartbeat()
+
+shared_state.screens.build(shared_state, display_manager, show_home_screen)
+
 # InputHandler
 input_handler = InputHandler(rotary_clk_pin=hardware_pin_rotary_clk, rotary_dt_pin=hardware_pin_rotary_dt, button_pin=hardware_pin_button, shared_state=shared_state)
 
 # MenuSystem
 menu_system = MenuSystem(display_manager, shared_state)
+boot_phase_done("ui")
 
 
 # PID
@@ -611,24 +635,48 @@ heater = HeaterFactory.create_heater('element', hardware_pin_heater, shared_stat
 heater.off()
 
 
-pidTimer = CustomTimer(371, machine.Timer.PERIODIC, timerUpdatePIDandHeater)  # need to have timer setup before calling below 
-shared_state.heater_temperature, _ = get_thermocouple_temperature_or_handle_error(thermocouple, heater)
-
-print("Timers Initialising ...")
-pidTimer.start()
-pid.reset()
-
-
-piTempTimer = CustomTimer(903, machine.Timer.PERIODIC, timerSetPiTemp)
-piTempTimer.start()
-
+if shared_state.runtime == "dualcore":
+    control_loop = DualCoreControlLoop(pid, heater, thermocouple, shared_state)
+else:
+    control_loop = ControlLoop(pid, heater, thermocouple, shared_state)
+heater_fault_reported = False
+heater_too_hot_reported = False
+pi_too_hot_handled = False
 
+PID_PERIOD_MS = 371
+PI_TEMPERATURE_PERIOD_MS = 903
+boot_phase_done("control setup")
 
-print("Timers initialised.")
+if shared_state.fast_boot:
+    try:
+        thermocouple.wait_for_reading(THERMOCOUPLE_FIRST_READING_TIMEOUT_MS)  # Sets: last_known_safe_temp
+    except Exception as e:
+        thermocouple_setup_failed(e)
+    boot_phase_done("first reading")
+shared_state.heater_temperature, _ = control_loop.read_temperature()
+
+if shared_state.runtime in ("timers", "dualcore"):
+    print("Timers Initialising ...")
+    if shared_state.runtime == "dualcore":
+        pid.reset()
+        control_loop.start(PID_PERIOD_MS)
+    else:
+        pid.reset()  # Before the fast boot tick so that tick's pid state is kept
+        pidTimer = CustomTimer(PID_PERIOD_MS, machine.Timer.PERIODIC, shared_state.heap_profiler.wrap_callback("pid timer", timerUpdatePIDandHeater))
+        if shared_state.fast_boot: control_loop.tick()  # First tick on the reading just taken rather than a period later
+        pidTimer.start()
+
+    piTempTimer = CustomTimer(PI_TEMPERATURE_PERIOD_MS, machine.Timer.PERIODIC, shared_state.heap_profiler.wrap_callback("pi timer", timerSetPiTemp))
+    piTempTimer.start()
+    print("Timers initialised.")
+else:
+    pid.reset()
+boot_phase_done("timers")
 
 
 # start up stuff done
 ############### 
+print("Boot: started in " + str(boot_timer.elapsed()) + "ms")
 
 
 
@@ -640,66 +688,149 @@ if enable_watchdog:
     print("Watchdog enabled")
 
 
+def toggle_telemetry():
+    shared_state.print_telemetry = not shared_state.print_telemetry
 
-start_time = utime.ticks_ms()
-iteration_count = 0
-refresh_rate = 0
 
-# Sort of a load average 
-#start_times = [utime.ticks_ms(), utime.ticks_ms(), utime.ticks_ms()] 
-#iteration_counts = [0, 0, 0] 
-#period_durations = [1000, 10000, 30000]
+# Type these on the serial console (eg mpremote) while running
+serial_commands = SerialCommands()
+serial_commands.add("stats", shared_state.probes.dump)
+serial_commands.add("stats reset", shared_state.probes.reset)
+serial_commands.add("telemetry", toggle_telemetry)
+serial_commands.add("heap", shared_state.heap_profiler.report)
+serial_commands.add("boot", boot_timer.report)
 
+frame_count = 0
+frame_count_start = utime.ticks_ms()
 
-while True:
-    if not shared_state.in_menu:
+
+# Main loop jobs - called in turn by the timers loop below or as separate tasks by the asyncio runtime
+
+def update_display():
+    display.begin_frame()  # Screen draws and the heartbeat go out as one display update
+    if display_manager.update_error():
+        pass # Error animation has the screen this frame, control carries on in the timers
+    elif display_manager.is_held():
+        pass # Start up screen still up (fast boot)
+    elif not shared_state.in_menu:
         #print(shared_state.current_menu_position)
-        if shared_state.current_menu_position <= 1:
-            if shared_state.rotary_last_mode != "setpoint": 
+        if shared_state.current_menu_position <= MenuSystem.HOME_POSITION:
+            shared_state.current_menu_position = MenuSystem.HOME_POSITION
+            if shared_state.rotary_last_mode != ScreenRegistry.ROTARY_SETPOINT: 
                 input_handler.setup_rotary_values()
-            shared_state.current_menu_position = 1
-            display_manager.show_screen_home_screen(pid.components, heater)
-            display_manager.display_heartbeat()
+            shared_state.screens.render(MenuSystem.HOME_POSITION)
         else:
-            if shared_state.rotary_last_mode != shared_state.menu_options[shared_state.current_menu_position]: 
+            if shared_state.rotary_last_mode != shared_state.screens.get(shared_state.current_menu_position).rotary_mode: 
                 input_handler.setup_rotary_values()
             #print ("Displaying " + shared_state.menu_options[shared_state.current_menu_position])
             menu_system.display_selected_option()
-            
     else:
-        if shared_state.rotary_last_mode != "menu": 
-            input_handler.setup_rotary_values()
-        if shared_state.menu_selection_pending:
-            menu_system.handle_menu_selection()                                               
-            shared_state.menu_selection_pending = False
-
-        elif shared_state.rotary_direction is not None:
-            menu_system.navigate_menu(shared_state.rotary_direction)
-            shared_state.rotary_direction = None
-        else:
-            pass
+        update_menu()
+    display.end_frame()
+    count_frame()
+
+
+def count_frame():
+    global frame_count, frame_count_start
+    frame_count += 1
+    elapsed_time = utime.ticks_diff(utime.ticks_ms(), frame_count_start)
+    if elapsed_time >= 1000:
+        shared_state.refresh_rate = frame_count / (elapsed_time / 1000.0)
+        frame_count = 0
+        frame_count_start = utime.ticks_ms()
+
+
+def update_input():
+    # Acts on the rotary/button events the interrupts queued, then the menu
+    input_handler.process_events()
+    update_menu()
+
+
+def update_menu():
+    # Acts on rotary/button input while the menu is up, leaves it queued while an error is showing
+    if not shared_state.in_menu or display_manager.error_display.is_active():
+        return
+    if shared_state.rotary_last_mode != ScreenRegistry.ROTARY_MENU: 
+        input_handler.setup_rotary_values()
+    if shared_state.menu_selection_pending:
+        menu_system.handle_menu_selection()                                               
+        shared_state.menu_selection_pending = False
+
+    elif shared_state.menu_steps:
+        steps = shared_state.menu_steps
+        shared_state.menu_steps = 0
+        menu_system.move(steps)
+
+
+def update_status_led():
+    # Heartbeat when off, blinking while heating up and on at the setpoint
+    if shared_state.get_mode() == "Off":
+        leds.set(LedPatterns.HEARTBEAT)
+    elif abs(shared_state.heater_temperature - shared_state.setpoint) <= shared_state.led_setpoint_band:
+        leds.set(LedPatterns.AT_SETPOINT)
+    else:
+        leds.set(LedPatterns.HEATING)
+
+
+def update_supervisor():
+    if shared_state.runtime == "dualcore": control_loop.sync()
+
+    if shared_state.session_end_sound_pending:
+        shared_state.session_end_sound_pending = False
+        buzzer.play(BuzzerSequencer.SESSION_END)
 
-    
     if shared_state.get_mode() == "Session" and shared_state.session_setpoint_reached == False:
          if shared_state.heater_temperature >= (shared_state.setpoint-8):  
             shared_state.session_setpoint_reached = True
-            buzzer_play_tone(buzzer, 1500, 350)
+            buzzer.play(BuzzerSequencer.SETPOINT_REACHED)
             if shared_state.session_reset_pid_when_near_setpoint:
-                pid.reset()
+                control_loop.reset_pid()
 
-    if enable_watchdog: watchdog.feed()
+    check_pi_temperature()
+    check_control_faults()
+    update_status_led()
+    boot_timer.update()
+    if shared_state.print_telemetry: print(control_loop.telemetry_string())
+    serial_commands.poll()
+    shared_state.heap_profiler.update()
 
     # need to check if heater is on and temps not rising to warn user after 10 sec? 
     # eg heater pwm cable could be loose , no power to heater,  thermocouple issue 
-    
-    iteration_count += 1
-    current_time = utime.ticks_ms()
-    elapsed_time = utime.ticks_diff(current_time, start_time)
-    if elapsed_time >= 1000: 
-        refresh_rate = iteration_count / (elapsed_time / 1000.0)
-       # print("Refresh rate:", refresh_rate, "Hz")
-        iteration_count = 0
-        start_time = utime.ticks_ms()
+
+
+if shared_state.runtime == "asyncio":
+    # Higher priority runs first when tasks are due together, the watchdog is only fed while they all keep running
+    # The rotary/button interrupts only queue events, the input task acts on them
+    runtime = AsyncRuntime()
+    heap_profiler = shared_state.heap_profiler
+    runtime.add_task("control", PID_PERIOD_MS, 5, heap_profiler.wrap("control", control_loop.tick))
+    runtime.add_task("sensing", PI_TEMPERATURE_PERIOD_MS, 4, heap_profiler.wrap("sensing", lambda: timerSetPiTemp(None)))
+    runtime.add_task("input", 20, 3, heap_profiler.wrap("input", update_input))
+    runtime.add_task("supervisor", 100, 3, heap_profiler.wrap("supervisor", update_supervisor))
+    runtime.add_task("display", 70, 2, heap_profiler.wrap("display", update_display))
+    indicator_timer.stop()
+    runtime.add_task("indicators", INDICATOR_TICK_MS, 1, heap_profiler.wrap("indicators", lambda: indicator_tick(None)))
+    if enable_watchdog: runtime.set_watchdog(watchdog)
+    runtime.run()
+
+
+
+# Sort of a load average 
+#start_times = [utime.ticks_ms(), utime.ticks_ms(), utime.ticks_ms()] 
+#iteration_counts = [0, 0, 0] 
+#period_durations = [1000, 10000, 30000]
+
+
+run_input = shared_state.heap_profiler.wrap("input", input_handler.process_events)  # update_display does the menu
+run_display = shared_state.heap_profiler.wrap("display", update_display)
+run_supervisor = shared_state.heap_profiler.wrap("supervisor", update_supervisor)
+
+while True:
+    run_input()
+    run_display()
+    run_supervisor()
+
+    if enable_watchdog: watchdog.feed()
 
 ## Sort of a load average 
 #    for i in range(len(iteration_counts)):
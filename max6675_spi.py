@@ -0,0 +1,69 @@
+import utime
+
+class MAX6675_SPI:
+    MEASUREMENT_PERIOD_MS = 220
+
+    def __init__(self, spi, cs):
+
+        """
+        Creates new object for reading MAX6675 through a machine.SPI (or machine.SoftSPI) bus.
+        Keeps the same read()/error()/ready() API as max6675_utime.MAX6675 so either can be used.
+        :param spi: SPI bus, must be set up for mode 0 (polarity=0, phase=0) at no more than 4.3MHz
+        :param cs: CS (select) pin, must be configured as Pin.OUT
+        """
+
+        self._spi = spi
+
+        self._cs = cs
+        self._cs.high()
+
+        self._buffer = bytearray(2)  # Preallocated so a read does not allocate
+
+        self._last_measurement_start = utime.ticks_add(utime.ticks_ms(), -MAX6675_SPI.MEASUREMENT_PERIOD_MS - 1)  # First read is ready whatever ticks is at
+        self._last_read_temp = 0
+        self._error = 0
+
+    def refresh(self):
+        """
+        Start a new measurement.
+        """
+        self._cs.low()
+        self._cs.high()
+        self._last_measurement_start = utime.ticks_ms()
+
+    def ready(self):
+        """
+        Signals if measurement is finished.
+        :return: True if measurement is ready for reading.
+        """
+        return utime.ticks_diff(utime.ticks_ms(), self._last_measurement_start) > MAX6675_SPI.MEASUREMENT_PERIOD_MS
+
+    def error(self):
+        """
+        Returns error bit of last reading. If this bit is set (=1), there's problem with the
+        thermocouple - it can be damaged or loosely connected
+        :return: Error bit value
+        """
+        return self._error
+
+    def read(self):
+        """
+        Reads last measurement and starts a new one. If new measurement is not ready yet, returns last value.
+        Note: The last measurement can be quite old (e.g. since last call to `read`).
+        To refresh measurement, call `refresh` and wait for `ready` to become True before reading.
+        :return: Measured temperature
+        """
+        if self.ready():
+            # Whole 16 bit frame in one transfer, CS setup time is only 100ns so no settle sleep needed
+            self._cs.low()
+            self._spi.readinto(self._buffer)
+            self._cs.high()
+            self._last_measurement_start = utime.ticks_ms()
+
+            # Bit 15 dummy sign, bits 14-3 temperature, bit 2 open input, bits 1-0 device id/state
+            value = (self._buffer[0] << 8) | self._buffer[1]
+            self._error = (value >> 2) & 1
+
+            self._last_read_temp = ((value >> 3) & 0x0FFF) * 0.25
+
+        return self._last_read_temp
@@ -22,7 +22,7 @@ class MAX6675:
         self._so = so
         self._so.low()
 
-        self._last_measurement_start = 0
+        self._last_measurement_start = utime.ticks_add(utime.ticks_ms(), -MAX6675.MEASUREMENT_PERIOD_MS - 1)  # First read is ready whatever ticks is at
         self._last_read_temp = 0
         self._error = 0
 
@@ -3,6 +3,8 @@ from machine import Timer
 from customtimer import CustomTimer
 
 class MenuSystem:
+    HOME_POSITION = 1  # "Home Screen" in SharedState.menu_options, the "MENU" title above it also goes home
+
     def __init__(self, display_manager, shared_state):
     
         print("MenuSystem Initialising ...")
@@ -10,7 +12,7 @@ class MenuSystem:
         self.display_manager = display_manager
         self.shared_state = shared_state
         self.menu_start_time = None 
-        self.timeout_timer = CustomTimer(period=1000, mode=Timer.PERIODIC, callback=self.check_timeout)
+        self.timeout_timer = CustomTimer(period=1000, mode=Timer.PERIODIC, callback=self.shared_state.heap_profiler.wrap_callback("menu timer", self.check_timeout))
         
         #self.last_displayed_position = self.shared_state.current_menu_position
         #self.last_navigation_time = 0
@@ -21,21 +23,12 @@ class MenuSystem:
 
 
     def navigate_menu(self, direction):
-            
+        self.move(1 if direction == 'up' else -1)
+
+    def move(self, steps):
+        # Up (+) or down (-) the menu by steps, stopping at the ends
         menu_length = len(self.shared_state.menu_options)
-        
-        if direction == 'up':
-            self.shared_state.current_menu_position = (
-                self.shared_state.current_menu_position + 1 
-                if self.shared_state.current_menu_position < menu_length - 1 
-                else menu_length - 1
-            )
-        elif direction == 'down':
-            self.shared_state.current_menu_position = (
-                self.shared_state.current_menu_position - 1 
-                if self.shared_state.current_menu_position > 0 
-                else 0
-            )
+        self.shared_state.current_menu_position = min(menu_length - 1, max(0, self.shared_state.current_menu_position + steps))
 
 
         # Update last movement time
@@ -70,14 +63,12 @@ class MenuSystem:
 
 
     def display_selected_option(self):
-        selected_option = self.shared_state.menu_options[self.shared_state.current_menu_position]
-        selected_option = selected_option.replace(' ', '_')
-        selected_option = selected_option.lower()
-        if selected_option == "home_screen":
+        position = self.shared_state.current_menu_position
+        if position == self.HOME_POSITION:
             self.exit_menu()
             return
         #self.exit_menu() #see if this fixes issue
-        self.display_manager.display_screen(selected_option)
+        self.shared_state.screens.render(position)
         self.exit_menu() 
 
 
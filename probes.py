@@ -0,0 +1,94 @@
+import utime
+from array import array
+
+class Probes:
+    # ticks_us timings for the hot paths - min/avg/max and a small histogram per probe.
+    #
+    # Everything is in arrays sized up front so record() can be called from the timer and pin
+    # interrupt callbacks without allocating. Totals (and the count with them) are halved before
+    # they get near the small int limit, so the average follows recent behaviour and never needs a long int.
+
+    # Fixed probes, screens add their own with add()
+    PID = 0
+    THERMOCOUPLE = 1
+    DISPLAY_SHOW = 2
+    ROTARY = 3
+    NAMES = ("pid", "tc read", "show", "rotary")
+
+    HISTOGRAM_LIMITS_US = (100, 300, 1000, 3000, 10000, 30000)  # Bucket upper bounds, one more bucket for anything slower
+    MAX_PROBES = 16
+    TOTAL_LIMIT = 0x1FFFFFFF
+    NO_MINIMUM = 0x3FFFFFFF
+
+    def __init__(self, max_probes=MAX_PROBES):
+        self.names = list(self.NAMES)
+        self.buckets = len(self.HISTOGRAM_LIMITS_US) + 1
+        self.counts = array('i', [0] * max_probes)
+        self.totals = array('i', [0] * max_probes)
+        self.minimums = array('i', [self.NO_MINIMUM] * max_probes)
+        self.maximums = array('i', [0] * max_probes)
+        self.histogram = array('H', [0] * (max_probes * self.buckets))
+
+    def add(self, name):
+        # Returns the id to record against, the same name always gets the same id
+        if name in self.names:
+            return self.names.index(name)
+        if len(self.names) == len(self.counts):
+            raise ValueError("No room for probe " + name)
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def record(self, probe, us):
+        count = self.counts[probe] + 1
+        total = self.totals[probe] + us
+        if total > self.TOTAL_LIMIT:
+            count >>= 1
+            total >>= 1
+        self.counts[probe] = count
+        self.totals[probe] = total
+        if us < self.minimums[probe]: self.minimums[probe] = us
+        if us > self.maximums[probe]: self.maximums[probe] = us
+
+        limits = self.HISTOGRAM_LIMITS_US
+        bucket = 0
+        while bucket < len(limits) and us > limits[bucket]:
+            bucket += 1
+        index = probe * self.buckets + bucket
+        if self.histogram[index] < 0xFFFF: self.histogram[index] += 1
+
+    def stop(self, probe, start_us):
+        # Records the time since start_us (a ticks_us() taken before the code being timed)
+        self.record(probe, utime.ticks_diff(utime.ticks_us(), start_us))
+
+    def average(self, probe):
+        count = self.counts[probe]
+        return self.totals[probe] // count if count else 0
+
+    def minimum(self, probe):
+        return self.minimums[probe] if self.counts[probe] else 0
+
+    def reset(self):
+        for probe in range(len(self.counts)):
+            self.counts[probe] = 0
+            self.totals[probe] = 0
+            self.minimums[probe] = self.NO_MINIMUM
+            self.maximums[probe] = 0
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+
+    def dump(self):
+        # Table for the serial console, times in us
+        limits = self.HISTOGRAM_LIMITS_US
+        header = "{:16} {:>6} {:>7} {:>7} {:>7}".format("probe", "n", "min", "avg", "max")
+        for limit in limits:
+            header += " {:>6}".format("<" + str(limit))
+        print(header + " {:>6}".format(">" + str(limits[-1])))
+        for probe in range(len(self.names)):
+            if not self.counts[probe]:
+                continue
+            line = "{:16} {:6d} {:7d} {:7d} {:7d}".format(self.names[probe], self.counts[probe], self.minimum(probe),
+                                                           self.average(probe), self.maximums[probe])
+            offset = probe * self.buckets
+            for bucket in range(self.buckets):
+                line += " {:6d}".format(self.histogram[offset + bucket])
+            print(line)
@@ -0,0 +1,101 @@
+from array import array
+import utime
+
+class RingBuffer:
+    # Fixed capacity history of (ticks_ms, value) samples
+    # Storage is preallocated so appending (eg from the pid timer callback) never allocates or scans,
+    # when full the oldest sample is overwritten.
+    def __init__(self, capacity=128, typecode='i'):
+        self.capacity = capacity
+        self.times = array('i', [0] * capacity)
+        self.values = array(typecode, [0] * capacity)
+        self.count = 0
+        self.appended = 0  # Total appends ever, lets readers spot new samples without comparing data
+        self._head = 0     # Next slot to write
+        self._min = 0
+        self._max = 0
+        self._extremes_stale = False
+
+    def __len__(self):
+        return self.count
+
+    def append(self, time, value):
+        head = self._head
+        if self.count == self.capacity:
+            # Overwriting the oldest sample, if it held the min or max they need a rescan
+            # do that lazily when next asked for rather than here as this runs in the timer callback
+            evicted = self.values[head]
+            if evicted == self._min or evicted == self._max:
+                self._extremes_stale = True
+        else:
+            self.count += 1
+
+        self.times[head] = time
+        self.values[head] = value
+        self._head = (head + 1) % self.capacity
+        self.appended += 1
+
+        if self.count == 1:
+            self._min = value
+            self._max = value
+            self._extremes_stale = False
+        elif not self._extremes_stale:
+            if value < self._min: self._min = value
+            if value > self._max: self._max = value
+
+    def clear(self):
+        self.count = 0
+        self._head = 0
+        self._extremes_stale = False
+
+    def _index(self, i):
+        # i = 0 is the oldest sample, len - 1 the newest
+        return (self._head - self.count + i) % self.capacity
+
+    def time_at(self, i):
+        return self.times[self._index(i)]
+
+    def value_at(self, i):
+        return self.values[self._index(i)]
+
+    def latest(self):
+        return self.values[(self._head - 1) % self.capacity]
+
+    def latest_time(self):
+        return self.times[(self._head - 1) % self.capacity]
+
+    def oldest_time(self):
+        return self.times[self._index(0)]
+
+    def time_span(self):
+        # ms between the oldest and newest samples, wrap safe
+        if self.count < 2:
+            return 0
+        return utime.ticks_diff(self.latest_time(), self.oldest_time())
+
+    def _rescan_extremes(self):
+        index = self._index(0)
+        values = self.values
+        low = high = values[index]
+        for _ in range(self.count - 1):
+            index = (index + 1) % self.capacity
+            value = values[index]
+            if value < low: low = value
+            if value > high: high = value
+        self._min = low
+        self._max = high
+        self._extremes_stale = False
+
+    def min_value(self):
+        if self._extremes_stale: self._rescan_extremes()
+        return self._min
+
+    def max_value(self):
+        if self._extremes_stale: self._rescan_extremes()
+        return self._max
+
+    def items(self):
+        # Oldest to newest (time, value) pairs
+        for i in range(self.count):
+            index = self._index(i)
+            yield self.times[index], self.values[index]
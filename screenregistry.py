@@ -0,0 +1,63 @@
+import utime
+
+class Screen:
+    # One menu entry - what draws it, how the rotary is set up while it is showing and its redraw limit
+    def __init__(self, label, name, render, rotary_mode, graph, probe):
+        self.label = label
+        self.name = name              # Label in snake case, as in show_screen_<name>
+        self.render = render          # Called with no arguments, None for the "MENU" title entry
+        self.rotary_mode = rotary_mode
+        self.graph = graph            # Single click cycles the graph span
+        self.probe = probe
+
+
+class ScreenRegistry:
+    # Menu index -> Screen, built once at startup from SharedState.menu_options so the main loop,
+    # menu and rotary handling only ever index into it rather than working things out from the labels.
+
+    # Rotary configurations, SharedState.rotary_last_mode holds the one last set up
+    ROTARY_SETPOINT = 1
+    ROTARY_CONTRAST = 2
+    ROTARY_MENU = 3
+
+    ROTARY_MODES = {"Display Contrast": ROTARY_CONTRAST}  # Anything else adjusts the setpoint
+
+    def __init__(self):
+        self.screens = []
+        self.probes = None
+
+    def __len__(self):
+        return len(self.screens)
+
+    def build(self, shared_state, display_manager, home_render):
+        # home_render draws the home screen, the others are DisplayManager.show_screen_<label in snake case>
+        probes = shared_state.probes
+        self.probes = probes
+        self.screens = []
+        for label in shared_state.menu_options:
+            name = label.replace(' ', '_').lower()
+            if name == "menu":
+                render = None
+            elif name == "home_screen":
+                render = home_render
+            else:
+                render = getattr(display_manager, "show_screen_" + name, None)
+                if render is None:
+                    print("No method found for option: " + label)
+            fps = shared_state.screen_max_fps.get(name)
+            if fps is not None:
+                display_manager.governor.set_max_fps(name, fps)   # Screens use their name with the governor
+            self.screens.append(Screen(label, name, render, self.ROTARY_MODES.get(label, self.ROTARY_SETPOINT),
+                                       label in shared_state.graph_options, probes.add(name) if render else None))
+
+    def get(self, index):
+        return self.screens[index]
+
+    def render(self, index):
+        screen = self.screens[index]
+        if screen.render is None:
+            return
+        probes = self.probes
+        start_us = utime.ticks_us()
+        screen.render()
+        probes.stop(screen.probe, start_us)
@@ -0,0 +1,55 @@
+import framebuf
+
+class ScrollingGraph:
+    # Plot area kept in its own framebuffer, one column per sample with the newest on the right.
+    # When new samples arrive the plot is scrolled left and only the new columns are drawn,
+    # it is only redrawn from scratch when the screen, series or y scale changes.
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(((height + 7) // 8) * width)
+        self.fb = framebuf.FrameBuffer(self.buffer, width, height, framebuf.MONO_VLSB)
+        self.full_redraws = 0
+        self._screen = None
+        self._series = None
+        self._scale_low = None
+        self._scale_high = None
+        self._last_appended = 0
+
+    def invalidate(self):
+        self._screen = None
+
+    def update(self, screen, series, scale_low, scale_high, draw_column):
+        # screen: id of the calling screen, scale_low/high: whatever the y mapping depends on
+        # draw_column(fb, series, i, x) draws sample i of series into column x
+        new_samples = series.appended - self._last_appended
+        if (screen != self._screen or series is not self._series
+                or scale_low != self._scale_low or scale_high != self._scale_high
+                or new_samples < 0 or new_samples >= self.width):
+            self._redraw(series, draw_column)
+            self._screen = screen
+            self._series = series
+            self._scale_low = scale_low
+            self._scale_high = scale_high
+        elif new_samples:
+            width = self.width
+            self.fb.scroll(-new_samples, 0)
+            self.fb.fill_rect(width - new_samples, 0, new_samples, self.height, 0)
+            count = len(series)
+            if new_samples > count: new_samples = count
+            for k in range(new_samples):
+                draw_column(self.fb, series, count - new_samples + k, width - new_samples + k)
+        self._last_appended = series.appended
+
+    def _redraw(self, series, draw_column):
+        self.full_redraws += 1
+        self.fb.fill(0)
+        count = len(series)
+        columns = count if count < self.width else self.width
+        first_x = self.width - columns
+        first_i = count - columns
+        for k in range(columns):
+            draw_column(self.fb, series, first_i + k, first_x + k)
+
+    def blit_to(self, display, x=0, y=0):
+        display.blit(self.fb, x, y)
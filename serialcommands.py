@@ -0,0 +1,48 @@
+import sys
+try:
+    import select
+except ImportError:
+    import uselect as select
+
+class SerialCommands:
+    # Line commands typed on the USB serial console, polled from the main loop so it never blocks.
+    # Characters are read one at a time as they arrive and the command runs once its line is complete.
+    MAX_LINE = 32
+
+    def __init__(self):
+        print("SerialCommands Initialising ...")
+        self.commands = {}
+        self.line = ""
+        try:
+            self.poller = select.poll()
+            self.poller.register(sys.stdin, select.POLLIN)
+        except Exception as e:
+            print("Serial commands not available:", e)
+            self.poller = None
+        print("SerialCommands initialised.")
+
+    def add(self, name, function):
+        self.commands[name] = function
+
+    def poll(self):
+        if self.poller is None:
+            return
+        for _ in range(self.MAX_LINE):
+            if not self.poller.poll(0):
+                return
+            char = sys.stdin.read(1)
+            if not char:
+                return  # Nothing attached (end of file)
+            if char in "\r\n":
+                line = self.line.strip()
+                self.line = ""
+                if line: self.run(line)
+            elif len(self.line) < self.MAX_LINE:
+                self.line += char
+
+    def run(self, line):
+        function = self.commands.get(line)
+        if function is None:
+            print("Unknown command: " + line + " - try one of: " + " ".join(sorted(self.commands)))
+            return
+        function()
@@ -0,0 +1,2 @@
+# Host simulator - runs the unmodified firmware on CPython against a virtual clock and simulated hardware.
+# See sim/run.py
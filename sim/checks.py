@@ -0,0 +1,47 @@
+# Quick checks of the firmware booted on the simulated hardware, each one fails with an AssertionError.
+#
+#   python -m sim.checks
+#
+# The plant models need NumPy.
+
+import sys
+
+from sim import run as sim_run
+from sim import plant as sim_plant
+
+SESSION_CLICK_MS = 5000
+
+
+def boot_session(seconds, plant=None):
+    world = sim_run.create_world(seconds, plant)
+    world.click(SESSION_CLICK_MS, 3)
+    result = sim_run.boot(world, quiet=True)
+    assert result.reason == "end", "stopped early: " + result.reason
+    return result
+
+
+def check_induction_session_heats():
+    # The coil pulls the reading down while it is on, that must not read as a thermocouple fault from cold
+    result = boot_session(60, sim_plant.InductionCoil())
+    shared_state = result.namespace["shared_state"]
+    assert shared_state.heater_fault is None, "heater stopped: " + str(shared_state.heater_fault)
+    assert result.world.plant.temperature > 100, "only heated to {:.1f}C".format(result.world.plant.temperature)
+
+
+CHECKS = [check_induction_session_heats]
+
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        try:
+            check()
+            print("ok      " + check.__name__)
+        except AssertionError as e:
+            failed += 1
+            print("FAILED  " + check.__name__ + " - " + str(e))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import heapq
+
+TICKS_PERIOD = 1 << 30   # MicroPython ticks wrap at 2^30 on the rp2 port
+TICKS_MASK = TICKS_PERIOD - 1
+
+
+class SimulationEnd(BaseException):
+    # BaseException so the firmware's "except Exception" blocks dont swallow it
+    pass
+
+
+class WatchdogReset(BaseException):
+    pass
+
+
+class VirtualClock:
+    # Simulated time in microseconds. Nothing moves until something sleeps (or a bus transfer takes time),
+    # so the firmware runs as fast as CPython can go and every run is repeatable.
+    # Soft timers and scheduled events fire in deadline order while time is being advanced.
+    def __init__(self, start_ms=0, end_ms=None):
+        self.now_us = start_ms * 1000
+        self.start_us = self.now_us
+        self.end_us = None if end_ms is None else end_ms * 1000
+        self._events = []   # (due_us, sequence, callback, arg)
+        self._sequence = 0
+        self._in_callback = False
+        self.watchdog = None
+
+    def ms(self):
+        return self.now_us // 1000
+
+    def call_at(self, due_us, callback, arg=None):
+        self._sequence += 1
+        heapq.heappush(self._events, (due_us, self._sequence, callback, arg))
+
+    def call_later_ms(self, delay_ms, callback, arg=None):
+        self.call_at(self.now_us + int(delay_ms * 1000), callback, arg)
+
+    def advance(self, us):
+        target = self.now_us + int(us)
+        if self._in_callback:
+            # A callback that sleeps (eg the bitbang thermocouple driver) just moves time on,
+            # anything due meanwhile runs once it returns - soft timers dont nest on the Pico either
+            self.now_us = target
+            return
+        while self._events and self._events[0][0] <= target:
+            due_us, _, callback, arg = heapq.heappop(self._events)
+            if due_us > self.now_us: self.now_us = due_us
+            self._in_callback = True
+            try:
+                callback(arg)
+            finally:
+                self._in_callback = False
+        if target > self.now_us: self.now_us = target
+        self._check()
+
+    def busy(self, us):
+        # Time spent inside a blocking call (bus transfers) - timers due meanwhile wait until the next
+        # advance, like soft timer callbacks waiting for a C function to return on the Pico
+        self.now_us += int(us)
+        self._check()
+
+    def _check(self):
+        if self.watchdog is not None:
+            self.watchdog.check(self.now_us)
+        if self.end_us is not None and self.now_us >= self.end_us:
+            raise SimulationEnd()
@@ -0,0 +1,163 @@
+from sim import world as sim_world
+
+class SimMAX6675:
+    # MAX6675 thermocouple converter reading the world's plant temperature.
+    # Works with the bitbang driver (watches CS/SCK, drives SO) and with SPI/SoftSPI readinto.
+    # Conversions take 220ms like the real chip, reading sooner gives the previous result.
+    CONVERSION_US = 220000
+
+    def __init__(self, world, sck, cs, so, noise=None):
+        self.world = world
+        self.cs = cs
+        self.so = so
+        self.noise = noise    # Optional callable returning degrees to add to each conversion
+        self.open_circuit = False
+        self.frame = 0
+        self.bit = 15
+        self.reads = 0
+        self._converted_us = world.clock.now_us
+        self._converted_value = self._convert()
+        world.pin(sck).listeners.append(self._sck_changed)
+        world.pin(cs).listeners.append(self._cs_changed)
+        world.spi_devices.append(self)
+
+    def _convert(self):
+        temperature = self.world.plant_temperature()
+        if self.noise is not None: temperature += self.noise()
+        counts = int(temperature * 4 + 0.5)
+        if counts < 0: counts = 0
+        if counts > 0x0FFF: counts = 0x0FFF
+        return (counts << 3) | (4 if self.open_circuit else 0)
+
+    def _latch(self):
+        now_us = self.world.clock.now_us
+        if now_us - self._converted_us >= self.CONVERSION_US:
+            self._converted_value = self._convert()
+        self.frame = self._converted_value
+        self.reads += 1
+
+    def _cs_changed(self, value):
+        if value == 0:
+            self._latch()
+            self.bit = 15
+            self._present()
+        else:
+            self._converted_us = self.world.clock.now_us  # CS high starts a new conversion
+
+    def _sck_changed(self, value):
+        if value == 0 and self.world.pin(self.cs).value == 0 and self.bit > 0:
+            self.bit -= 1  # Next bit out on the falling edge
+            self._present()
+
+    def _present(self):
+        self.world.pin(self.so).value = (self.frame >> self.bit) & 1
+
+    def transfer(self, nbytes):
+        # SPI read while CS is low, CS fell (and latched the frame) just before
+        frame = self.frame
+        data = bytearray(nbytes)
+        if nbytes >= 2:
+            data[0] = frame >> 8
+            data[1] = frame & 0xFF
+        return data
+
+
+class SimSSD1306:
+    # SSD1306 on I2C, follows the command stream (addressing window, contrast, on/off) and keeps the GDDRAM.
+    # render() draws it as text for checking what the firmware put on screen
+    ARGUMENTS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xAD: 1,
+                 0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+    def __init__(self, world, width=128, height=32, address=sim_world.DISPLAY_ADDRESS):
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.ram = bytearray(self.pages * width)
+        self.contrast = 0x7F
+        self.on = False
+        self.inverted = False
+        self.col0 = 0
+        self.col1 = width - 1
+        self.page0 = 0
+        self.page1 = self.pages - 1
+        self.column = 0
+        self.page = 0
+        self.bytes_received = 0
+        self.data_bytes = 0
+        self.transactions = 0
+        self._command = None
+        self._arguments = []
+        world.i2c_devices[address] = self
+
+    def write(self, data):
+        self.transactions += 1
+        self.bytes_received += len(data) + 1  # + address byte
+        i = 0
+        while i < len(data):
+            control = data[i]
+            i += 1
+            continuation = control & 0x80
+            if control & 0x40:
+                # Data - without the continuation bit the rest of the transaction is all data
+                if continuation:
+                    self._data(data[i:i + 1])
+                    i += 1
+                else:
+                    self._data(data[i:])
+                    return
+            else:
+                if continuation:
+                    self._command_byte(data[i])
+                    i += 1
+                else:
+                    for byte in data[i:]:
+                        self._command_byte(byte)
+                    return
+
+    def read(self, nbytes):
+        return bytes(nbytes)
+
+    def _command_byte(self, byte):
+        if self._command is not None:
+            self._arguments.append(byte)
+            if len(self._arguments) == self.ARGUMENTS[self._command]:
+                self._apply(self._command, self._arguments)
+                self._command = None
+            return
+        if byte in self.ARGUMENTS:
+            self._command = byte
+            self._arguments = []
+        elif byte in (0xAE, 0xAF):
+            self.on = byte == 0xAF
+        elif byte in (0xA6, 0xA7):
+            self.inverted = byte == 0xA7
+
+    def _apply(self, command, arguments):
+        if command == 0x21:
+            self.col0, self.col1 = arguments
+            self.column = self.col0
+        elif command == 0x22:
+            self.page0, self.page1 = arguments
+            self.page = self.page0
+        elif command == 0x81:
+            self.contrast = arguments[0]
+
+    def _data(self, data):
+        self.data_bytes += len(data)
+        for byte in data:
+            self.ram[self.page * self.width + self.column] = byte
+            self.column += 1
+            if self.column > self.col1:
+                self.column = self.col0
+                self.page += 1
+                if self.page > self.page1:
+                    self.page = self.page0
+
+    def pixel(self, x, y):
+        return (self.ram[(y >> 3) * self.width + x] >> (y & 7)) & 1
+
+    def render(self, on="#", off="."):
+        lines = []
+        for y in range(self.height):
+            lines.append("".join(on if self.pixel(x, y) else off for x in range(self.width)))
+        return "\n".join(lines)
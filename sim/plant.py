@@ -0,0 +1,207 @@
+# Thermal plant models for closed loop testing against the simulator or on their own.
+#
+# Every model has the same two ways in:
+#   advance(dt, duty)   steps the plant on by dt seconds at a heater duty of 0..1 and returns what the
+#                       thermocouple would read - this is what sim.world calls as the firmware runs
+#   simulate(duty, dt)  runs a whole duty sequence (one sample per dt seconds) from the current state in
+#                       one go with NumPy and returns the readings, without changing the plant
+#
+# The models are linear apart from the nichrome resistance, so they are stepped with the exact discrete
+# solution and the time loop is done as a vectorised scan rather than in python. Parameters can be NumPy
+# arrays to run a batch of plants at once, then duty is shaped (plants, samples).
+#
+# temperature is the true heater temperature, the reading can differ (sensor lag, induction artefact).
+
+import numpy as np
+
+STEP = 0.01   # Internal step for advance(), seconds
+
+
+def linear_scan(a, drive, x0):
+    # x[k+1] = a * x[k] + drive[k] along the last axis, returns x[1..n]
+    # Done as a scaled cumulative sum, split into chunks so a**-k stays in range
+    a = np.asarray(a, dtype=float)
+    drive = np.asarray(drive, dtype=float)
+    x0 = np.asarray(x0, dtype=float)
+    n = drive.shape[-1]
+    shape = np.broadcast_shapes(drive.shape, a.shape + (1,), x0.shape + (1,))
+    out = np.empty(shape)
+    drive = np.broadcast_to(drive, shape)
+    a = a[..., None]
+    x = np.broadcast_to(x0, shape[:-1])[..., None]
+    decay = -np.log(max(float(np.min(a)), 1e-300))
+    chunk = n if decay < 1e-12 else max(1, min(n, int(20 / decay)))
+    powers = a ** np.arange(1, chunk + 1)
+    for start in range(0, n, chunk):
+        end = min(start + chunk, n)
+        p = powers[..., :end - start]
+        out[..., start:end] = p * (x + np.cumsum(drive[..., start:end] / p, axis=-1))
+        x = out[..., end - 1:end]
+    return out
+
+
+class Plant:
+    def __init__(self, ambient):
+        self.ambient = ambient
+        self._carry = 0.0
+        self.reset()
+
+    def reset(self, temperature=None):
+        self._reset(self.ambient if temperature is None else temperature)
+
+    def advance(self, dt, duty):
+        self._carry += dt
+        steps = int(self._carry / STEP + 1e-9)
+        if steps:
+            self._carry -= steps * STEP
+            readings = self._run(np.full(steps, float(duty)), STEP, True)
+            self.reading = float(readings[-1])
+        return self.reading
+
+    def simulate(self, duty, dt):
+        return self._run(np.asarray(duty, dtype=float), dt, False)
+
+
+class FOPDT(Plant):
+    # First order plus dead time - the usual fit to a step test.
+    #   gain        rise above ambient at full duty, C
+    #   time_constant, dead_time  seconds
+    def __init__(self, gain=800.0, time_constant=55.0, dead_time=2.0, ambient=20.0):
+        self.gain = gain
+        self.time_constant = time_constant
+        self.dead_time = dead_time
+        super().__init__(ambient)
+
+    def _reset(self, temperature):
+        self.temperature = temperature
+        self.reading = temperature
+        self._history = np.zeros(int(round(self.dead_time / STEP)))  # Delayed duty, advance() only
+
+    def _delayed(self, duty, dt, update):
+        delay = int(round(self.dead_time / dt))
+        if delay == 0:
+            return duty
+        if dt == STEP:
+            past = self._history
+        else:
+            past = np.zeros(duty.shape[:-1] + (delay,))  # simulate() at another dt starts from off
+        past = np.broadcast_to(past, duty.shape[:-1] + (delay,))
+        joined = np.concatenate((past, duty), axis=-1)
+        if update: self._history = joined[..., -delay:]
+        return joined[..., :duty.shape[-1]]
+
+    def _rise(self, duty, dt, update):
+        a = np.exp(-dt / np.asarray(self.time_constant))
+        drive = (1 - a)[..., None] * np.asarray(self.gain)[..., None] * self._delayed(duty, dt, update)
+        rise = linear_scan(a, drive, np.asarray(self.temperature) - self.ambient)
+        if update: self.temperature = self.ambient + rise[..., -1]
+        return self.ambient + rise
+
+    def _run(self, duty, dt, update):
+        return self._rise(duty, dt, update)
+
+
+class NichromeElement(Plant):
+    # Nichrome coil on a heater body, the thermocouple is on the body. Driven by the ElementHeater PWM
+    # duty - the 16Hz PWM is much quicker than anything thermal so it is taken as its average.
+    #
+    # Two nodes, element and body, with heat flowing element -> body -> room, plus a first order lag
+    # for the thermocouple. Power is volts^2/R with R rising with the element temperature, the scan is
+    # done in RESISTANCE_UPDATE second chunks with R predicted then corrected within each one.
+    RESISTANCE_UPDATE = 10.0
+
+    def __init__(self, volts=12.0, resistance=0.66, alpha=0.00017, element_capacity=2.0, body_capacity=15.0,
+                 element_to_body=1.0, body_to_room=0.25, sensor_lag=0.8, ambient=20.0):
+        self.volts = volts
+        self.resistance = resistance      # Ohms at 20C
+        self.alpha = alpha                # Resistance change per C, about 0.00017 for 80/20 nichrome
+        self.element_capacity = element_capacity   # J/C
+        self.body_capacity = body_capacity
+        self.element_to_body = element_to_body     # W/C
+        self.body_to_room = body_to_room
+        self.sensor_lag = sensor_lag               # seconds
+        super().__init__(ambient)
+
+    def _reset(self, temperature):
+        self.element_temperature = temperature
+        self.temperature = temperature   # Body
+        self.reading = temperature
+
+    def _power(self, element_temperature, duty):
+        # element_temperature has a trailing axis to line up with the duty samples
+        volts = np.asarray(self.volts, dtype=float)[..., None]
+        resistance = np.asarray(self.resistance, dtype=float)[..., None] * (1 + np.asarray(self.alpha, dtype=float)[..., None] * (element_temperature - 20))
+        return volts * volts / resistance * duty
+
+    def _modes(self, dt):
+        # Exact discrete form of the two node model in its eigen coordinates
+        ce = np.asarray(self.element_capacity, dtype=float)
+        cb = np.asarray(self.body_capacity, dtype=float)
+        geb = np.asarray(self.element_to_body, dtype=float)
+        gba = np.asarray(self.body_to_room, dtype=float)
+        shape = np.broadcast_shapes(ce.shape, cb.shape, geb.shape, gba.shape)
+        a = np.empty(shape + (2, 2))
+        a[..., 0, 0] = -geb / ce
+        a[..., 0, 1] = geb / ce
+        a[..., 1, 0] = geb / cb
+        a[..., 1, 1] = -(geb + gba) / cb
+        eigenvalues, vectors = np.linalg.eig(a)
+        eigenvalues = eigenvalues.real
+        vectors = vectors.real
+        inverse = np.linalg.inv(vectors)
+        input_gain = inverse[..., :, 0] / np.broadcast_to(ce, shape)[..., None]   # Power goes into the element
+        decay = np.exp(eigenvalues * dt)
+        gain = (decay - 1) / eigenvalues * input_gain
+        return decay, gain, vectors, inverse
+
+    def _run(self, duty, dt, update):
+        decay, gain, vectors, inverse = self._modes(dt)
+        state = np.stack(np.broadcast_arrays(np.asarray(self.element_temperature, dtype=float) - self.ambient,
+                                             np.asarray(self.temperature, dtype=float) - self.ambient), axis=-1)
+        n = duty.shape[-1]
+        chunk = max(1, int(self.RESISTANCE_UPDATE / dt))
+        shape = np.broadcast_shapes(duty.shape, decay.shape[:-1] + (1,))
+        body = np.empty(shape)
+        modes = np.einsum("...ij,...j->...i", inverse, np.broadcast_to(state, shape[:-1] + (2,)))
+        for start in range(0, n, chunk):
+            end = min(start + chunk, n)
+            # Predict the element temperature with R held from the start of the chunk, then run it
+            # again with R following that prediction sample by sample
+            element = (modes[..., 0] * vectors[..., 0, 0] + modes[..., 1] * vectors[..., 0, 1] + self.ambient)[..., None]
+            for _ in range(2):
+                power = self._power(element, duty[..., start:end])
+                mode0 = linear_scan(decay[..., 0], gain[..., 0, None] * power, modes[..., 0])
+                mode1 = linear_scan(decay[..., 1], gain[..., 1, None] * power, modes[..., 1])
+                element = mode0 * vectors[..., 0, 0, None] + mode1 * vectors[..., 0, 1, None] + self.ambient
+            body[..., start:end] = mode0 * vectors[..., 1, 0, None] + mode1 * vectors[..., 1, 1, None] + self.ambient
+            modes = np.stack((mode0[..., -1], mode1[..., -1]), axis=-1)
+
+        lag = np.exp(-dt / np.asarray(self.sensor_lag, dtype=float))
+        reading = self.ambient + linear_scan(lag, (1 - lag)[..., None] * (body - self.ambient), np.asarray(self.reading) - self.ambient)
+        if update:
+            self.element_temperature = float(modes[..., 0] * vectors[..., 0, 0] + modes[..., 1] * vectors[..., 0, 1]) + self.ambient
+            self.temperature = float(body[..., -1])
+        return reading
+
+
+class InductionCoil(FOPDT):
+    # Work piece in an induction coil, heated on/off through the coil mosfets.
+    # While the coil is on its field pulls the thermocouple reading down (the artefact
+    # Thermocouple.update_filtered_temp works around), the drop comes and goes with a short lag.
+    # The field only pulls the reading down to ambient, so it never reads below the room from cold.
+    def __init__(self, gain=420.0, time_constant=40.0, dead_time=1.0, reading_drop=35.0, artefact_lag=0.15, ambient=20.0):
+        self.reading_drop = reading_drop
+        self.artefact_lag = artefact_lag
+        super().__init__(gain, time_constant, dead_time, ambient)
+
+    def _reset(self, temperature):
+        super()._reset(temperature)
+        self.drop = 0.0
+
+    def _run(self, duty, dt, update):
+        temperature = self._rise(duty, dt, update)
+        on = (duty > 0).astype(float)
+        a = np.exp(-dt / np.asarray(self.artefact_lag, dtype=float))
+        drop = linear_scan(a, (1 - a)[..., None] * np.asarray(self.reading_drop)[..., None] * on, np.asarray(self.drop))
+        if update: self.drop = drop[..., -1]
+        return np.maximum(temperature - drop, np.asarray(self.ambient, dtype=float)[..., None])
@@ -0,0 +1,266 @@
+# framebuf for the host simulator - MONO_VLSB only (all the firmware and the SSD1306 driver use),
+# written in plain python so it is slow but it behaves the same as the C version
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+# 8x8 font, one byte per column with the top pixel in bit 0 like the MicroPython built in font.
+# Glyphs are the CP437 ones from luma.core (MIT licence) so they look a bit different on the Pico
+# but have the same size and spacing. Characters 32-127, anything else draws as 127
+FONT = (
+    b"\x00\x00\x00\x00\x00\x00\x00\x00",  # ' '
+    b"\x00\x06\x5f\x5f\x06\x00\x00\x00",  # '!'
+    b"\x00\x07\x07\x00\x07\x07\x00\x00",  # '"'
+    b"\x14\x7f\x7f\x14\x7f\x7f\x14\x00",  # '#'
+    b"\x24\x2e\x6b\x6b\x3a\x12\x00\x00",  # '$'
+    b"\x46\x66\x30\x18\x0c\x66\x62\x00",  # '%'
+    b"\x30\x7a\x4f\x5d\x37\x7a\x48\x00",  # '&'
+    b"\x04\x07\x03\x00\x00\x00\x00\x00",  # "'"
+    b"\x00\x1c\x3e\x63\x41\x00\x00\x00",  # '('
+    b"\x00\x41\x63\x3e\x1c\x00\x00\x00",  # ')'
+    b"\x08\x2a\x3e\x1c\x1c\x3e\x2a\x08",  # '*'
+    b"\x08\x08\x3e\x3e\x08\x08\x00\x00",  # '+'
+    b"\x00\x80\xe0\x60\x00\x00\x00\x00",  # ','
+    b"\x08\x08\x08\x08\x08\x08\x00\x00",  # '-'
+    b"\x00\x00\x60\x60\x00\x00\x00\x00",  # '.'
+    b"\x60\x30\x18\x0c\x06\x03\x01\x00",  # '/'
+    b"\x3e\x7f\x71\x59\x4d\x7f\x3e\x00",  # '0'
+    b"\x40\x42\x7f\x7f\x40\x40\x00\x00",  # '1'
+    b"\x62\x73\x59\x49\x6f\x66\x00\x00",  # '2'
+    b"\x22\x63\x49\x49\x7f\x36\x00\x00",  # '3'
+    b"\x18\x1c\x16\x53\x7f\x7f\x50\x00",  # '4'
+    b"\x27\x67\x45\x45\x7d\x39\x00\x00",  # '5'
+    b"\x3c\x7e\x4b\x49\x79\x30\x00\x00",  # '6'
+    b"\x03\x03\x71\x79\x0f\x07\x00\x00",  # '7'
+    b"\x36\x7f\x49\x49\x7f\x36\x00\x00",  # '8'
+    b"\x06\x4f\x49\x69\x3f\x1e\x00\x00",  # '9'
+    b"\x00\x00\x66\x66\x00\x00\x00\x00",  # ':'
+    b"\x00\x80\xe6\x66\x00\x00\x00\x00",  # ';'
+    b"\x08\x1c\x36\x63\x41\x00\x00\x00",  # '<'
+    b"\x24\x24\x24\x24\x24\x24\x00\x00",  # '='
+    b"\x00\x41\x63\x36\x1c\x08\x00\x00",  # '>'
+    b"\x02\x03\x51\x59\x0f\x06\x00\x00",  # '?'
+    b"\x3e\x7f\x41\x5d\x5d\x1f\x1e\x00",  # '@'
+    b"\x7c\x7e\x13\x13\x7e\x7c\x00\x00",  # 'A'
+    b"\x41\x7f\x7f\x49\x49\x7f\x36\x00",  # 'B'
+    b"\x1c\x3e\x63\x41\x41\x63\x22\x00",  # 'C'
+    b"\x41\x7f\x7f\x41\x63\x3e\x1c\x00",  # 'D'
+    b"\x41\x7f\x7f\x49\x5d\x41\x63\x00",  # 'E'
+    b"\x41\x7f\x7f\x49\x1d\x01\x03\x00",  # 'F'
+    b"\x1c\x3e\x63\x41\x51\x73\x72\x00",  # 'G'
+    b"\x7f\x7f\x08\x08\x7f\x7f\x00\x00",  # 'H'
+    b"\x00\x41\x7f\x7f\x41\x00\x00\x00",  # 'I'
+    b"\x30\x70\x40\x41\x7f\x3f\x01\x00",  # 'J'
+    b"\x41\x7f\x7f\x08\x1c\x77\x63\x00",  # 'K'
+    b"\x41\x7f\x7f\x41\x40\x60\x70\x00",  # 'L'
+    b"\x7f\x7f\x0e\x1c\x0e\x7f\x7f\x00",  # 'M'
+    b"\x7f\x7f\x06\x0c\x18\x7f\x7f\x00",  # 'N'
+    b"\x1c\x3e\x63\x41\x63\x3e\x1c\x00",  # 'O'
+    b"\x41\x7f\x7f\x49\x09\x0f\x06\x00",  # 'P'
+    b"\x1e\x3f\x21\x71\x7f\x5e\x00\x00",  # 'Q'
+    b"\x41\x7f\x7f\x09\x19\x7f\x66\x00",  # 'R'
+    b"\x26\x6f\x4d\x59\x73\x32\x00\x00",  # 'S'
+    b"\x03\x41\x7f\x7f\x41\x03\x00\x00",  # 'T'
+    b"\x7f\x7f\x40\x40\x7f\x7f\x00\x00",  # 'U'
+    b"\x1f\x3f\x60\x60\x3f\x1f\x00\x00",  # 'V'
+    b"\x7f\x7f\x30\x18\x30\x7f\x7f\x00",  # 'W'
+    b"\x43\x67\x3c\x18\x3c\x67\x43\x00",  # 'X'
+    b"\x07\x4f\x78\x78\x4f\x07\x00\x00",  # 'Y'
+    b"\x47\x63\x71\x59\x4d\x67\x73\x00",  # 'Z'
+    b"\x00\x7f\x7f\x41\x41\x00\x00\x00",  # '['
+    b"\x01\x03\x06\x0c\x18\x30\x60\x00",  # '\\'
+    b"\x00\x41\x41\x7f\x7f\x00\x00\x00",  # ']'
+    b"\x08\x0c\x06\x03\x06\x0c\x08\x00",  # '^'
+    b"\x80\x80\x80\x80\x80\x80\x80\x80",  # '_'
+    b"\x00\x00\x03\x07\x04\x00\x00\x00",  # '`'
+    b"\x20\x74\x54\x54\x3c\x78\x40\x00",  # 'a'
+    b"\x41\x7f\x3f\x48\x48\x78\x30\x00",  # 'b'
+    b"\x38\x7c\x44\x44\x6c\x28\x00\x00",  # 'c'
+    b"\x30\x78\x48\x49\x3f\x7f\x40\x00",  # 'd'
+    b"\x38\x7c\x54\x54\x5c\x18\x00\x00",  # 'e'
+    b"\x48\x7e\x7f\x49\x03\x02\x00\x00",  # 'f'
+    b"\x98\xbc\xa4\xa4\xf8\x7c\x04\x00",  # 'g'
+    b"\x41\x7f\x7f\x08\x04\x7c\x78\x00",  # 'h'
+    b"\x00\x44\x7d\x7d\x40\x00\x00\x00",  # 'i'
+    b"\x60\xe0\x80\x80\xfd\x7d\x00\x00",  # 'j'
+    b"\x41\x7f\x7f\x10\x38\x6c\x44\x00",  # 'k'
+    b"\x00\x41\x7f\x7f\x40\x00\x00\x00",  # 'l'
+    b"\x7c\x7c\x18\x38\x1c\x7c\x78\x00",  # 'm'
+    b"\x7c\x7c\x04\x04\x7c\x78\x00\x00",  # 'n'
+    b"\x38\x7c\x44\x44\x7c\x38\x00\x00",  # 'o'
+    b"\x84\xfc\xf8\xa4\x24\x3c\x18\x00",  # 'p'
+    b"\x18\x3c\x24\xa4\xf8\xfc\x84\x00",  # 'q'
+    b"\x44\x7c\x78\x4c\x04\x1c\x18\x00",  # 'r'
+    b"\x48\x5c\x54\x54\x74\x24\x00\x00",  # 's'
+    b"\x00\x04\x3e\x7f\x44\x24\x00\x00",  # 't'
+    b"\x3c\x7c\x40\x40\x3c\x7c\x40\x00",  # 'u'
+    b"\x1c\x3c\x60\x60\x3c\x1c\x00\x00",  # 'v'
+    b"\x3c\x7c\x70\x38\x70\x7c\x3c\x00",  # 'w'
+    b"\x44\x6c\x38\x10\x38\x6c\x44\x00",  # 'x'
+    b"\x9c\xbc\xa0\xa0\xfc\x7c\x00\x00",  # 'y'
+    b"\x4c\x64\x74\x5c\x4c\x64\x00\x00",  # 'z'
+    b"\x08\x08\x3e\x77\x41\x41\x00\x00",  # '{'
+    b"\x00\x00\x00\x77\x77\x00\x00\x00",  # '|'
+    b"\x41\x41\x77\x3e\x08\x08\x00\x00",  # '}'
+    b"\x02\x03\x01\x03\x02\x03\x01\x00",  # '~'
+    b"\x70\x78\x4c\x46\x4c\x78\x70\x00",  # DEL
+)
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format=MONO_VLSB, stride=None):
+        if format != MONO_VLSB:
+            raise ValueError("only MONO_VLSB is simulated")
+        self._buffer = buffer
+        self._width = width
+        self._height = height
+        self._pages = (height + 7) // 8
+
+    def pixel(self, x, y, c=None):
+        if x < 0 or y < 0 or x >= self._width or y >= self._height:
+            return None if c is not None else 0
+        index = (y >> 3) * self._width + x
+        mask = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buffer[index] & mask else 0
+        if c:
+            self._buffer[index] |= mask
+        else:
+            self._buffer[index] &= ~mask & 0xFF
+
+    def fill(self, c):
+        value = 0xFF if c else 0
+        buffer = self._buffer
+        for i in range(self._pages * self._width):
+            buffer[i] = value
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self._width)
+        y1 = min(y + h, self._height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        buffer = self._buffer
+        width = self._width
+        for yy in range(y0, y1):
+            mask = 1 << (yy & 7)
+            row = (yy >> 3) * width
+            if c:
+                for xx in range(x0, x1):
+                    buffer[row + xx] |= mask
+            else:
+                mask = ~mask & 0xFF
+                for xx in range(x0, x1):
+                    buffer[row + xx] &= mask
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        error = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                return
+            e2 = 2 * error
+            if e2 >= dy:
+                error += dy
+                x1 += sx
+            if e2 <= dx:
+                error += dx
+                y1 += sy
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            code = ord(ch)
+            if code < 32 or code > 127:
+                code = 127
+            glyph = FONT[code - 32]
+            for column in range(8):
+                bits = glyph[column]
+                xx = x + column
+                yy = y
+                while bits:
+                    if bits & 1:
+                        self.pixel(xx, yy, c)
+                    bits >>= 1
+                    yy += 1
+            x += 8
+
+    def scroll(self, xstep, ystep):
+        # Like the C version the area scrolled away from keeps its old pixels
+        width = self._width
+        height = self._height
+        if xstep < 0:
+            xs, xe, dx = 0, width + xstep, 1
+        else:
+            xs, xe, dx = width - 1, xstep - 1, -1
+        if ystep < 0:
+            ys, ye, dy = 0, height + ystep, 1
+        else:
+            ys, ye, dy = height - 1, ystep - 1, -1
+        y = ys
+        while y != ye:
+            x = xs
+            while x != xe:
+                self.pixel(x, y, self.pixel(x - xstep, y - ystep))
+                x += dx
+            y += dy
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if key == 0 and palette is None and not (fbuf._height | self._height) & 7:
+            # Only the set pixels are drawn, so a column byte at a time ORed in is the same thing
+            self._blit_set_pixels(fbuf, x, y)
+            return
+        for yy in range(fbuf._height):
+            ty = y + yy
+            if ty < 0 or ty >= self._height:
+                continue
+            for xx in range(fbuf._width):
+                tx = x + xx
+                if tx < 0 or tx >= self._width:
+                    continue
+                c = fbuf.pixel(xx, yy)
+                if palette is not None:
+                    c = palette.pixel(c, 0)
+                if c != key:
+                    self.pixel(tx, ty, c)
+
+    def _blit_set_pixels(self, fbuf, x, y):
+        src = fbuf._buffer
+        dst = self._buffer
+        src_width = fbuf._width
+        width = self._width
+        pages = self._pages
+        shift = y & 7
+        for page in range(fbuf._pages):
+            dst_page = (y >> 3) + page
+            for xx in range(src_width):
+                tx = x + xx
+                if tx < 0 or tx >= width:
+                    continue
+                bits = src[page * src_width + xx] << shift
+                if not bits:
+                    continue
+                if 0 <= dst_page < pages:
+                    dst[dst_page * width + tx] |= bits & 0xFF
+                if shift and 0 <= dst_page + 1 < pages:
+                    dst[(dst_page + 1) * width + tx] |= bits >> 8
@@ -0,0 +1,253 @@
+# machine module for the host simulator - same API as the rp2 port for the parts the firmware uses,
+# backed by the pins/buses/devices in sim.world.current
+
+from sim import world as sim_world
+from sim.clock import WatchdogReset
+
+
+def _world():
+    return sim_world.current
+
+
+def _pin_number(pin):
+    if isinstance(pin, Pin):
+        return pin.number
+    return pin
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=None, pull=None, value=None):
+        self.number = id
+        self._state = _world().pin(id)
+        self.init(mode, pull, value)
+
+    def init(self, mode=None, pull=None, value=None):
+        if mode is not None: self._state.mode = mode
+        if value is not None: self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._state.value
+        value = 1 if value else 0
+        if self._state.value != value:
+            self._state.value = value
+            for listener in self._state.listeners:
+                listener(value)
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def high(self):
+        self.value(1)
+
+    def low(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(1 - self._state.value)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._state.handler = handler
+        self._state.trigger = trigger if handler is not None else 0
+
+
+class PWM:
+    def __init__(self, pin, freq=None, duty_u16=None):
+        self.number = _pin_number(pin)
+        self._freq = 1000
+        self._duty = 0
+        if freq is not None: self.freq(freq)
+        if duty_u16 is not None: self.duty_u16(duty_u16)
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+        _world().set_pwm(self.number, value / sim_world.PWM_FULL)
+
+    def deinit(self):
+        self.duty_u16(0)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self._generation = 0
+        self._period_us = 0
+        self._mode = self.PERIODIC
+        self._callback = None
+        if kwargs: self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        self._generation += 1
+        if freq > 0:
+            self._period_us = int(1000000 / freq)
+        else:
+            self._period_us = int(period * 1000)
+        self._mode = mode
+        self._callback = callback
+        clock = _world().clock
+        clock.call_at(clock.now_us + self._period_us, self._fire, self._generation)
+
+    def deinit(self):
+        self._generation += 1  # Anything already scheduled is ignored
+
+    def _fire(self, generation):
+        if generation != self._generation:
+            return
+        if self._mode == self.PERIODIC:
+            clock = _world().clock
+            clock.call_at(clock.now_us + self._period_us, self._fire, generation)
+        if self._callback is not None:
+            self._callback(self)
+
+
+class ADC:
+    CORE_TEMP = 4
+
+    def __init__(self, pin):
+        self.channel = _pin_number(pin)
+
+    def read_u16(self):
+        if self.channel == self.CORE_TEMP:
+            volts = 0.706 - (_world().pi_temperature - 27) * 0.001721
+            return int(volts / 3.3 * 65535) & 0xFFF0  # 12 bit ADC scaled up like the real one
+        return 0
+
+
+class I2C:
+    def __init__(self, id, scl=None, sda=None, freq=400000, timeout=50000):
+        self.id = id
+        self.freq = freq
+        self.bytes = 0
+
+    def _transfer_time(self, nbytes):
+        # 9 clocks per byte plus start/stop, time passes like it would on the bus
+        _world().clock.busy((nbytes + 1) * 9 * 1000000 / self.freq)
+
+    def _device(self, addr):
+        device = _world().i2c_devices.get(addr)
+        if device is None:
+            raise OSError(5)  # EIO - no ack, same as the rp2 port
+        return device
+
+    def scan(self):
+        return sorted(_world().i2c_devices)
+
+    def writeto(self, addr, buf, stop=True):
+        device = self._device(addr)
+        self.bytes += len(buf) + 1
+        self._transfer_time(len(buf))
+        device.write(bytes(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        device = self._device(addr)
+        data = b"".join(bytes(buf) for buf in vector)
+        self.bytes += len(data) + 1
+        self._transfer_time(len(data))
+        device.write(data)
+        return len(data)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        device = self._device(addr)
+        self._transfer_time(len(buf))
+        buf[:] = device.read(len(buf))
+
+
+class SPI:
+    def __init__(self, id=0, baudrate=1000000, polarity=0, phase=0, bits=8, firstbit=0, sck=None, mosi=None, miso=None):
+        self.baudrate = baudrate
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None: self.baudrate = baudrate
+
+    def _selected(self):
+        world = _world()
+        for device in world.spi_devices:
+            if world.pin(device.cs).value == 0:
+                return device
+        return None
+
+    def readinto(self, buf, write=0):
+        _world().clock.busy(len(buf) * 8 * 1000000 / self.baudrate)
+        device = self._selected()
+        if device is None:
+            for i in range(len(buf)): buf[i] = 0xFF  # Nothing driving MISO
+            return
+        buf[:] = device.transfer(len(buf))
+
+    def read(self, nbytes, write=0):
+        buf = bytearray(nbytes)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+    def write(self, buf):
+        _world().clock.busy(len(buf) * 8 * 1000000 / self.baudrate)
+
+    def deinit(self):
+        pass
+
+
+class SoftSPI(SPI):
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, baudrate=500000, polarity=0, phase=0, bits=8, firstbit=0, sck=None, mosi=None, miso=None):
+        super().__init__(baudrate=baudrate, polarity=polarity, phase=phase, bits=bits, firstbit=firstbit, sck=sck, mosi=mosi, miso=miso)
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        self.timeout_us = timeout * 1000
+        clock = _world().clock
+        self.last_feed_us = clock.now_us
+        clock.watchdog = self
+
+    def feed(self):
+        self.last_feed_us = _world().clock.now_us
+
+    def check(self, now_us):
+        if now_us - self.last_feed_us > self.timeout_us:
+            raise WatchdogReset("watchdog not fed for " + str((now_us - self.last_feed_us) // 1000) + "ms")
+
+
+def freq(hz=None):
+    return 125000000
+
+
+def unique_id():
+    return b"\x00simpico"
+
+
+def reset():
+    raise WatchdogReset("machine.reset()")
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
@@ -0,0 +1,32 @@
+# micropython module for the host simulator, the code emitters are just plain python here
+
+from sim import world as sim_world
+
+
+def const(value):
+    return value
+
+
+def native(function):
+    return function
+
+
+def viper(function):
+    return function
+
+
+def schedule(function, arg):
+    # Runs soon after, the same as the Pico running it between bytecodes
+    sim_world.current.clock.call_later_ms(0, function, arg)
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def opt_level(level=None):
+    return 0
+
+
+def mem_info(verbose=False):
+    print("mem: not available in the simulator")
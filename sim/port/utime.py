@@ -0,0 +1,51 @@
+# utime for the host simulator - ticks come from the virtual clock and sleeping moves it on
+
+from sim import world as sim_world
+from sim.clock import TICKS_MASK, TICKS_PERIOD
+
+
+def _clock():
+    return sim_world.current.clock
+
+
+def ticks_ms():
+    return (_clock().now_us // 1000) & TICKS_MASK
+
+
+def ticks_us():
+    return _clock().now_us & TICKS_MASK
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MASK
+
+
+def ticks_diff(ticks1, ticks2):
+    diff = (ticks1 - ticks2) & TICKS_MASK
+    if diff >= TICKS_PERIOD // 2:
+        diff -= TICKS_PERIOD
+    return diff
+
+
+def sleep(seconds):
+    _clock().advance(seconds * 1000000)
+
+
+def sleep_ms(ms):
+    _clock().advance(ms * 1000)
+
+
+def sleep_us(us):
+    _clock().advance(us)
+
+
+def time():
+    return _clock().now_us // 1000000
+
+
+def time_ns():
+    return _clock().now_us * 1000
@@ -0,0 +1,125 @@
+# Boots main.py on the host against simulated hardware, faster than real time.
+#
+#   python -m sim.run --seconds 300 --session
+#
+# The sim port of machine/utime/micropython/framebuf goes first on the path, then the project and lib
+# folders, so the firmware imports it in place of the MicroPython modules. Time only moves when the
+# firmware sleeps or waits on a bus so runs are repeatable.
+
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import sys
+import time
+
+from sim import world as sim_world
+from sim.clock import VirtualClock, SimulationEnd, WatchdogReset
+from sim.devices import SimMAX6675, SimSSD1306
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = os.path.join(ROOT, "sim", "port")
+LIB = os.path.join(ROOT, "lib")
+
+
+class Result:
+    def __init__(self, world, display, thermocouple, namespace, reason, wall_seconds, output):
+        self.world = world
+        self.display = display
+        self.thermocouple = thermocouple
+        self.namespace = namespace   # main.py globals - shared_state, control_loop etc
+        self.reason = reason         # "end", "watchdog: ..." or "exit"
+        self.wall_seconds = wall_seconds
+        self.output = output         # Captured firmware prints when run quietly
+
+    def virtual_seconds(self):
+        return (self.world.clock.now_us - self.world.clock.start_us) / 1000000
+
+    def speedup(self):
+        return self.virtual_seconds() / self.wall_seconds if self.wall_seconds > 0 else 0
+
+
+def setup_paths():
+    for path in (LIB, ROOT, PORT):
+        if path in sys.path: sys.path.remove(path)
+    sys.path[0:0] = [PORT, ROOT, LIB]
+    builtins.const = lambda value: value  # const() is a builtin on MicroPython
+
+
+def create_world(seconds, plant=None, start_ms=0):
+    world = sim_world.World(VirtualClock(start_ms=start_ms, end_ms=start_ms + int(seconds * 1000)), plant)
+    sim_world.install(world)
+    return world
+
+
+def boot(world, main_path=None, quiet=False, namespace=None):
+    # Runs main.py until the clock reaches its end, the watchdog bites or the firmware exits.
+    # Pass namespace (a dict) to get at main.py's globals from scheduled events while it runs
+    setup_paths()
+    thermocouple = SimMAX6675(world, sim_world.PIN_THERMOCOUPLE_SCK, sim_world.PIN_THERMOCOUPLE_CS, sim_world.PIN_THERMOCOUPLE_SO)
+    display = SimSSD1306(world)
+    main_path = main_path or os.path.join(ROOT, "main.py")
+    with open(main_path) as file:
+        code = compile(file.read(), main_path, "exec")
+
+    if namespace is None: namespace = {}
+    namespace.update({"__name__": "__main__", "__file__": main_path})
+    output = io.StringIO()
+    monotonic = time.monotonic
+    time.monotonic = lambda: world.clock.now_us / 1000000  # simple_pid's clock
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            exec(code, namespace)
+        reason = "returned"
+    except SimulationEnd:
+        reason = "end"
+    except WatchdogReset as e:
+        reason = "watchdog: " + str(e)
+    except SystemExit:
+        reason = "exit"
+    finally:
+        time.monotonic = monotonic
+    wall_seconds = time.perf_counter() - start
+    return Result(world, display, thermocouple, namespace, reason, wall_seconds, output.getvalue())
+
+
+def create_plant(name):
+    if name == "lumped":
+        return None  # World's default
+    from sim import plant
+    return {"fopdt": plant.FOPDT, "nichrome": plant.NichromeElement, "induction": plant.InductionCoil}[name]()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the firmware on simulated hardware")
+    parser.add_argument("--seconds", type=float, default=120, help="simulated seconds to run for")
+    parser.add_argument("--session", action="store_true", help="triple click to start a session once booted")
+    parser.add_argument("--manual", type=float, default=0, help="hold the button for this many seconds to heat in manual mode")
+    parser.add_argument("--plant", choices=("lumped", "fopdt", "nichrome", "induction"), default="lumped", help="heater model, all but lumped need NumPy")
+    parser.add_argument("--start-ms", type=int, default=0, help="ticks_ms at boot, eg near 2**30 to test wrap around")
+    parser.add_argument("--quiet", action="store_true", help="hide the firmware's prints")
+    parser.add_argument("--show", action="store_true", help="print the display at the end")
+    args = parser.parse_args()
+
+    world = create_world(args.seconds, create_plant(args.plant), start_ms=args.start_ms)
+    if args.session:
+        world.click(5000, 3)
+    if args.manual:
+        world.press_button(5000, args.manual * 1000)
+    result = boot(world, quiet=args.quiet)
+
+    shared_state = result.namespace.get("shared_state")
+    print("stopped:           " + result.reason)
+    print("simulated:         {:.1f} s in {:.2f} s wall ({:.0f}x real time)".format(result.virtual_seconds(), result.wall_seconds, result.speedup()))
+    print("plant temperature: {:.1f} C".format(world.plant.temperature))
+    if shared_state is not None:
+        print("mode / setpoint:   {} / {}".format(shared_state._mode, shared_state.setpoint))
+    print("display:           {} transactions, {} bytes".format(result.display.transactions, result.display.bytes_received))
+    if args.show:
+        print(result.display.render())
+
+
+if __name__ == "__main__":
+    main()
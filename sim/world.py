@@ -0,0 +1,137 @@
+from sim.clock import VirtualClock
+
+# Pins as wired in main.py
+PIN_HEATER = 22
+PIN_BUTTON = 14
+PIN_ROTARY_CLK = 13
+PIN_ROTARY_DT = 12
+PIN_THERMOCOUPLE_SCK = 6
+PIN_THERMOCOUPLE_CS = 7
+PIN_THERMOCOUPLE_SO = 8
+DISPLAY_ADDRESS = 0x3C
+
+PWM_FULL = 65535
+
+
+class PinState:
+    def __init__(self, number):
+        self.number = number
+        self.value = 1        # Inputs idle high - button and encoder have pull ups
+        self.mode = None
+        self.handler = None
+        self.trigger = 0
+        self.listeners = []   # Devices watching an output pin, called with the new value
+
+
+class LumpedElement:
+    # Simplest possible heater: one heat capacity losing heat to the room. No NumPy needed.
+    # sim.plant has proper models, anything with advance(dt, duty) -> reading will do
+    def __init__(self, max_watts=218, heat_capacity=15.0, loss=0.27, ambient=20.0):
+        self.max_watts = max_watts
+        self.heat_capacity = heat_capacity
+        self.loss = loss
+        self.ambient = ambient
+        self.temperature = ambient
+
+    def advance(self, dt, duty):
+        step = 0.05
+        while dt > 0:
+            h = step if dt > step else dt
+            power = self.max_watts * duty - self.loss * (self.temperature - self.ambient)
+            self.temperature += power * h / self.heat_capacity
+            dt -= h
+        return self.temperature
+
+
+class World:
+    # Everything outside the Pico: pins, buses and devices, the heater plant and the clock they share.
+    # The sim port of machine/utime find it through sim.world.current
+    def __init__(self, clock=None, plant=None):
+        self.clock = clock if clock is not None else VirtualClock()
+        self.plant = plant if plant is not None else LumpedElement()
+        self.pins = {}
+        self.pwm_duty = {}      # pin number -> duty 0..1
+        self.i2c_devices = {}   # address -> device with write(data) / read(n)
+        self.spi_devices = []   # devices with a cs pin number and transfer(n)
+        self.pi_temperature = 30.0
+        self.heater_pin = PIN_HEATER
+        self._plant_time_us = self.clock.now_us
+        self._heater_duty = 0.0
+
+    def pin(self, number):
+        state = self.pins.get(number)
+        if state is None:
+            state = self.pins[number] = PinState(number)
+        return state
+
+    def set_pwm(self, number, duty):
+        if number == self.heater_pin:
+            self.plant_temperature()  # Catch the plant up at the old duty first
+            self._heater_duty = duty
+        self.pwm_duty[number] = duty
+
+    def use_switched_heater(self, pins):
+        # Heater switched on/off by plain pins (induction coil mosfets) rather than PWM, on while any pin is high
+        self.heater_pin = None
+        self._switched_pins = tuple(pins)
+        for number in self._switched_pins:
+            self.pin(number).listeners.append(self._switched_heater_changed)
+
+    def _switched_heater_changed(self, value):
+        self.plant_temperature()
+        self._heater_duty = 1.0 if any(self.pin(number).value for number in self._switched_pins) else 0.0
+
+    def heater_duty(self):
+        return self._heater_duty
+
+    def plant_temperature(self):
+        now_us = self.clock.now_us
+        dt = (now_us - self._plant_time_us) / 1000000
+        self._plant_time_us = now_us
+        if dt > 0:
+            return self.plant.advance(dt, self._heater_duty)
+        return self.plant.temperature
+
+    def drive_pin(self, number, value):
+        # Change an input pin from outside, runs its irq handler like the hardware would
+        from machine import Pin  # The sim port, on the path whenever a world is running
+        state = self.pin(number)
+        old = state.value
+        state.value = value
+        if state.handler is None or old == value:
+            return
+        if (value and state.trigger & Pin.IRQ_RISING) or (not value and state.trigger & Pin.IRQ_FALLING):
+            state.handler(Pin(number))
+
+    # Scripted input, times are ms from now
+
+    def press_button(self, at_ms, hold_ms=80):
+        self.clock.call_later_ms(at_ms, lambda _: self.drive_pin(PIN_BUTTON, 0))
+        self.clock.call_later_ms(at_ms + hold_ms, lambda _: self.drive_pin(PIN_BUTTON, 1))
+
+    def click(self, at_ms, count=1, gap_ms=120):
+        for i in range(count):
+            self.press_button(at_ms + i * (80 + gap_ms))
+
+    def rotate(self, at_ms, steps, step_ms=20):
+        # Full quadrature cycle per detent, (clk, dt) from idle 11. Positive steps are what the rotary
+        # library counts as clockwise - InputHandler sets reverse=True so they turn the setpoint down
+        sequence = ((1, 0), (0, 0), (0, 1), (1, 1)) if steps > 0 else ((0, 1), (0, 0), (1, 0), (1, 1))
+        t = at_ms
+        for _ in range(abs(steps)):
+            for clk, dt in sequence:
+                self.clock.call_later_ms(t, lambda _, clk=clk, dt=dt: self._set_rotary(clk, dt))
+                t += step_ms / 4
+
+    def _set_rotary(self, clk, dt):
+        self.drive_pin(PIN_ROTARY_CLK, clk)
+        self.drive_pin(PIN_ROTARY_DT, dt)
+
+
+current = None
+
+
+def install(world):
+    global current
+    current = world
+    return world
@@ -0,0 +1,78 @@
+import utime
+from ringbuffer import RingBuffer
+
+class HistoryTier:
+    # One downsampled resolution - each bucket of period_ms keeps the min, max and mean of the samples in it
+    def __init__(self, period_ms, capacity, typecode='i'):
+        self.period_ms = period_ms
+        self.low = RingBuffer(capacity, typecode)
+        self.high = RingBuffer(capacity, typecode)
+        self.mean = RingBuffer(capacity, 'f')
+        self._bucket_start = 0
+        self._bucket_min = 0
+        self._bucket_max = 0
+        self._bucket_sum = 0
+        self._bucket_count = 0
+
+    def add(self, time, value):
+        if self._bucket_count and utime.ticks_diff(time, self._bucket_start) >= self.period_ms:
+            self.flush()
+        if self._bucket_count == 0:
+            self._bucket_start = time
+            self._bucket_min = value
+            self._bucket_max = value
+            self._bucket_sum = value
+        else:
+            if value < self._bucket_min: self._bucket_min = value
+            if value > self._bucket_max: self._bucket_max = value
+            self._bucket_sum += value
+        self._bucket_count += 1
+
+    def flush(self):
+        # Close the current bucket, buckets are stamped with their start time
+        if self._bucket_count == 0:
+            return
+        start = self._bucket_start
+        self.low.append(start, self._bucket_min)
+        self.high.append(start, self._bucket_max)
+        self.mean.append(start, self._bucket_sum / self._bucket_count)
+        self._bucket_count = 0
+
+    def clear(self):
+        self.low.clear()
+        self.high.clear()
+        self.mean.clear()
+        self._bucket_count = 0
+
+
+class TieredHistory:
+    # Raw samples plus 1s, 10s and 1 min tiers so graphs can show the last ~47s, ~2 mins, ~21 mins or ~2 hours
+    # All storage is allocated up front, a new sample costs one compare/accumulate per tier.
+    SPAN_LABELS = ("Live", "2m", "21m", "2h")
+
+    def __init__(self, raw, tier_periods=(1000, 10000, 60000), capacity=128, typecode='i'):
+        self.raw = raw  # RingBuffer of the raw samples, one per pid tick
+        self.tiers = [HistoryTier(period, capacity, typecode) for period in tier_periods]
+
+    def append(self, time, value):
+        self.raw.append(time, value)
+        for tier in self.tiers:
+            tier.add(time, value)
+
+    def clear(self):
+        self.raw.clear()
+        for tier in self.tiers:
+            tier.clear()
+
+    def series(self, span):
+        # span 0 is the raw samples, 1.. the tiers (mean per bucket)
+        if span == 0:
+            return self.raw
+        return self.tiers[span - 1].mean
+
+    def envelope(self, span):
+        # (low, high) buffers for a tier span, None for raw samples
+        if span == 0:
+            return None
+        tier = self.tiers[span - 1]
+        return tier.low, tier.high
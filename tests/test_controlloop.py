@@ -0,0 +1,145 @@
+# ControlLoop.tick() run as the pid timer callback would, on fake machine/utime modules so it runs
+# with CPython:
+#
+#   python -m unittest discover tests
+#
+# The fake utime clock only moves when something sleeps, so a tick's measured time is exactly the
+# time it spent waiting - a tick that slept out the settle time would take SETTLE_MS.
+
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TICKS_PERIOD = 1 << 30
+
+
+class FakeClock:
+    def __init__(self):
+        self.us = 0
+
+    def sleep_us(self, us):
+        self.us += us
+
+
+clock = FakeClock()
+
+
+def install_fakes():
+    utime = types.ModuleType("utime")
+    utime.ticks_us = lambda: clock.us % TICKS_PERIOD
+    utime.ticks_ms = lambda: (clock.us // 1000) % TICKS_PERIOD
+    utime.ticks_add = lambda ticks, delta: (ticks + delta) % TICKS_PERIOD
+    utime.ticks_diff = lambda new, old: ((new - old + TICKS_PERIOD // 2) % TICKS_PERIOD) - TICKS_PERIOD // 2
+    utime.sleep_us = clock.sleep_us
+    utime.sleep_ms = lambda ms: clock.sleep_us(ms * 1000)
+    utime.sleep = lambda s: clock.sleep_us(int(s * 1000000))
+    sys.modules["utime"] = utime
+
+    machine = types.ModuleType("machine")
+
+    class Stub:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: None
+    for name in ("Pin", "PWM", "Timer", "ADC", "I2C", "SPI", "SoftSPI", "WDT"):
+        setattr(machine, name, type(name, (Stub,), {"IN": 0, "OUT": 1, "PERIODIC": 1, "ONE_SHOT": 0}))
+    sys.modules["machine"] = machine
+
+
+install_fakes()
+
+from heaters import InductionHeater
+from controlloop import ControlLoop
+
+PID_PERIOD_MS = 371
+CALLBACK_BUDGET_US = 1000   # Longest a tick may wait, anything that sleeps out the settle time is far over
+SAFE_OFF_EVERY = 4          # Readings between the thermocouple asking for a heater off reading
+
+
+class FakeHeater(InductionHeater):
+    def __init__(self):
+        self._is_on = False
+
+    def on(self, power=None):
+        self._is_on = True
+
+    def off(self):
+        self._is_on = False
+
+    def get_power(self):
+        return 10  # For the watts, InductionHeater has no power level
+
+
+class FakeThermocouple:
+    # Asks for a safe heater off reading every SAFE_OFF_EVERY readings while the heater is on, like the
+    # induction filter does when the reading drops
+    def __init__(self):
+        self.reads = 0
+        self.raw_temp = 150
+
+    def get_filtered_temp(self, heater_on):
+        self.reads += 1
+        return 150, heater_on and self.reads % SAFE_OFF_EVERY == 0
+
+
+class FakePid:
+    def __init__(self):
+        self.setpoint = 0
+
+    def __call__(self, temperature):
+        return 5
+
+    def reset(self):
+        pass
+
+
+class Anything:
+    # Any attribute or call works, for the shared_state parts the tick only records into
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+class FakeState(Anything):
+    def __init__(self):
+        self.setpoint = 170
+        self.heater_temperature = 0
+        self.heater_too_hot = False
+        self.heater_fault = None
+        self.power_threshold = 0
+        self.input_volts = 12
+        self.heater_resitance = 0.66
+        self.heater_max_duty_cycle_percent = 40
+        self.watts = 0
+
+    def get_mode(self):
+        return "Session"
+
+
+class ControlLoopTickTest(unittest.TestCase):
+    def test_tick_never_waits(self):
+        heater = FakeHeater()
+        state = FakeState()
+        control_loop = ControlLoop(FakePid(), heater, FakeThermocouple(), state)
+        settles = 0
+        for _ in range(100):
+            was_settling = control_loop.state == ControlLoop.STATE_SETTLE
+            control_loop.tick()
+            if was_settling and control_loop.state == ControlLoop.STATE_SAMPLE:
+                settles += 1
+            clock.sleep_us(PID_PERIOD_MS * 1000)  # Time to the next timer callback
+
+        self.assertIsNone(state.heater_fault)
+        self.assertGreaterEqual(settles, 3)
+        self.assertLessEqual(control_loop.max_tick_us, CALLBACK_BUDGET_US)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
-from machine import Pin
+import utime
+from machine import Pin, SPI, SoftSPI
 from max6675_utime import MAX6675
+from max6675_spi import MAX6675_SPI
 
 from errormessage import ErrorMessage
 
@@ -13,12 +15,29 @@ class Thermocouple:
         "thermocouple-below_zero":      "Temperature reading is below 0C - Check the probe is not wired up backwards",
         "thermocouple-above_limit":     "Temperature reading is over 1000C - Check the probe for shorting"
     }
-    def __init__(self, sck_pin_number, cs_pin_number, so_pin_number, heater_on_temperature_difference_threshold):
+    # MAX6675 max SCK is 4.3MHz
+    SPI_BAUDRATE = 4000000
+
+    def __init__(self, sck_pin_number, cs_pin_number, so_pin_number, heater_on_temperature_difference_threshold, backend="bitbang", spi_id=None):
+        # backend:  "bitbang" - original pure python driver, works on any pins
+        #           "spi"     - one 2 byte transfer per read, uses hardware SPI when spi_id is given
+        #                       (SCK/SO must be on that SPI block's pins eg SPI0 SCK 6 + SO 4)
+        #                       otherwise SoftSPI on the same pins as the bitbang driver
         print("Thermocouple Initialising ...")
 
-        self.sck = Pin(sck_pin_number, Pin.OUT)
         self.cs = Pin(cs_pin_number, Pin.OUT)
-        self.so = Pin(so_pin_number, Pin.IN)
+        if backend == "bitbang":
+            self.sck = Pin(sck_pin_number, Pin.OUT)
+            self.so = Pin(so_pin_number, Pin.IN)
+        elif backend == "spi":
+            if spi_id is None:
+                # SoftSPI insists on a mosi pin but the MAX6675 has no data in, so hand it CS -
+                # readinto clocks out 0x00 which just holds CS low for the transfer
+                self.spi = SoftSPI(baudrate=self.SPI_BAUDRATE, polarity=0, phase=0, sck=Pin(sck_pin_number), mosi=self.cs, miso=Pin(so_pin_number))
+            else:
+                self.spi = SPI(spi_id, baudrate=self.SPI_BAUDRATE, polarity=0, phase=0, sck=Pin(sck_pin_number), miso=Pin(so_pin_number))
+        else:
+            raise ValueError(f"Invalid thermocouple backend: {backend}")
 
         self.heater_on_temperature_difference_threshold = heater_on_temperature_difference_threshold
         self.thermocouple_sensor = None
@@ -26,7 +45,10 @@ class Thermocouple:
         self.raw_temp = 0
         self.filtered_temp_counter = 0
         try:
-            self.thermocouple_sensor = MAX6675(self.sck, self.cs, self.so)
+            if backend == "spi":
+                self.thermocouple_sensor = MAX6675_SPI(self.spi, self.cs)
+            else:
+                self.thermocouple_sensor = MAX6675(self.sck, self.cs, self.so)
             #utime.sleep_ms(350)
             #self.update_filtered_temp(False) # Initialize last_known_safe_temp
             print("Thermocouple initialised.")
@@ -36,6 +58,26 @@ class Thermocouple:
             raise
 
 
+    def start_conversion(self):
+        # Readings straight after power up can be rubbish, start a fresh conversion to wait for
+        # with wait_for_reading() so other start up can go on while it converts
+        self.thermocouple_sensor.refresh()
+
+    def wait_for_reading(self, timeout_ms):
+        # Waits for the conversion to finish then reads it (sets last_known_safe_temp), a bad reading
+        # waits for the next conversion until timeout_ms has gone when its error is raised
+        deadline = utime.ticks_add(utime.ticks_ms(), timeout_ms)
+        while True:
+            while not self.thermocouple_sensor.ready():
+                utime.sleep_ms(5)
+            try:
+                return self.get_filtered_temp(False)
+            except ErrorMessage:
+                if utime.ticks_diff(utime.ticks_ms(), deadline) >= 0:
+                    raise
+                # The read started the next conversion
+
+
     def read_raw_temp(self):
         try:
             raw_temp = self.thermocouple_sensor.read()